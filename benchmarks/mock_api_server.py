@@ -0,0 +1,427 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+import random
+import runpy
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+
+# Local stand-in for the collectors' APIs (GitHub, CryptoCompare, Blockchair,
+# Reddit, Etherscan, BlockCypher, moneroblocks, Blockfrost, ...). It serves
+# recorded responses with configurable latency, GitHub-style rate-limit
+# headers and 429s, so concurrency, backoff and caching changes in the
+# collectors can be measured without network access.
+#
+# Requests are routed by prefixing the original host to the path:
+# https://api.github.com/repos/x is served as http://127.0.0.1:PORT/api.github.com/repos/x.
+# redirect_requests() rewrites every requests call that way, and --run
+# executes a collector in-process with the redirect in place:
+#
+#   python mock_api_server.py --fixtures recorded/ --latency 0.2 --rate-limit 60 \
+#       --run ../commits/get_commits.py
+#
+# --fixtures also takes a cassette recorded by commits/http_cassette.py, so a
+# real collection can be replayed with latency and rate limits added.
+
+FIXTURE_DIR = 'mock_fixtures'
+STATS_FILE = 'mock_api_stats.json'
+
+# Credentials never take part in matching a request to a recording
+IGNORED_PARAMS = {'api_key', 'apikey', 'key', 'token', 'access_token', 'client_id', 'client_secret'}
+
+
+def split_url(url):
+    """(host, path, query dict) of a URL, credentials removed from the query"""
+    parts = urlsplit(url)
+    query = {k: v for k, v in parse_qsl(parts.query, keep_blank_values=True) if k.lower() not in IGNORED_PARAMS}
+    return parts.netloc.lower(), parts.path or '/', query
+
+
+class Recording:
+    """
+    Recorded responses keyed by method, host and path. A response may list
+    query parameters it requires; the most specific match wins, so a
+    paginated endpoint can have one response per page plus a catch-all.
+
+    Fixture files hold one response or a list of them:
+
+        {"method": "GET", "url": "https://api.github.com/repos/bitcoin/bitcoin",
+         "status": 200, "headers": {}, "json": {"forks_count": 36000}}
+
+    Query parameters in the URL (or a "query" object) must match; "body"
+    can be given instead of "json" for non-JSON responses.
+    """
+
+    def __init__(self):
+        self.responses = {}
+
+    def __len__(self):
+        return sum(len(entries) for entries in self.responses.values())
+
+    def add(self, url, status=200, json_body=None, body=None, headers=None, method='GET', query=None):
+        host, path, url_query = split_url(url)
+        required = {**url_query, **{k: str(v) for k, v in (query or {}).items()}}
+        headers = dict(headers or {})
+        if json_body is not None:
+            body = json.dumps(json_body).encode()
+            headers.setdefault('Content-Type', 'application/json')
+        elif isinstance(body, str):
+            body = body.encode()
+        self.responses.setdefault((method.upper(), host, path), []).append((required, status, headers, body or b''))
+        return self
+
+    def lookup(self, method, host, path, query):
+        """(status, headers, body) of the most specific matching response, or None"""
+        best = None
+        for required, status, headers, body in self.responses.get((method.upper(), host.lower(), path), []):
+            if all(query.get(k) == v for k, v in required.items()):
+                if best is None or len(required) > best[0]:
+                    best = (len(required), status, headers, body)
+        return None if best is None else best[1:]
+
+    def load(self, path):
+        """Add every response in a fixture file, an HTTP cassette (.zip), or every *.json file of a directory"""
+        if path.endswith('.zip'):
+            sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'commits'))
+            from http_cassette import Cassette
+
+            for interaction, body in Cassette(path, 'replay').responses():
+                self.add(interaction['url'], interaction['status'], body=body,
+                         headers=interaction['headers'], method=interaction['method'])
+            return self
+        paths = sorted(glob.glob(os.path.join(path, '**', '*.json'), recursive=True)) if os.path.isdir(path) else [path]
+        for fixture_path in paths:
+            with open(fixture_path) as f:
+                entries = json.load(f)
+            for entry in entries if isinstance(entries, list) else [entries]:
+                self.add(entry['url'], entry.get('status', 200), entry.get('json'), entry.get('body'),
+                         entry.get('headers'), entry.get('method', 'GET'), entry.get('query'))
+        return self
+
+
+def github_commit_pages(recording, repo, n_commits, per_page=100, seed=0):
+    """
+    Synthetic GitHub /commits pages for one repository (from
+    synthetic_data.iter_commits), as get_commits.py pages through them,
+    plus the repository record and an empty page after the last one.
+    """
+    from synthetic_data import commits
+
+    rows = commits(n_commits, seed) if n_commits else None
+    url = f'https://api.github.com/repos/{repo}/commits'
+    for page, start in enumerate(range(0, n_commits, per_page), 1):
+        items = []
+        for i, row in enumerate(rows.iloc[start:start + per_page].itertuples(index=False), start):
+            person = {'name': row.author_name, 'email': row.author_email, 'date': row.commit_date + 'Z'}
+            items.append({
+                'sha': hashlib.sha1(f'{repo}/{seed}/{i}'.encode()).hexdigest(),
+                'commit': {
+                    'author': person,
+                    'committer': person,
+                    'message': f'Synthetic commit {i}',
+                    'verification': {'verified': bool(row.commit_verified),
+                                     'reason': 'valid' if row.commit_verified else 'unsigned'},
+                },
+                'author': {'login': row.author_login} if isinstance(row.author_login, str) else None,
+            })
+        recording.add(url, json_body=items, query={'page': page})
+    recording.add(url, json_body=[])  # any page past the end
+    recording.add(f'https://api.github.com/repos/{repo}',
+                  json_body={'full_name': repo, 'forks_count': n_commits // 20, 'watchers_count': n_commits // 5,
+                             'stargazers_count': n_commits // 5})
+    return recording
+
+
+class HostStats:
+    def __init__(self):
+        self.requests = self.served = self.missing = self.throttled = self.bytes = 0
+        self.latency = 0.0
+
+    def to_dict(self):
+        return {
+            'requests': self.requests, 'served': self.served, 'missing': self.missing,
+            'throttled': self.throttled, 'bytes': self.bytes,
+            'mean_latency_s': round(self.latency / self.requests, 4) if self.requests else None,
+        }
+
+
+class MockAPIServer(ThreadingHTTPServer):
+    """
+    Threaded server over a Recording. Per host it allows `rate_limit`
+    requests per `window` seconds (None: unlimited) and answers 429 with
+    Retry-After once they are used up; `throttle_rate` adds random 429s.
+    Every response waits `latency` seconds plus up to `jitter` more.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, recording, latency=0.0, jitter=0.0, rate_limit=None, window=60.0, throttle_rate=0.0,
+                 seed=0, port=0):
+        super().__init__(('127.0.0.1', port), MockHandler)
+        self.recording = recording
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self.window = window
+        self.throttle_rate = throttle_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.windows = {}  # host -> (window start, requests in window)
+        self.stats = {}
+        self.thread = None
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+    def start(self):
+        self.thread = threading.Thread(target=self.serve_forever, name='mock-api', daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def admit(self, host):
+        """Rate-limit headers for this request, and whether to answer 429"""
+        now = time.time()
+        with self.lock:
+            stats = self.stats.setdefault(host, HostStats())
+            stats.requests += 1
+            delay = self.latency + self.jitter * self.random.random()
+            throttled = self.throttle_rate > 0 and self.random.random() < self.throttle_rate
+            if self.rate_limit is None:
+                return {}, throttled, delay, stats
+            start, used = self.windows.get(host, (now, 0))
+            if now - start >= self.window:
+                start, used = now, 0
+            used += 1
+            self.windows[host] = (start, used)
+            reset = start + self.window
+            headers = {
+                'X-RateLimit-Limit': str(self.rate_limit),
+                'X-RateLimit-Remaining': str(max(self.rate_limit - used, 0)),
+                'X-RateLimit-Reset': str(int(reset)),
+            }
+            if used > self.rate_limit or throttled:
+                headers['Retry-After'] = str(max(int(reset - now) + 1, 1) if used > self.rate_limit else 1)
+                throttled = True
+            return headers, throttled, delay, stats
+
+    def summary(self):
+        with self.lock:
+            return {host: stats.to_dict() for host, stats in sorted(self.stats.items())}
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def handle_any(self):
+        server = self.server
+        started = time.perf_counter()
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            self.rfile.read(length)
+
+        host, _, rest = self.path.lstrip('/').partition('/')
+        _, path, query = split_url(f'http://{host}/{rest}')
+        headers, throttled, delay, stats = server.admit(host)
+        if delay > 0:
+            threading.Event().wait(delay)  # not time.sleep: --sleep-scale patches that
+
+        if throttled:
+            status, body = 429, json.dumps({'message': 'API rate limit exceeded (mock)'}).encode()
+            headers['Content-Type'] = 'application/json'
+        else:
+            found = server.recording.lookup(self.command, host, path, query)
+            if found is None:
+                status, body = 404, json.dumps({'message': f'No recorded response for {self.command} {host}{path}'}).encode()
+                headers['Content-Type'] = 'application/json'
+            else:
+                status, recorded_headers, body = found
+                headers = {**recorded_headers, **headers}
+
+        self.send_response(status)
+        for name, value in headers.items():
+            if name.lower() not in ('content-length', 'transfer-encoding', 'content-encoding', 'connection'):
+                self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+        with server.lock:
+            stats.throttled += status == 429
+            stats.missing += status == 404 and not throttled
+            stats.served += status < 400
+            stats.bytes += len(body)
+            stats.latency += time.perf_counter() - started
+
+    do_GET = do_POST = do_HEAD = do_PUT = handle_any
+
+
+@contextmanager
+def redirect_requests(base_url):
+    """Send every requests call to the mock server; the original host becomes the first path segment"""
+    send = requests.sessions.Session.send
+
+    def redirected_send(session, request, **kwargs):
+        parts = urlsplit(request.url)
+        request.url = f"{base_url}/{parts.netloc}{parts.path or '/'}" + (f'?{parts.query}' if parts.query else '')
+        return send(session, request, **kwargs)
+
+    requests.sessions.Session.send = redirected_send
+    try:
+        yield
+    finally:
+        requests.sessions.Session.send = send
+
+
+@contextmanager
+def scaled_sleep(scale):
+    """Scale the collector's time.sleep calls (politeness delays, backoff) by `scale`"""
+    sleep = time.sleep
+    if scale != 1:
+        time.sleep = lambda seconds: sleep(max(seconds, 0) * scale)
+    try:
+        yield
+    finally:
+        time.sleep = sleep
+
+
+def run_script(path, args=()):
+    """Run a collector as __main__ from its own directory, as it expects"""
+    path = os.path.abspath(path)
+    cwd, argv, sys_path = os.getcwd(), sys.argv, list(sys.path)
+    os.chdir(os.path.dirname(path))
+    sys.argv = [path] + list(args)
+    sys.path.insert(0, os.path.dirname(path))
+    try:
+        runpy.run_path(path, run_name='__main__')
+    except SystemExit as e:
+        if e.code not in (None, 0):
+            print(f"⚠️  {os.path.basename(path)} exited with {e.code}")
+    finally:
+        os.chdir(cwd)
+        sys.argv, sys.path[:] = argv, sys_path
+
+
+def print_summary(summary, elapsed=None):
+    header = f"\n📡 MOCK API SUMMARY" + (f" ({elapsed:.1f}s)" if elapsed is not None else "")
+    print(header)
+    if not summary:
+        print("   (no requests)")
+    for host, stats in summary.items():
+        print(f"   {host}: {stats['requests']} requests, {stats['served']} served, {stats['missing']} not recorded, "
+              f"{stats['throttled']} throttled, {stats['bytes'] / 1024:.0f} KB, "
+              f"{stats['mean_latency_s'] or 0:.3f}s mean latency")
+
+
+def self_check():
+    """Routing, matching, latency, rate limiting and concurrency against a local recording"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    recording = Recording()
+    recording.add('https://api.example.org/items?page=1', json_body=[1, 2])
+    recording.add('https://api.example.org/items', json_body=[])
+    github_commit_pages(recording, 'bitcoin/bitcoin', 250)
+    checks = {}
+    with MockAPIServer(recording, rate_limit=5, window=60) as server, redirect_requests(server.url):
+        first = requests.get('https://api.example.org/items', params={'page': 1, 'api_key': 'secret'})
+        checks['specific match'] = first.json() == [1, 2]
+        checks['catch-all match'] = requests.get('https://api.example.org/items?page=9').json() == []
+        checks['rate-limit headers'] = first.headers.get('X-RateLimit-Remaining') == '4'
+        checks['not recorded'] = requests.get('https://api.example.org/other').status_code == 404
+        statuses = [requests.get('https://api.example.org/items').status_code for _ in range(3)]
+        checks['429 after limit'] = statuses == [200, 200, 429]  # 5 per window, 404s included
+        checks['retry-after'] = 'Retry-After' in requests.get('https://api.example.org/items').headers
+        pages = [requests.get('https://api.github.com/repos/bitcoin/bitcoin/commits', params={'page': p}).json()
+                 for p in (1, 3, 4)]
+        checks['github pages'] = [len(p) for p in pages] == [100, 50, 0] and 'commit' in pages[0][0]
+    with MockAPIServer(recording, latency=0.2) as server, redirect_requests(server.url):
+        started = time.perf_counter()
+        with ThreadPoolExecutor(8) as pool:
+            list(pool.map(lambda _: requests.get('https://api.example.org/items'), range(8)))
+        elapsed = time.perf_counter() - started
+        checks['latency'] = elapsed >= 0.2
+        checks['concurrent'] = elapsed < 0.2 * 8 / 2
+        checks['stats'] = server.summary()['api.example.org']['requests'] == 8
+    for name, ok in checks.items():
+        if not ok:
+            print(f"   ❌ {name}")
+    print(f"{'✅' if all(checks.values()) else '❌'} mock API server self-check: "
+          f"{sum(checks.values())}/{len(checks)} checks passed")
+    return all(checks.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve recorded API responses locally for offline collector runs")
+    parser.add_argument('--fixtures', action='append', default=[], help="fixture file or directory (repeatable)")
+    parser.add_argument('--github-repo', action='append', default=[], metavar='OWNER/NAME:COMMITS',
+                        help="serve synthetic commit pages for a repository")
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument('--jitter', type=float, default=0.0, help="up to this many extra seconds, at random")
+    parser.add_argument('--rate-limit', type=int, help="requests per host per window before 429s")
+    parser.add_argument('--window', type=float, default=60.0, help="rate-limit window in seconds")
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help="fraction of requests answered 429 at random")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--port', type=int, default=0)
+    parser.add_argument('--sleep-scale', type=float, default=1.0, help="scale the collector's time.sleep calls")
+    parser.add_argument('--stats', default=STATS_FILE)
+    parser.add_argument('--run', nargs=argparse.REMAINDER, help="collector script (and its arguments) to run")
+    parser.add_argument('--self-check', action='store_true')
+    args = parser.parse_args()
+
+    if args.self_check:
+        raise SystemExit(0 if self_check() else 1)
+
+    recording = Recording()
+    for path in args.fixtures or ([FIXTURE_DIR] if os.path.isdir(FIXTURE_DIR) else []):
+        recording.load(path)
+    for spec in args.github_repo:
+        repo, _, n = spec.partition(':')
+        github_commit_pages(recording, repo, int(float(n or 1000)), seed=args.seed)
+    print(f"📼 {len(recording)} recorded responses")
+
+    server = MockAPIServer(recording, args.latency, args.jitter, args.rate_limit, args.window,
+                           args.throttle_rate, args.seed, args.port)
+    started = time.perf_counter()
+    with server:
+        if args.run:
+            print(f"▶️  Running {' '.join(args.run)} against {server.url}")
+            with redirect_requests(server.url), scaled_sleep(args.sleep_scale):
+                run_script(args.run[0], args.run[1:])
+        else:
+            print(f"📡 Serving on {server.url} (route requests through redirect_requests; Ctrl-C to stop)")
+            try:
+                threading.Event().wait()
+            except KeyboardInterrupt:
+                pass
+    elapsed = time.perf_counter() - started
+    summary = server.summary()
+    print_summary(summary, elapsed)
+    with open(args.stats, 'w') as f:
+        json.dump({'elapsed_s': round(elapsed, 3), 'hosts': summary}, f, indent=2)
+    print(f"💾 Stats saved: {args.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from collections import namedtuple
+from contextlib import redirect_stdout
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', 'commits'))
+sys.path.insert(0, os.path.join(HERE, '..', 'proposal'))
+from calc import block_metrics_from_daily, commit_metrics_from_daily, standardize_platform_names
+from time_buckets import daily_counts
+from author_identity import AuthorIndex, resolve_authors
+from weekly_reduce import WEEKLY_REDUCTIONS, WeeklyReducer
+from panel_join import assemble_panel
+from synthetic_data import CHUNK_ROWS, iter_blocks, iter_commits, proposals, weekly_panel
+
+try:
+    import lda_topic_analysis
+except ImportError:  # scikit-learn / nltk not installed
+    lda_topic_analysis = None
+
+# Benchmarks for the metric, topic-model and integration stages on synthetic
+# data (synthetic_data.py). Each stage is timed over streamed chunks with the
+# clock paused while the next chunk is generated; peak memory is measured
+# in a separate tracemalloc pass (it includes the chunk being processed).
+# Results are compared with a stored baseline from the same machine.
+#
+#   python run_benchmarks.py --rows 1e5 1e6             # compare with baseline.json
+#   python run_benchmarks.py --rows 1e5 1e6 --save-baseline
+#   python run_benchmarks.py --stages calc_blocks --rows 1e8 --repeat 1
+
+BASELINE_FILE = 'baseline.json'
+RESULTS_FILE = 'benchmark_results.json'
+TIME_TOLERANCE = 0.25    # flag runs more than 25% slower than the baseline
+MEMORY_TOLERANCE = 0.15  # ... or with a 15% higher peak
+
+
+# Stage: what a row is, which size option it scales with ('rows', 'docs',
+# or None for fixed-size data), the data generator and the timed function
+Stage = namedtuple('Stage', ['unit', 'scale', 'data', 'run'])
+
+
+def calc_blocks(chunks):
+    """calc.py block path: daily miner counts, then weekly and rolling metrics"""
+    partial = [daily_counts(standardize_platform_names(chunk), 'block_date', 'miner') for chunk in chunks]
+    daily = pd.concat(partial).groupby(['Platform', 'Date', 'miner'], as_index=False)['count'].sum()
+    return len(block_metrics_from_daily(daily, 'week')) + len(block_metrics_from_daily(daily, 'rolling'))
+
+
+def calc_commits(chunks):
+    """calc.py commit path with identity resolution, then weekly and rolling metrics"""
+    index = AuthorIndex()
+    partial = []
+    for chunk in chunks:
+        chunk['author_id'] = resolve_authors(chunk, index)
+        partial.append(daily_counts(standardize_platform_names(chunk), 'commit_date', 'author_id'))
+    daily = pd.concat(partial).groupby(['Platform', 'Date', 'author_id'], as_index=False)['count'].sum()
+    return len(commit_metrics_from_daily(daily, 'week')) + len(commit_metrics_from_daily(daily, 'rolling'))
+
+
+def weekly_reduce(name):
+    """Group 1 task 4: stream raw rows into weekly aggregates"""
+    def run(chunks):
+        reducer = WeeklyReducer(**WEEKLY_REDUCTIONS[name])
+        for chunk in chunks:
+            reducer.update(chunk[reducer.columns])
+        return len(reducer.result())
+    return run
+
+
+def lda(chunks):
+    """LDA stage: topic model, per-document diversity, weekly aggregation"""
+    rows_out = 0
+    for df in chunks:
+        modeled, _, _ = lda_topic_analysis.perform_lda_analysis(df)
+        rows_out += len(lda_topic_analysis.aggregate_weekly_diversity(modeled))
+    return rows_out
+
+
+def integrate(chunks):
+    """Integrators: join every weekly, yearly and platform-level source onto the panel"""
+    return sum(len(assemble_panel(base, sources)) for base, sources in chunks)
+
+
+STAGES = {
+    'calc_blocks': Stage('blocks', 'rows', lambda n, seed, chunk_rows: iter_blocks(n, seed, chunk_rows), calc_blocks),
+    'calc_commits': Stage('commits', 'rows', lambda n, seed, chunk_rows: iter_commits(n, seed, chunk_rows), calc_commits),
+    'reduce_blocks': Stage('blocks', 'rows', lambda n, seed, chunk_rows: iter_blocks(n, seed, chunk_rows),
+                           weekly_reduce('blocks')),
+    'reduce_commits': Stage('commits', 'rows', lambda n, seed, chunk_rows: iter_commits(n, seed, chunk_rows),
+                            weekly_reduce('commits')),
+    'lda': Stage('documents', 'docs', lambda n, seed, chunk_rows: iter([proposals(n, seed)]), lda),
+    'integrate': Stage('panel rows', None, lambda n, seed, chunk_rows: iter([weekly_panel(seed)]), integrate),
+}
+
+
+def size_of(item):
+    """Input rows of one generated item: a chunk, or (panel, sources)"""
+    if isinstance(item, tuple):
+        base, sources = item
+        return len(base) + sum(len(df) for df in sources.values())
+    return len(item)
+
+
+class Stopwatch:
+    """Wall and CPU time that can be paused"""
+
+    def __init__(self):
+        self.wall = self.cpu = 0.0
+        self.started = None
+
+    def start(self):
+        self.started = (time.perf_counter(), time.process_time())
+
+    def stop(self):
+        wall, cpu = self.started
+        self.wall += time.perf_counter() - wall
+        self.cpu += time.process_time() - cpu
+
+
+def paused(items, watch, counter):
+    """Yield generated items with the stopwatch stopped while each is generated"""
+    items = iter(items)
+    while True:
+        watch.stop()
+        item = next(items, None)
+        watch.start()
+        if item is None:
+            return
+        counter[0] += size_of(item)
+        yield item
+
+
+def run_once(stage, size, seed, chunk_rows, verbose=False):
+    """One timed run; the stage's own progress output is discarded unless verbose"""
+    watch, counter = Stopwatch(), [0]
+    with redirect_stdout(sys.stdout if verbose else io.StringIO()):
+        watch.start()
+        rows_out = stage.run(paused(stage.data(size, seed, chunk_rows), watch, counter))
+        watch.stop()
+    return watch, counter[0], rows_out
+
+
+def measure(name, stage, size, seed=0, chunk_rows=CHUNK_ROWS, repeat=3, memory=True, verbose=False):
+    """Best-of-`repeat` wall and CPU time, throughput, and traced peak memory"""
+    best = None
+    for _ in range(repeat):
+        watch, rows_in, rows_out = run_once(stage, size, seed, chunk_rows, verbose)
+        if best is None or watch.wall < best.wall:
+            best = watch
+    peak_mb = None
+    if memory:
+        tracemalloc.start()
+        run_once(stage, size, seed, chunk_rows, verbose)
+        peak_mb = tracemalloc.get_traced_memory()[1] / 1024**2
+        tracemalloc.stop()
+    return {
+        'stage': name,
+        'unit': stage.unit,
+        'rows': rows_in,
+        'size': size,
+        'chunk_rows': chunk_rows,
+        'seed': seed,
+        'wall_s': round(best.wall, 4),
+        'cpu_s': round(best.cpu, 4),
+        'rows_per_s': round(rows_in / best.wall, 1) if best.wall > 0 else None,
+        'peak_mb': None if peak_mb is None else round(peak_mb, 2),
+        'rows_out': rows_out,
+        'repeat': repeat,
+    }
+
+
+def result_key(result):
+    return f"{result['stage']}/{result['size']}"
+
+
+def machine_info():
+    return {
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpus': os.cpu_count(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+    }
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(result, baseline, time_tolerance=TIME_TOLERANCE, memory_tolerance=MEMORY_TOLERANCE):
+    """Relative change against the baseline entry and regression flags"""
+    base = (baseline or {}).get('results', {}).get(result_key(result))
+    if base is None:
+        return {'time_change': None, 'memory_change': None, 'status': 'new'}
+    if (base['chunk_rows'], base['seed']) != (result['chunk_rows'], result['seed']):
+        return {'time_change': None, 'memory_change': None, 'status': 'not comparable'}
+
+    time_change = result['wall_s'] / base['wall_s'] - 1 if base['wall_s'] else None
+    memory_change = None
+    if result['peak_mb'] is not None and base.get('peak_mb'):
+        memory_change = result['peak_mb'] / base['peak_mb'] - 1
+    flags = []
+    if time_change is not None and time_change > time_tolerance:
+        flags.append('slower')
+    if memory_change is not None and memory_change > memory_tolerance:
+        flags.append('more memory')
+    return {
+        'time_change': time_change,
+        'memory_change': memory_change,
+        'status': 'REGRESSION: ' + ', '.join(flags) if flags else 'ok',
+    }
+
+
+def print_table(results, comparisons):
+    table = pd.DataFrame([{
+        'stage': r['stage'],
+        'rows': f"{r['rows']:,}",
+        'wall_s': r['wall_s'],
+        'cpu_s': r['cpu_s'],
+        'rows/s': f"{r['rows_per_s']:,.0f}" if r['rows_per_s'] else '',
+        'peak_mb': r['peak_mb'],
+        'vs_time': '' if c['time_change'] is None else f"{c['time_change']:+.0%}",
+        'vs_memory': '' if c['memory_change'] is None else f"{c['memory_change']:+.0%}",
+        'status': c['status'],
+    } for r, c in zip(results, comparisons)])
+    print(table.to_string(index=False))
+
+
+def parse_args():
+    count = lambda s: int(float(s))  # accepts 1e6
+    parser = argparse.ArgumentParser(description="Benchmark calc, LDA and integration stages on synthetic data")
+    parser.add_argument('--stages', nargs='+', choices=list(STAGES), default=list(STAGES))
+    parser.add_argument('--rows', nargs='+', type=count, default=[100_000, 1_000_000],
+                        help="block/commit rows per run (10^5 to 10^8)")
+    parser.add_argument('--docs', nargs='+', type=count, default=[2000], help="proposal documents for the LDA stage")
+    parser.add_argument('--chunk-rows', type=count, default=CHUNK_ROWS)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--no-memory', action='store_true', help="skip the tracemalloc pass")
+    parser.add_argument('--verbose', action='store_true', help="show the stages' own progress output")
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--save-baseline', action='store_true', help="store these results as the new baseline")
+    parser.add_argument('--time-tolerance', type=float, default=TIME_TOLERANCE)
+    parser.add_argument('--memory-tolerance', type=float, default=MEMORY_TOLERANCE)
+    parser.add_argument('--output', default=RESULTS_FILE)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    print("=== PIPELINE BENCHMARKS ===")
+    machine = machine_info()
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print(f"⚠️  No baseline at {args.baseline}; run with --save-baseline to create one")
+    elif baseline.get('machine') != machine:
+        print(f"⚠️  Baseline was recorded on a different machine or library versions: {baseline.get('machine')}")
+
+    results = []
+    for name in args.stages:
+        stage = STAGES[name]
+        if name == 'lda' and lda_topic_analysis is None:
+            print(f"⏭️  {name}: scikit-learn/nltk not installed, skipped")
+            continue
+        sizes = {'rows': args.rows, 'docs': args.docs, None: [None]}[stage.scale]
+        for size in sizes:
+            print(f"⏱️  {name}" + (f" @ {size:,} {stage.unit}" if size else "") + "...")
+            results.append(measure(name, stage, size, args.seed, args.chunk_rows, args.repeat, not args.no_memory,
+                                   args.verbose))
+
+    comparisons = [compare(r, baseline, args.time_tolerance, args.memory_tolerance) for r in results]
+    print()
+    print_table(results, comparisons)
+
+    run = {'created': datetime.now().isoformat(), 'machine': machine,
+           'results': {result_key(r): {**r, **c} for r, c in zip(results, comparisons)}}
+    with open(args.output, 'w') as f:
+        json.dump(run, f, indent=2)
+    print(f"\n💾 Results saved: {args.output}")
+
+    if args.save_baseline:
+        stored = baseline if baseline and baseline.get('machine') == machine else {'machine': machine, 'results': {}}
+        stored['created'] = run['created']
+        stored['results'].update({result_key(r): r for r in results})
+        with open(args.baseline, 'w') as f:
+            json.dump(stored, f, indent=2)
+        print(f"📌 Baseline updated: {args.baseline} ({len(stored['results'])} entries)")
+        return
+
+    regressions = [c for c in comparisons if c['status'].startswith('REGRESSION')]
+    if regressions:
+        print(f"❌ {len(regressions)} regression(s) against {args.baseline}")
+        raise SystemExit(1)
+    if baseline:
+        print("✅ No regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# Deterministic synthetic block, commit, proposal and weekly-panel data for
+# the benchmarks, shaped like create_realistic_sample_data() in
+# get_block_data.py but for all 11 platforms, 2015-2024 and any row count.
+# Every value is a hash of (seed, global row number, field), so a row does
+# not depend on how the rows are chunked: 10^8 rows can be streamed in
+# chunks and still equal the same rows generated in one piece.
+
+START = pd.Timestamp('2015-01-01')
+END = pd.Timestamp('2025-01-01')
+CHUNK_ROWS = 1_000_000
+
+# Block time in minutes, average block size and transactions, reward,
+# number of mining pools and developers, and first block date
+PLATFORMS = {
+    'Bitcoin': {'block_time_min': 10, 'avg_size': 1200000, 'avg_tx': 2500, 'reward': 6.25, 'pools': 40, 'developers': 900, 'launch': '2009-01-03'},
+    'Ethereum': {'block_time_min': 0.2, 'avg_size': 85000, 'avg_tx': 150, 'reward': 2.0, 'pools': 60, 'developers': 1200, 'launch': '2015-07-30'},
+    'Litecoin': {'block_time_min': 2.5, 'avg_size': 45000, 'avg_tx': 80, 'reward': 12.5, 'pools': 25, 'developers': 250, 'launch': '2011-10-07'},
+    'Dogecoin': {'block_time_min': 1, 'avg_size': 25000, 'avg_tx': 50, 'reward': 10000.0, 'pools': 25, 'developers': 200, 'launch': '2013-12-06'},
+    'Bitcoin_Cash': {'block_time_min': 10, 'avg_size': 180000, 'avg_tx': 400, 'reward': 6.25, 'pools': 20, 'developers': 150, 'launch': '2017-08-01'},
+    'Dash': {'block_time_min': 2.5, 'avg_size': 35000, 'avg_tx': 60, 'reward': 2.5, 'pools': 20, 'developers': 150, 'launch': '2014-01-19'},
+    'Bitcoin_SV': {'block_time_min': 10, 'avg_size': 2500000, 'avg_tx': 5000, 'reward': 6.25, 'pools': 15, 'developers': 80, 'launch': '2018-11-15'},
+    'Cardano': {'block_time_min': 1 / 3, 'avg_size': 20000, 'avg_tx': 15, 'reward': 0.0, 'pools': 3000, 'developers': 500, 'launch': '2017-09-23'},
+    'Monero': {'block_time_min': 2, 'avg_size': 60000, 'avg_tx': 25, 'reward': 0.6, 'pools': 20, 'developers': 300, 'launch': '2014-04-18'},
+    'Z-Cash': {'block_time_min': 1.25, 'avg_size': 30000, 'avg_tx': 10, 'reward': 3.125, 'pools': 15, 'developers': 200, 'launch': '2016-10-28'},
+    'E-Cash': {'block_time_min': 10, 'avg_size': 20000, 'avg_tx': 30, 'reward': 3.125, 'pools': 10, 'developers': 60, 'launch': '2020-11-15'},
+}
+
+ZIPF_EXPONENT = 1.1  # pool and author activity: a few large, many small
+
+
+def mix64(x):
+    """splitmix64 finalizer over a uint64 array (wraps modulo 2^64)"""
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def uniform(rows, seed, field):
+    """Uniform [0, 1) value per (seed, row, field)"""
+    with np.errstate(over='ignore'):
+        key = rows.astype(np.uint64) * np.uint64(0x9E3779B97F4A7C15)
+        key += np.uint64((seed * 1_000_003 + field * 7919) % 2**63)
+        return (mix64(mix64(key)) >> np.uint64(11)).astype(np.float64) * 2.0**-53
+
+
+def zipf_choice(u, n):
+    """Map uniforms to ranks 0..n-1 with Zipf weights"""
+    cdf = np.cumsum(1.0 / np.arange(1, n + 1) ** ZIPF_EXPONENT)
+    return np.minimum(np.searchsorted(cdf, u * cdf[-1], side='right'), n - 1)
+
+
+def platform_rows(n_rows, weights):
+    """Split n_rows over the platforms in proportion to weights; returns range bounds"""
+    weights = np.asarray(weights, dtype=np.float64)
+    counts = np.floor(n_rows * weights / weights.sum()).astype(np.int64)
+    counts[np.argsort(-weights, kind='stable')[:n_rows - counts.sum()]] += 1
+    return np.r_[0, np.cumsum(counts)]
+
+
+def active_span(platform, start=START, end=END):
+    """Seconds since the epoch at which a platform's data starts, and its length"""
+    first = max(pd.Timestamp(PLATFORMS[platform]['launch']), start)
+    return first.value // 10**9, (end - first).total_seconds()
+
+
+def segments(n_rows, weights, chunk_rows):
+    """Per chunk of global rows: [(platform, local row numbers, platform's row count, global row numbers)]"""
+    names = list(PLATFORMS)
+    bounds = platform_rows(n_rows, weights)
+    for a in range(0, n_rows, chunk_rows):
+        b = min(a + chunk_rows, n_rows)
+        parts = []
+        for p, name in enumerate(names):
+            lo, hi = max(a, bounds[p]), min(b, bounds[p + 1])
+            if lo < hi:
+                rows = np.arange(lo, hi, dtype=np.int64)
+                parts.append((name, rows - bounds[p], bounds[p + 1] - bounds[p], rows))
+        yield parts
+
+
+def timestamps(platform, local, n_platform, u, start=START, end=END):
+    """Evenly spread, jittered datetime64[s] times over the platform's active span"""
+    first, span = active_span(platform, start, end)
+    seconds = first + (local + u) * (span / n_platform)
+    return seconds.astype(np.int64).astype('datetime64[s]')
+
+
+def frame_from(parts, columns):
+    return pd.DataFrame({col: np.concatenate([part[col] for part in parts]) for col in columns})
+
+
+def as_text(times, unit):
+    return np.datetime_as_string(times, unit=unit)
+
+
+BLOCK_COLUMNS = ['Platform', 'block_id', 'block_time', 'block_date', 'block_size', 'transaction_count',
+                 'difficulty', 'miner', 'reward', 'fee_total']
+
+
+def iter_blocks(n_rows, seed=0, chunk_rows=CHUNK_ROWS, text_dates=True):
+    """
+    Block rows in chunks, platforms in PLATFORMS order, time-ordered within a
+    platform. Rows are shared in proportion to block rate (Ethereum gets
+    the most), difficulty grows over time and miners follow a Zipf law.
+    text_dates gives block_time/block_date as strings, as read back from
+    the collectors' Excel files. block_hash and the coinbase columns are not
+    generated (no benchmarked stage reads them).
+    """
+    weights = [1 / config['block_time_min'] for config in PLATFORMS.values()]
+    for parts in segments(n_rows, weights, chunk_rows):
+        out = []
+        for name, local, n_platform, rows in parts:
+            config = PLATFORMS[name]
+            n = len(rows)
+            u = [uniform(rows, seed, field) for field in range(6)]
+            when = timestamps(name, local, n_platform, u[0])
+            progress = (local + 0.5) / n_platform
+            pools = np.array([f'{name}_Pool_{k + 1}' for k in range(config['pools'])], dtype=object)
+            out.append({
+                'Platform': np.full(n, name, dtype=object),
+                'block_id': local + 1,
+                'block_time': as_text(when, 's') if text_dates else when,
+                'block_date': as_text(when, 'D') if text_dates else when.astype('datetime64[D]'),
+                'block_size': (config['avg_size'] * (0.5 + u[1])).astype(np.int64),
+                'transaction_count': (config['avg_tx'] * (0.5 + u[2])).astype(np.int64),
+                'difficulty': 1e9 * np.exp(8 * progress) * (1 + 0.05 * u[3]),
+                'miner': pools[zipf_choice(u[4], config['pools'])],
+                'reward': np.full(n, config['reward']),
+                'fee_total': config['avg_tx'] * 1e-4 * (0.5 + u[5]),
+            })
+        yield frame_from(out, BLOCK_COLUMNS)
+
+
+COMMIT_COLUMNS = ['Platform', 'author_name', 'author_email', 'author_login', 'commit_date', 'commit_verified']
+
+
+def iter_commits(n_rows, seed=0, chunk_rows=CHUNK_ROWS, text_dates=True):
+    """
+    Commit rows in chunks, shared in proportion to each platform's developer
+    count. Authors follow a Zipf law; 15% of commits use the author's GitHub
+    noreply address and 30% have no login, so identity resolution has
+    aliases to merge. commit_id and message text are not generated.
+    """
+    weights = [config['developers'] for config in PLATFORMS.values()]
+    for parts in segments(n_rows, weights, chunk_rows):
+        out = []
+        for name, local, n_platform, rows in parts:
+            config = PLATFORMS[name]
+            u = [uniform(rows, seed + 1, field) for field in range(5)]
+            when = timestamps(name, local, n_platform, u[0])
+            slug = name.lower().replace('_', '-')
+            ids = range(config['developers'])
+            names = np.array([f'{name} Developer {k}' for k in ids], dtype=object)
+            logins = np.array([f'{slug}-dev{k}' for k in ids], dtype=object)
+            emails = np.array([f'dev{k}@{slug}.org' for k in ids], dtype=object)
+            noreply = np.array([f'{10000 + k}+{slug}-dev{k}@users.noreply.github.com' for k in ids], dtype=object)
+            author = zipf_choice(u[1], config['developers'])
+            out.append({
+                'Platform': np.full(len(rows), name, dtype=object),
+                'author_name': names[author],
+                'author_email': np.where(u[2] < 0.15, noreply[author], emails[author]),
+                'author_login': np.where(u[3] < 0.3, None, logins[author]),
+                'commit_date': as_text(when, 's') if text_dates else when,
+                'commit_verified': u[4] < 0.6,
+            })
+        yield frame_from(out, COMMIT_COLUMNS)
+
+
+def blocks(n_rows, seed=0, **kwargs):
+    return pd.concat(iter_blocks(n_rows, seed, **kwargs), ignore_index=True)
+
+
+def commits(n_rows, seed=0, **kwargs):
+    return pd.concat(iter_commits(n_rows, seed, **kwargs), ignore_index=True)
+
+
+SYLLABLES = ['ba', 'ce', 'di', 'fo', 'gu', 'ha', 'ke', 'li', 'mo', 'nu', 'pa', 're', 'si', 'to', 'vu',
+             'wa', 'xe', 'yo', 'zu', 'qi']
+N_TOPICS = 15
+TOPIC_WORDS = 60
+
+
+def topic_vocabulary():
+    """N_TOPICS lists of distinct three-syllable, letters-only words"""
+    n = len(SYLLABLES)
+    words = [SYLLABLES[k // n**2 % n] + SYLLABLES[k // n % n] + SYLLABLES[k % n]
+             for k in range(7, 7 + 37 * N_TOPICS * TOPIC_WORDS, 37)]
+    return [words[t * TOPIC_WORDS:(t + 1) * TOPIC_WORDS] for t in range(N_TOPICS)]
+
+
+def proposals(n_docs, seed=0, start=START, end=END):
+    """
+    Proposal documents (Platform, Number, Date, Content) for the LDA stage.
+    Each document mixes two topics' vocabularies, so the topic model has
+    structure to find.
+    """
+    vocabulary = [np.array(words) for words in topic_vocabulary()]
+    names = list(PLATFORMS)
+    span_days = (end - start).days
+    rows = []
+    for i in range(n_docs):
+        rng = np.random.default_rng([seed, i])
+        topics = rng.choice(N_TOPICS, size=2, replace=False)
+        n_words = int(rng.integers(80, 300))
+        from_first = rng.random(n_words) < 0.7
+        picks = rng.integers(0, TOPIC_WORDS, n_words)
+        words = np.where(from_first, vocabulary[topics[0]][picks], vocabulary[topics[1]][picks])
+        rows.append({
+            'Platform': names[i % len(names)],
+            'Number': i + 1,
+            'Date': (start + pd.Timedelta(days=int(rng.integers(0, span_days)))).strftime('%Y-%m-%d'),
+            'Content': ' '.join(words),
+        })
+    return pd.DataFrame(rows)
+
+
+def weekly_panel(seed=0, start=START, end=END):
+    """
+    Platform/year/week base panel (ISO weeks from each platform's launch to
+    the end date) and the sources the integrators join onto it: weekly
+    metrics with some weeks missing, yearly values and platform constants.
+    """
+    base = []
+    for name in PLATFORMS:
+        first = max(pd.Timestamp(PLATFORMS[name]['launch']), start)
+        mondays = pd.date_range(first - pd.Timedelta(days=first.weekday()), end, freq='7D', inclusive='left')
+        iso = mondays.isocalendar()
+        base.append(pd.DataFrame({'Platform': name, 'year': iso['year'].to_numpy(np.int64),
+                                  'week': iso['week'].to_numpy(np.int64), 'date': mondays}))
+    base = pd.concat(base, ignore_index=True)
+    rows = np.arange(len(base), dtype=np.int64)
+
+    def weekly(field, columns, missing):
+        keep = uniform(rows, seed + 2, field) >= missing
+        df = base.loc[keep, ['Platform', 'year', 'week']].reset_index(drop=True)
+        for k, col in enumerate(columns):
+            df[col] = 1 + 99 * uniform(rows[keep], seed + 2, field * 16 + k + 1)
+        return df
+
+    yearly = base[['Platform', 'year']].drop_duplicates().reset_index(drop=True)
+    yearly['Hash_Rate_Growth'] = uniform(np.arange(len(yearly), dtype=np.int64), seed + 3, 0)
+    sources = {
+        'decentralization': weekly(1, ['Block_Inverse_HHI', 'Block_Shannon_Entropy', 'Commit_Inverse_HHI',
+                                       'Commit_Shannon_Entropy'], 0.02),
+        'market': weekly(2, ['Price_USD', 'Volume_USD', 'Market_Cap', 'Hash_Rate'], 0.01),
+        'proposals': weekly(3, ['Number_Proposal', 'Topic_Diversity'], 0.6),
+        'github': weekly(4, ['stars', 'forks'], 0.1),
+        'reddit': weekly(5, ['reddit_subscribers', 'reddit_posts', 'reddit_comments'], 0.1),
+        'yearly': yearly,
+        'platform_info': pd.DataFrame({'Platform': list(PLATFORMS),
+                                       'launch_date': [pd.Timestamp(c['launch']) for c in PLATFORMS.values()]}),
+    }
+    return base, sources
+
+
+def self_check():
+    """Chunking independence, seed determinism and row allocation"""
+    whole = blocks(5000, seed=3)
+    checks = {
+        'block rows': len(whole) == 5000,
+        'all platforms': whole['Platform'].nunique() == len(PLATFORMS),
+        'chunking': whole.equals(blocks(5000, seed=3, chunk_rows=777)),
+        'seeded': not whole['miner'].equals(blocks(5000, seed=4)['miner']),
+        'commit chunking': commits(3000, seed=3).equals(commits(3000, seed=3, chunk_rows=1000)),
+        'time range': pd.to_datetime(whole['block_time']).between(START, END).all(),
+        'proposals': proposals(20, seed=1).equals(proposals(20, seed=1)),
+        'panel': weekly_panel()[0].groupby('Platform').size().min() > 52 * 4,
+    }
+    for name, ok in checks.items():
+        if not ok:
+            print(f"   ❌ {name}")
+    print(f"{'✅' if all(checks.values()) else '❌'} synthetic data self-check: "
+          f"{sum(checks.values())}/{len(checks)} checks passed")
+    return all(checks.values())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Deterministic synthetic block/commit data for the benchmarks")
+    parser.add_argument('--self-check', action='store_true')
+    parser.add_argument('--blocks', type=lambda s: int(float(s)), help="write this many block rows to --output")
+    parser.add_argument('--commits', type=lambda s: int(float(s)), help="write this many commit rows to --output")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='synthetic.csv')
+    args = parser.parse_args()
+
+    if args.self_check:
+        raise SystemExit(0 if self_check() else 1)
+    if args.blocks or args.commits:
+        chunks = iter_blocks(args.blocks, args.seed) if args.blocks else iter_commits(args.commits, args.seed)
+        for i, chunk in enumerate(chunks):
+            chunk.to_csv(args.output, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+        print(f"✅ Saved {args.blocks or args.commits:,} rows to {args.output}")
+    else:
+        parser.print_help()
@@ -0,0 +1,228 @@
+import json
+import os
+import re
+import pandas as pd
+
+# Developer identity resolution for the commit metrics. Commits whose author
+# email, name or GitHub login match are linked in a union-find index, and
+# every connected group is one developer with one author_id. Names only link
+# within one platform (its repository): two "Alex Chen"s on different
+# platforms stay two people unless an email or login joins them. The index
+# is persisted as JSON and grows incrementally as new commits arrive.
+
+INDEX_FILE = 'author_identity_index.json'
+INDEX_VERSION = 2  # 2: name keys scoped per platform
+
+# 12345+login@users.noreply.github.com (current) or login@users.noreply.github.com
+NOREPLY_RE = re.compile(r'^(?:(\d+)\+)?([a-z0-9](?:[a-z0-9-]*[a-z0-9])?)@users\.noreply\.github\.com$')
+
+# Identifiers shared by unrelated people; they never link identities
+GENERIC_EMAILS = {'noreply@github.com', 'root@localhost', 'none@none', 'unknown', 'nobody@nowhere'}
+GENERIC_EMAIL_RE = re.compile(r'^(root|ubuntu|user|admin|test)@|@(localhost|localhost\.localdomain|example\.com)$')
+GENERIC_NAMES = {'unknown', 'root', 'ubuntu', 'admin', 'user', 'github', 'github action', 'github actions',
+                 'github-actions', 'github-actions[bot]', 'dependabot[bot]', 'web-flow', 'your name'}
+
+
+def normalize_email(email):
+    """Lower-cased email, or None when missing or shared by many people"""
+    if not isinstance(email, str):
+        return None
+    email = email.strip().lower()
+    if '@' not in email or email in GENERIC_EMAILS or GENERIC_EMAIL_RE.search(email):
+        return None
+    return email
+
+
+def noreply_login(email):
+    """GitHub login encoded in a users.noreply.github.com address, else None"""
+    match = NOREPLY_RE.match(email) if email else None
+    return match.group(2) if match else None
+
+
+def normalize_name(name):
+    """
+    Case-folded name with collapsed whitespace. Only names with at least two
+    words link identities; single tokens ("alex", "dev") are too ambiguous.
+    """
+    if not isinstance(name, str):
+        return None
+    name = ' '.join(name.casefold().split())
+    if name in GENERIC_NAMES or len(name.split(' ')) < 2:
+        return None
+    return name
+
+
+def normalize_login(login):
+    if not isinstance(login, str) or not login.strip():
+        return None
+    login = login.strip().lower()
+    return None if login in GENERIC_NAMES else login
+
+
+def identity_keys(email, name, login=None, scope=None):
+    """
+    Index keys ('email:...', 'name:<scope>:...', 'login:...') of one commit
+    author. The name key is scoped to a platform/repository; without a
+    scope the name is not used.
+    """
+    email = normalize_email(email)
+    login = normalize_login(login) or noreply_login(email)
+    name = normalize_name(name) if scope else None
+
+    keys = []
+    if login:
+        keys.append(f'login:{login}')
+    if email:
+        keys.append(f'email:{email}')
+    if name:
+        keys.append(f'name:{scope}:{name}')
+    return keys
+
+
+class AuthorIndex:
+    """
+    Union-find over identity keys. Keys are numbered in the order first seen
+    and a merged group is represented by its oldest key, so an author_id
+    only changes when its group is merged into an older one.
+    """
+
+    def __init__(self, keys=None, parent=None):
+        self.keys = list(keys or [])
+        self.parent = list(parent) if parent is not None else list(range(len(self.keys)))
+        self.position = {key: i for i, key in enumerate(self.keys)}
+
+    @classmethod
+    def load(cls, path=INDEX_FILE):
+        """Read a saved index; a missing file gives an empty index"""
+        if not os.path.exists(path):
+            return cls()
+        with open(path) as f:
+            data = json.load(f)
+        if data.get('version') != INDEX_VERSION:
+            raise ValueError(f"{path}: unsupported identity index version {data.get('version')} "
+                             f"(delete it to rebuild from the commit file)")
+        return cls(data['keys'], data['parent'])
+
+    def save(self, path=INDEX_FILE):
+        for i in range(len(self.parent)):
+            self.find(i)  # store compressed paths
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': INDEX_VERSION, 'keys': self.keys, 'parent': self.parent}, f)
+        os.replace(tmp_path, path)
+
+    def _node(self, key):
+        node = self.position.get(key)
+        if node is None:
+            node = self.position[key] = len(self.keys)
+            self.keys.append(key)
+            self.parent.append(node)
+        return node
+
+    def find(self, node):
+        parent = self.parent
+        root = node
+        while parent[root] != root:
+            root = parent[root]
+        while parent[node] != root:
+            parent[node], node = root, parent[node]
+        return root
+
+    def union(self, a, b):
+        a, b = self.find(a), self.find(b)
+        if a != b:
+            # The older key stays the representative
+            if b < a:
+                a, b = b, a
+            self.parent[b] = a
+        return a
+
+    def add(self, keys):
+        """Link the keys of one author; returns the group's root node"""
+        nodes = [self._node(key) for key in keys]
+        if not nodes:
+            return None
+        root = nodes[0]
+        for node in nodes[1:]:
+            root = self.union(root, node)
+        return self.find(root)
+
+    def author_id(self, keys):
+        """Canonical id of the group holding these keys (None if unknown)"""
+        node = next((self.position[key] for key in keys if key in self.position), None)
+        return None if node is None else f'A{self.find(node):07d}'
+
+    def canonical_key(self, author_id):
+        """Oldest key of an author's group, e.g. 'login:...' or 'email:...' (fallback ids are returned as is)"""
+        if author_id.startswith('raw:'):
+            return author_id
+        return self.keys[int(author_id[1:])]
+
+    @property
+    def n_authors(self):
+        return len({self.find(i) for i in range(len(self.parent))})
+
+
+def _author_columns(df, email='author_email', name='author_name', login='author_login', scope='Platform'):
+    columns = {}
+    for key, col in (('email', email), ('name', name), ('login', login), ('scope', scope)):
+        columns[key] = df[col] if col in df.columns else pd.Series(None, index=df.index, dtype=object)
+    return pd.DataFrame(columns)
+
+
+def fallback_id(email):
+    """
+    Id of an author with no linkable key (e.g. root@localhost and a one-word
+    name): the raw email, as the per-email counts had it, so the commit
+    still counts. None when there is no email at all.
+    """
+    email = email.strip() if isinstance(email, str) else ''
+    return f'raw:{email}' if email else None
+
+
+def resolve_authors(df, index=None, email='author_email', name='author_name', login='author_login',
+                    scope='Platform'):
+    """
+    Add the authors of df to the index and return their author_id per row.
+    Names link only within the same `scope` column value. Authors without a
+    usable email, name or login keep their raw email (fallback_id), and
+    only commits without any email get NaN. Work is done once per distinct
+    (email, name, login, scope), not per commit.
+    """
+    index = index if index is not None else AuthorIndex()
+    authors = _author_columns(df, email, name, login, scope).astype(object)
+    authors = authors.where(authors.notna(), '')  # '' normalizes to no key
+    codes, uniques = pd.MultiIndex.from_frame(authors).factorize()
+
+    unique_keys = [identity_keys(*author) for author in uniques]
+    for keys in unique_keys:
+        index.add(keys)
+
+    ids = pd.Series([index.author_id(keys) if keys else fallback_id(author[0])
+                     for keys, author in zip(unique_keys, uniques)], dtype=object).to_numpy()
+    return pd.Series(ids[codes], index=df.index, name='author_id')
+
+
+def update_index(df, path=INDEX_FILE, **columns):
+    """Load the persisted index, resolve df's authors, save, return author_id"""
+    index = AuthorIndex.load(path)
+    before = len(index.keys)
+    author_ids = resolve_authors(df, index, **columns)
+    index.save(path)
+    print(f"🪪 Identity index: {len(index.keys) - before} new keys, {index.n_authors} authors ({path})")
+    return author_ids
+
+
+def main(commit_file='blockchain_commit_data_all_2021_2024.xlsx', path=INDEX_FILE):
+    print("=== AUTHOR IDENTITY RESOLUTION ===")
+    df = pd.read_excel(commit_file, sheet_name='Sheet1')
+    df['author_id'] = update_index(df, path)
+
+    for platform, group in df.groupby('Platform'):
+        emails = group['author_email'].nunique()
+        authors = group['author_id'].nunique()
+        print(f"  {platform}: {emails} author emails -> {authors} authors")
+
+
+if __name__ == "__main__":
+    main()
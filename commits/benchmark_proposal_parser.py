@@ -0,0 +1,171 @@
+import argparse
+import glob
+import os
+import time
+
+from proposal_metadata import parse_proposal
+
+# Usage:
+#   git clone https://github.com/ethereum/EIPs
+#   git clone https://github.com/bitcoin/bips
+#   python benchmark_proposal_parser.py --eips EIPs --bips bips
+
+
+def legacy_parse_eip_content(content, eip_number):
+    """Line-wise EIP parser previously used in get_eip_data.py (reference baseline)"""
+    try:
+        lines = content.split('\n')
+        metadata = {'eip_number': eip_number}
+
+        in_frontmatter = False
+        content_lines = []
+
+        for line in lines:
+            line_stripped = line.strip()
+
+            if line_stripped == '---':
+                in_frontmatter = not in_frontmatter
+                continue
+
+            if in_frontmatter and ':' in line:
+                try:
+                    key, value = line.split(':', 1)
+                    key = key.strip().lower()
+                    value = value.strip()
+
+                    if key in ['title', 'author', 'status', 'type', 'category', 'created', 'updated']:
+                        metadata[key] = value
+                except:
+                    continue
+            elif not in_frontmatter:
+                content_lines.append(line)
+
+        full_content = '\n'.join(content_lines)
+        metadata['content'] = full_content[:1000].replace('\n', ' ').strip()
+
+        return metadata
+
+    except Exception as e:
+        return {'eip_number': eip_number}
+
+
+def legacy_parse_bip_content(content, bip_number):
+    """Line-wise BIP parser previously used in get_eip_data.py (reference baseline)"""
+    try:
+        lines = content.split('\n')
+        metadata = {'bip_number': bip_number}
+
+        in_pre = False
+        content_lines = []
+
+        for line in lines:
+            line_stripped = line.strip()
+
+            if line_stripped == '<pre>':
+                in_pre = True
+                continue
+            elif line_stripped == '</pre>':
+                in_pre = False
+                continue
+
+            if in_pre and ':' in line:
+                try:
+                    key, value = line.split(':', 1)
+                    key = key.strip().lower()
+                    value = value.strip()
+
+                    if key in ['title', 'author', 'status', 'type', 'layer', 'created']:
+                        metadata[key] = value
+                except:
+                    continue
+            elif not in_pre:
+                content_lines.append(line)
+
+        full_content = '\n'.join(content_lines)
+        metadata['content'] = full_content[:1000].replace('\n', ' ').strip()
+
+        return metadata
+
+    except Exception as e:
+        return {'bip_number': bip_number}
+
+
+def load_documents(pattern, prefix, suffixes):
+    """Read every proposal file matching the pattern into memory"""
+    documents = []
+    for path in sorted(glob.glob(pattern)):
+        name = os.path.basename(path)
+        number = name[len(prefix):]
+        for suffix in suffixes:
+            if number.endswith(suffix):
+                number = number[:-len(suffix)]
+        if not number.isdigit():
+            continue
+        with open(path, encoding='utf-8', errors='replace') as f:
+            documents.append((int(number), f.read()))
+    return documents
+
+
+def time_parser(parse, documents, repeat):
+    """Return the best wall time over `repeat` passes and the last pass results"""
+    best = float('inf')
+    results = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [parse(content, number) for number, content in documents]
+        best = min(best, time.perf_counter() - start)
+    return best, results
+
+
+def compare(label, documents, legacy_parse, repeat):
+    """Benchmark the legacy parser against parse_proposal on one corpus"""
+    if not documents:
+        print(f"{label}: no documents found")
+        return
+
+    total_mb = sum(len(content) for _, content in documents) / 1024**2
+    legacy_time, legacy_results = time_parser(legacy_parse, documents, repeat)
+    new_time, new_results = time_parser(parse_proposal, documents, repeat)
+
+    status_match = sum(
+        1 for old, new in zip(legacy_results, new_results)
+        if old.get('status', '') == (new.status or '')
+    )
+    created_match = sum(
+        1 for old, new in zip(legacy_results, new_results)
+        if old.get('created', '')[:10] == (new.to_metadata().get('created', '') or '')[:10]
+    )
+    parsed_dates = sum(1 for record in new_results if record.created is not None)
+
+    print(f"\n=== {label} ===")
+    print(f"Documents: {len(documents)} ({total_mb:.1f} MB)")
+    print(f"Legacy line parser: {legacy_time:.3f}s ({len(documents) / legacy_time:,.0f} docs/s)")
+    print(f"Header parser:      {new_time:.3f}s ({len(documents) / new_time:,.0f} docs/s)")
+    print(f"Speedup: {legacy_time / new_time:.1f}x")
+    print(f"Status agreement: {status_match}/{len(documents)}")
+    print(f"Created agreement: {created_match}/{len(documents)}")
+    print(f"Typed created dates parsed: {parsed_dates}/{len(documents)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark proposal header parsing over local EIP/BIP checkouts")
+    parser.add_argument('--eips', help="Path to a clone of ethereum/EIPs")
+    parser.add_argument('--bips', help="Path to a clone of bitcoin/bips")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print("=== PROPOSAL PARSER BENCHMARK ===")
+
+    if args.eips:
+        eips = load_documents(os.path.join(args.eips, 'EIPS', 'eip-*.md'), 'eip-', ['.md'])
+        compare('Ethereum EIPs', eips, legacy_parse_eip_content, args.repeat)
+
+    if args.bips:
+        bips = load_documents(os.path.join(args.bips, 'bip-*'), 'bip-', ['.mediawiki', '.md'])
+        compare('Bitcoin BIPs', bips, legacy_parse_bip_content, args.repeat)
+
+    if not args.eips and not args.bips:
+        parser.print_help()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,383 @@
+import argparse
+import glob
+import hashlib
+import mmap
+import os
+import struct
+
+import numpy as np
+import pandas as pd
+
+# Parser for the blk*.dat files of Bitcoin-family nodes. Each file is a run of
+# records [4-byte network magic][uint32 block size][serialized block]; files
+# are memory-mapped and only the header and coinbase transaction of each
+# block are decoded, the rest is skipped using the record size.
+
+COIN = 100_000_000
+
+# Network magic as stored at the start of each record. Bitcoin Cash and
+# Bitcoin SV nodes keep Bitcoin's on-disk magic, so the platform must be
+# given explicitly for their files.
+CHAINS = {
+    'Bitcoin': {'magic': 'f9beb4d9', 'address_versions': (0x00, 0x05)},
+    'Bitcoin_Cash': {'magic': 'f9beb4d9', 'address_versions': (0x00, 0x05)},
+    'Bitcoin_SV': {'magic': 'f9beb4d9', 'address_versions': (0x00, 0x05)},
+    'Litecoin': {'magic': 'fbc0b6db', 'address_versions': (0x30, 0x32)},
+    'Dogecoin': {'magic': 'c0c0c0c0', 'address_versions': (0x1e, 0x16), 'auxpow': True},
+    'Dash': {'magic': 'bf0c6bbd', 'address_versions': (0x4c, 0x10), 'special_tx': True,
+             'x11_hash': True},
+    'Zcash': {'magic': '24e92764', 'address_versions': (b'\x1c\xb8', b'\x1c\xbd'), 'zcash': True,
+              'diff1_bits': 0x1f07ffff},
+}
+
+# Difficulty 1 target of the chains that report difficulty like Bitcoin Core
+DIFF1_BITS = 0x1d00ffff
+
+VERSION_AUXPOW = 1 << 8
+HEADER_BYTES = 80
+ZCASH_HEADER_BYTES = 140  # before the Equihash solution
+
+# Bitcoin Core >= 28 XORs block files with the key in blocks/xor.dat
+XOR_KEY_FILE = 'xor.dat'
+
+BLOCK_COLUMNS = ['Platform', 'file', 'offset', 'block_hash', 'prev_hash', 'merkle_root', 'version', 'time', 'bits',
+                 'difficulty', 'size', 'tx_count', 'coinbase_height', 'coinbase_script', 'coinbase_value',
+                 'payout_script', 'payout_address', 'auxpow']
+
+
+def dsha256(data):
+    return hashlib.sha256(hashlib.sha256(data).digest()).digest()
+
+
+def hash_hex(digest):
+    """Hashes are displayed byte-reversed"""
+    return bytes(digest)[::-1].hex()
+
+
+def bits_to_target(bits):
+    exponent, mantissa = bits >> 24, bits & 0x007fffff
+    return mantissa >> (8 * (3 - exponent)) if exponent <= 3 else mantissa << (8 * (exponent - 3))
+
+
+def difficulty_from_bits(bits, diff1_bits=DIFF1_BITS):
+    """Difficulty as reported by getdifficulty: diff1 target / block target"""
+    target = bits_to_target(int(bits))
+    return bits_to_target(diff1_bits) / target if target else float('nan')
+
+
+def read_compact_size(buf, pos):
+    first = buf[pos]
+    if first < 0xfd:
+        return first, pos + 1
+    if first == 0xfd:
+        return struct.unpack_from('<H', buf, pos + 1)[0], pos + 3
+    if first == 0xfe:
+        return struct.unpack_from('<I', buf, pos + 1)[0], pos + 5
+    return struct.unpack_from('<Q', buf, pos + 1)[0], pos + 9
+
+
+_B58 = '123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz'
+
+
+def base58check(payload):
+    data = payload + dsha256(payload)[:4]
+    number = int.from_bytes(data, 'big')
+    encoded = ''
+    while number:
+        number, rem = divmod(number, 58)
+        encoded = _B58[rem] + encoded
+    return '1' * (len(data) - len(data.lstrip(b'\0'))) + encoded
+
+
+def script_address(script, versions):
+    """Base58 address of a P2PKH or P2SH output script, else None"""
+    def prefix(version):
+        return version if isinstance(version, bytes) else bytes([version])
+    if len(script) == 25 and script[:3] == b'\x76\xa9\x14' and script[23:] == b'\x88\xac':
+        return base58check(prefix(versions[0]) + script[3:23])
+    if len(script) == 23 and script[:2] == b'\xa9\x14' and script[22] == 0x87:
+        return base58check(prefix(versions[1]) + script[2:22])
+    return None
+
+
+def bip34_height(script):
+    """Block height pushed at the start of a coinbase script (BIP34), else None"""
+    if not script:
+        return None
+    length = script[0]
+    if 1 <= length <= 8 and len(script) > length:
+        return int.from_bytes(script[1:1 + length], 'little', signed=False)
+    return None
+
+
+def parse_transaction(buf, pos, chain):
+    """
+    Decode one transaction starting at pos. Returns (end, info) where info
+    holds the first input's script and the outputs; end is None when the
+    rest of a shielded (Zcash) transaction was not decoded.
+    """
+    start = pos
+    header = struct.unpack_from('<I', buf, pos)[0]
+    pos += 4
+    version, tx_type = header, 0
+    if chain.get('zcash'):
+        overwintered = header >> 31
+        version = header & 0x7fffffff
+        if overwintered:
+            pos += 4  # nVersionGroupId
+            if version >= 5:
+                pos += 12  # consensus branch id, lock time, expiry height
+    elif chain.get('special_tx'):
+        version, tx_type = header & 0xffff, header >> 16
+
+    segwit = buf[pos] == 0 and buf[pos + 1] != 0 and not chain.get('zcash')
+    if segwit:
+        pos += 2
+
+    n_inputs, pos = read_compact_size(buf, pos)
+    first_script = b''
+    for i in range(n_inputs):
+        pos += 36  # previous output
+        length, pos = read_compact_size(buf, pos)
+        if i == 0:
+            first_script = bytes(buf[pos:pos + length])
+        pos += length + 4  # script, sequence
+
+    n_outputs, pos = read_compact_size(buf, pos)
+    outputs = []
+    for _ in range(n_outputs):
+        value = struct.unpack_from('<q', buf, pos)[0]
+        length, pos = read_compact_size(buf, pos + 8)
+        outputs.append((value, bytes(buf[pos:pos + length])))
+        pos += length
+
+    info = {'script': first_script, 'outputs': outputs, 'payload': None, 'txid': None}
+    if chain.get('zcash'):
+        return None, info  # shielded parts follow; not needed for the coinbase
+
+    if segwit:
+        for _ in range(n_inputs):
+            n_items, pos = read_compact_size(buf, pos)
+            for _ in range(n_items):
+                length, pos = read_compact_size(buf, pos)
+                pos += length
+    pos += 4  # lock time
+    if tx_type and version >= 3:
+        length, pos = read_compact_size(buf, pos)
+        info['payload'] = bytes(buf[pos:pos + length])
+        pos += length
+    if not segwit:
+        info['txid'] = dsha256(buf[start:pos])
+    return pos, info
+
+
+def skip_auxpow(buf, pos, chain):
+    """Skip the merged-mining proof that follows an AuxPoW header"""
+    pos, _ = parse_transaction(buf, pos, chain)  # parent coinbase
+    pos += 32  # parent block hash
+    for _ in range(2):  # coinbase branch, blockchain branch
+        n_hashes, pos = read_compact_size(buf, pos)
+        pos += 32 * n_hashes + 4
+    return pos + HEADER_BYTES  # parent block header
+
+
+def parse_block(buf, offset, size, platform, chain=None):
+    """Decode the header and coinbase of the block stored at buf[offset:offset+size]"""
+    chain = chain or CHAINS[platform]
+    pos = offset
+    version = struct.unpack_from('<i', buf, pos)[0]
+    prev_hash, merkle_root = buf[pos + 4:pos + 36], buf[pos + 36:pos + 68]
+
+    if chain.get('zcash'):
+        block_time, bits = struct.unpack_from('<II', buf, pos + 100)
+        length, end = read_compact_size(buf, pos + ZCASH_HEADER_BYTES)
+        header_end = end + length
+    else:
+        block_time, bits = struct.unpack_from('<II', buf, pos + 68)
+        header_end = pos + HEADER_BYTES
+
+    block_hash = None if chain.get('x11_hash') else hash_hex(dsha256(buf[pos:header_end]))
+    pos = header_end
+    auxpow = bool(chain.get('auxpow') and version & VERSION_AUXPOW)
+    if auxpow:
+        pos = skip_auxpow(buf, pos, chain)
+
+    tx_count, pos = read_compact_size(buf, pos)
+    _, coinbase = parse_transaction(buf, pos, chain)
+
+    base_version = version & 0xff if chain.get('auxpow') else version
+    height = bip34_height(coinbase['script']) if base_version >= 2 else None
+    if coinbase['payload'] is not None and len(coinbase['payload']) >= 6:
+        height = struct.unpack_from('<I', coinbase['payload'], 2)[0]  # Dash CbTx height
+
+    outputs = coinbase['outputs']
+    payout = next((script for value, script in outputs if value > 0), outputs[0][1] if outputs else b'')
+    return {
+        'Platform': platform,
+        'block_hash': block_hash,
+        'prev_hash': hash_hex(prev_hash),
+        'merkle_root': hash_hex(merkle_root),
+        'version': version,
+        'time': block_time,
+        'bits': bits,
+        'difficulty': difficulty_from_bits(bits, chain.get('diff1_bits', DIFF1_BITS)),
+        'size': size,
+        'tx_count': tx_count,
+        'coinbase_height': height,
+        'coinbase_script': coinbase['script'].hex(),
+        'coinbase_value': sum(value for value, _ in outputs) / COIN,
+        'payout_script': payout.hex(),
+        'payout_address': script_address(payout, chain['address_versions']),
+        'auxpow': auxpow,
+        'coinbase_txid': coinbase['txid'],
+    }
+
+
+def read_xor_key(blocks_dir):
+    """Bitcoin Core's block-file obfuscation key (None when absent or all zero)"""
+    path = os.path.join(blocks_dir, XOR_KEY_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        key = f.read()
+    return key if any(key) else None
+
+
+def open_block_file(path, xor_key=None):
+    """
+    Memory-map a block file read-only. Obfuscated files are read and
+    de-XORed in one NumPy pass instead (returns a bytearray).
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b''
+        if xor_key is None:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        data = np.frombuffer(f.read(), dtype=np.uint8)
+    key = np.frombuffer(xor_key, dtype=np.uint8)
+    return bytearray((data ^ np.resize(key, len(data))).tobytes())
+
+
+def iter_records(buf, magic):
+    """(offset, size) of each block record; stops at zero padding or a foreign magic"""
+    magic = bytes.fromhex(magic)
+    pos, end = 0, len(buf)
+    while pos + 8 <= end:
+        if buf[pos:pos + 4] != magic:
+            if not any(buf[pos:pos + 4]):
+                break  # preallocated tail of the newest file
+            raise ValueError(f"unexpected magic {bytes(buf[pos:pos + 4]).hex()} at offset {pos}")
+        size = struct.unpack_from('<I', buf, pos + 4)[0]
+        if pos + 8 + size > end:
+            break  # block still being written
+        yield pos + 8, size
+        pos += 8 + size
+
+
+def parse_file(path, platform, xor_key=None):
+    """Blocks of one blk*.dat file as a DataFrame (columns BLOCK_COLUMNS)"""
+    chain = CHAINS[platform]
+    buf = open_block_file(path, xor_key)
+    rows = []
+    try:
+        for offset, size in iter_records(buf, chain['magic']):
+            try:
+                record = parse_block(buf, offset, size, platform, chain)
+            except (struct.error, IndexError) as e:
+                print(f"⚠️  {os.path.basename(path)}: undecodable block at offset {offset}: {e}")
+                continue
+            record.pop('coinbase_txid')
+            record['file'] = os.path.basename(path)
+            record['offset'] = offset
+            rows.append(record)
+    finally:
+        if isinstance(buf, mmap.mmap):
+            buf.close()
+    df = pd.DataFrame(rows, columns=BLOCK_COLUMNS)
+    return df.astype({'coinbase_height': 'Int64'})
+
+
+def block_files(blocks_dir):
+    """blk*.dat files of a node's blocks directory in file-number order"""
+    return sorted(glob.glob(os.path.join(blocks_dir, 'blk*.dat')))
+
+
+# Bitcoin's genesis block, the offline fixture for self_check()
+GENESIS_BLOCK_HEX = (
+    '0100000000000000000000000000000000000000000000000000000000000000000000003ba3edfd7a7b12b27ac72c3e67768f61'
+    '7fc81bc3888a51323a9fb8aa4b1e5e4a29ab5f49ffff001d1dac2b7c0101000000010000000000000000000000000000000000'
+    '000000000000000000000000000000ffffffff4d04ffff001d0104455468652054696d65732030332f4a616e2f32303039204368'
+    '616e63656c6c6f72206f6e206272696e6b206f66207365636f6e64206261696c6f757420666f722062616e6b73ffffffff0100f2'
+    '052a01000000434104678afdb0fe5548271967f1a67130b7105cd6a828e03909a67962e0ea1f61deb649f6bc3f4cef38c4f35504'
+    'e51ec112de5c384df7ba0b8d578a4c702b6bf11d5fac00000000'
+)
+GENESIS_HASH = '000000000019d6689c085ae165831e934ff763ae46a2a6c172b3f1b60a8ce26f'
+GENESIS_MERKLE_ROOT = '4a5e1e4baab89f3a32518a88c31bc87f618f76673e2cc77ab2127b7afdeda33b'
+
+
+def fixture_file(path, blocks, platform='Bitcoin', padding=64):
+    """Write blocks (bytes) as a blk*.dat file with a zero-padded tail"""
+    magic = bytes.fromhex(CHAINS[platform]['magic'])
+    with open(path, 'wb') as f:
+        for block in blocks:
+            f.write(magic + struct.pack('<I', len(block)) + block)
+        f.write(b'\0' * padding)
+    return path
+
+
+def self_check(directory=None):
+    """Parse the genesis fixture, plain and XOR-obfuscated; returns True if all checks pass"""
+    import tempfile
+    directory = directory or tempfile.mkdtemp(prefix='blk_fixture_')
+    genesis = bytes.fromhex(GENESIS_BLOCK_HEX)
+    path = fixture_file(os.path.join(directory, 'blk00000.dat'), [genesis, genesis])
+
+    key = bytes(range(1, 9))
+    data = np.frombuffer(open(path, 'rb').read(), dtype=np.uint8)
+    xored = os.path.join(directory, 'blk00001.dat')
+    with open(xored, 'wb') as f:
+        f.write((data ^ np.resize(np.frombuffer(key, dtype=np.uint8), len(data))).tobytes())
+
+    record = parse_block(genesis, 0, len(genesis), 'Bitcoin')
+    checks = {
+        'block hash': record['block_hash'] == GENESIS_HASH,
+        'merkle root': record['merkle_root'] == GENESIS_MERKLE_ROOT,
+        'coinbase txid = merkle root': hash_hex(record['coinbase_txid']) == GENESIS_MERKLE_ROOT,
+        'time': record['time'] == 1231006505,
+        'difficulty': record['difficulty'] == 1.0,
+        'reward': record['coinbase_value'] == 50.0,
+        'coinbase text': b'The Times 03/Jan/2009' in bytes.fromhex(record['coinbase_script']),
+    }
+    plain, obfuscated = parse_file(path, 'Bitcoin'), parse_file(xored, 'Bitcoin', key)
+    checks['file records'] = len(plain) == 2 and list(plain['offset']) == [8, 8 + len(genesis) + 8]
+    checks['xor key'] = plain.drop(columns='file').equals(obfuscated.drop(columns='file'))
+
+    for name, ok in checks.items():
+        if not ok:
+            print(f"   ❌ {name}")
+    print(f"{'✅' if all(checks.values()) else '❌'} blk parser self-check: "
+          f"{sum(checks.values())}/{len(checks)} checks passed")
+    return all(checks.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse Bitcoin-family blk*.dat files")
+    parser.add_argument('files', nargs='*', help="blk*.dat files")
+    parser.add_argument('--platform', choices=sorted(CHAINS), default='Bitcoin')
+    parser.add_argument('--output', help="csv for the parsed blocks")
+    parser.add_argument('--self-check', action='store_true', help="parse the genesis-block fixture")
+    args = parser.parse_args()
+
+    if args.self_check and not self_check():
+        raise SystemExit(1)
+    if args.files:
+        xor_key = read_xor_key(os.path.dirname(os.path.abspath(args.files[0])))
+        df = pd.concat([parse_file(path, args.platform, xor_key) for path in args.files], ignore_index=True)
+        print(f"✅ {len(df):,} {args.platform} blocks from {len(args.files)} files")
+        if args.output:
+            df.to_csv(args.output, index=False)
+            print(f"💾 Saved: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
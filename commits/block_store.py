@@ -0,0 +1,230 @@
+import argparse
+import json
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from blk_parser import CHAINS, block_files, parse_file, read_xor_key
+from header_decoder import header_frame
+
+# Local block store: one columnar file per parsed blk*.dat file under
+# block_store/<Platform>/, plus a manifest of each source file's size and
+# modification time so re-ingesting a node directory only parses new or
+# grown files. Header-only partitions (header_decoder, no coinbase outputs)
+# are enough for heights and hashrate; a full ingest upgrades them.
+
+STORE_DIR = 'block_store'
+MANIFEST = 'manifest.json'
+
+try:
+    import pyarrow  # noqa: F401
+    PARTITION_FORMAT = 'parquet'
+except ImportError:
+    PARTITION_FORMAT = 'pkl'
+
+# Columns of the block table written by get_block_data.py
+BLOCK_TABLE_COLUMNS = ['Platform', 'block_id', 'block_hash', 'block_time', 'block_date', 'block_size',
+                       'transaction_count', 'difficulty', 'miner', 'reward', 'fee_total',
+                       'coinbase_script', 'payout_address']
+
+
+def chain_heights(hashes, prev_hashes, coinbase_heights):
+    """
+    Height of every block by walking prev-hash links back to a block of
+    known height: the genesis block (null parent) or a block whose coinbase
+    carries its height (BIP34 / Dash CbTx). Blocks whose ancestry never
+    reaches a known height get NaN. Stale blocks get their fork height.
+    """
+    n = len(hashes)
+    heights = np.full(n, -1, dtype=np.int64)
+    index = {h: i for i, h in enumerate(hashes) if isinstance(h, str)}
+    parents = np.array([index.get(p, -1) for p in prev_hashes], dtype=np.int64)
+    genesis_parent = '0' * 64
+
+    known = pd.array(coinbase_heights, dtype='Int64')
+    for i in range(n):
+        if prev_hashes[i] == genesis_parent:
+            heights[i] = 0
+        elif not pd.isna(known[i]):
+            heights[i] = known[i]
+
+    for i in range(n):
+        if heights[i] >= 0:
+            continue
+        path = []
+        node = i
+        while node >= 0 and heights[node] == -1:
+            path.append(node)
+            heights[node] = -2  # on the current walk; also guards against cycles
+            node = parents[node]
+        base = heights[node] if node >= 0 else -2
+        for step, member in enumerate(reversed(path), 1):
+            heights[member] = base + step if base >= 0 else -2  # -2: unreachable
+
+    out = pd.array(heights, dtype='Int64')
+    out[heights < 0] = pd.NA
+    return out
+
+
+class BlockStore:
+    def __init__(self, root=STORE_DIR, fmt=PARTITION_FORMAT):
+        self.root = root
+        self.fmt = fmt
+        self.manifest_path = os.path.join(root, MANIFEST)
+        self.manifest = self._read_manifest()
+
+    def _read_manifest(self):
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        return {}
+
+    def _write_manifest(self):
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _partition_path(self, platform, source):
+        stem = os.path.splitext(os.path.basename(source))[0]
+        return os.path.join(self.root, platform, f'{stem}.{self.fmt}')
+
+    def _write_partition(self, path, df):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + '.tmp'
+        if self.fmt == 'parquet':
+            df.to_parquet(tmp_path, index=False)
+        else:
+            df.to_pickle(tmp_path)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _read_partition(path, columns=None):
+        if path.endswith('.parquet'):
+            return pd.read_parquet(path, columns=columns)
+        df = pd.read_pickle(path)
+        return df[columns] if columns else df
+
+    def ingest_file(self, platform, path, xor_key=None, force=False, headers_only=False, workers=None):
+        """
+        Parse one blk*.dat file unless the manifest shows it unchanged;
+        returns blocks parsed. headers_only decodes just the header columns
+        with header_decoder (vectorized, `workers` processes) instead of
+        parsing every coinbase.
+        """
+        stat = os.stat(path)
+        entry = self.manifest.setdefault(platform, {}).get(os.path.basename(path))
+        signature = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+        detail = 'headers' if headers_only else 'full'
+        if (not force and entry and {k: entry[k] for k in signature} == signature
+                and (headers_only or entry.get('detail', 'full') == 'full')):
+            return 0
+
+        df = header_frame(path, platform, xor_key, workers) if headers_only else parse_file(path, platform, xor_key)
+        partition = self._partition_path(platform, path)
+        self._write_partition(partition, df)
+        self.manifest[platform][os.path.basename(path)] = {**signature, 'blocks': len(df), 'detail': detail,
+                                                           'partition': os.path.relpath(partition, self.root)}
+        self._write_manifest()
+        return len(df)
+
+    def ingest_dir(self, platform, blocks_dir, force=False, headers_only=False, workers=None):
+        """Ingest every new or grown blk*.dat file of a node's blocks directory"""
+        if platform not in CHAINS:
+            raise ValueError(f"Unsupported platform {platform!r}; expected one of {sorted(CHAINS)}")
+        files = block_files(blocks_dir)
+        if not files:
+            print(f"⚠️  No blk*.dat files in {blocks_dir}")
+            return 0
+        xor_key = read_xor_key(blocks_dir)
+        parsed = 0
+        for path in files:
+            n = self.ingest_file(platform, path, xor_key, force, headers_only, workers)
+            if n:
+                print(f"   🔄 {platform}: {os.path.basename(path)} -> {n:,} blocks")
+            parsed += n
+        print(f"✅ {platform}: {parsed:,} blocks parsed, "
+              f"{sum(e['blocks'] for e in self.manifest[platform].values()):,} in store")
+        return parsed
+
+    def platforms(self):
+        return sorted(self.manifest)
+
+    def load(self, platform, columns=None):
+        """All stored blocks of a platform with heights resolved, in height order"""
+        entries = self.manifest.get(platform, {})
+        needed = None if columns is None else list(dict.fromkeys(
+            list(columns) + ['block_hash', 'prev_hash', 'coinbase_height']))
+        frames = [self._read_partition(os.path.join(self.root, e['partition']), needed)
+                  for _, e in sorted(entries.items())]
+        if not frames:
+            return pd.DataFrame(columns=needed or [])
+        df = pd.concat(frames, ignore_index=True)
+        df['height'] = chain_heights(df['block_hash'].tolist(), df['prev_hash'].tolist(),
+                                     df['coinbase_height'].tolist())
+        return df.sort_values(['height', 'time'] if 'time' in df.columns else 'height',
+                              kind='stable').reset_index(drop=True)
+
+    def block_table(self, platform, start_date=None, end_date=None):
+        """Stored blocks in the layout of get_block_data.py's block table (needs a full ingest)"""
+        partial = [name for name, e in self.manifest.get(platform, {}).items() if e.get('detail') == 'headers']
+        if partial:
+            raise ValueError(f"{platform}: {len(partial)} files were ingested headers-only; re-ingest them in full")
+        df = self.load(platform)
+        when = pd.to_datetime(df['time'], unit='s', utc=True).dt.tz_localize(None)
+        table = pd.DataFrame({
+            'Platform': platform,
+            'block_id': df['height'],
+            'block_hash': df['block_hash'],
+            'block_time': when.dt.strftime('%Y-%m-%d %H:%M:%S'),
+            'block_date': when.dt.strftime('%Y-%m-%d'),
+            'block_size': df['size'],
+            'transaction_count': df['tx_count'],
+            'difficulty': df['difficulty'],
+            'miner': 'Unknown',
+            'reward': df['coinbase_value'],
+            'fee_total': np.nan,  # needs every transaction's inputs
+            'coinbase_script': df['coinbase_script'],
+            'payout_address': df['payout_address'],
+        })
+        if start_date:
+            table = table[table['block_date'] >= start_date]
+        if end_date:
+            table = table[table['block_date'] <= end_date]
+        return table[BLOCK_TABLE_COLUMNS].reset_index(drop=True)
+
+
+def parse_node_dirs(values):
+    """['Bitcoin=/path/blocks', ...] -> {'Bitcoin': '/path/blocks'}"""
+    dirs = {}
+    for value in values or []:
+        platform, _, path = value.partition('=')
+        if not path:
+            raise ValueError(f"Expected PLATFORM=PATH, got {value!r}")
+        dirs[platform] = os.path.expanduser(path)
+    return dirs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest node blk*.dat files into the local block store")
+    parser.add_argument('node_dirs', nargs='+', metavar='PLATFORM=BLOCKS_DIR')
+    parser.add_argument('--store', default=STORE_DIR)
+    parser.add_argument('--force', action='store_true', help="re-parse unchanged files")
+    parser.add_argument('--headers-only', action='store_true',
+                        help="decode header columns only (heights, hashrate), skipping coinbase outputs")
+    parser.add_argument('--workers', type=int, default=None, help="header decoder processes (default: all cores)")
+    args = parser.parse_args()
+
+    print("=== BLOCK STORE INGESTION ===")
+    store = BlockStore(args.store)
+    started = datetime.now(timezone.utc)
+    for platform, blocks_dir in parse_node_dirs(args.node_dirs).items():
+        store.ingest_dir(platform, blocks_dir, args.force, args.headers_only, args.workers)
+    print(f"⏱️  {(datetime.now(timezone.utc) - started).total_seconds():.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,23 @@
+import argparse
 import pandas as pd
 import numpy as np
 from datetime import datetime
 import math
 from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
 
+from time_buckets import (BUCKET_KEYS, DEFAULT_WINDOW, GRANULARITIES, bucket_label, concentration_metrics,
+                          daily_counts, rollup)
+from rolling_concentration import rolling_concentration
+from author_identity import INDEX_FILE, update_index
+
 def clean_illegal_chars(df):
     """Remove illegal characters from all string cells in a DataFrame"""
     return df.map(lambda x: ILLEGAL_CHARACTERS_RE.sub('', x) if isinstance(x, str) else x)
 
 def standardize_platform_names(df):
     """Standardize platform names between block and commit data"""
+    if isinstance(df['Platform'].dtype, pd.CategoricalDtype):
+        df['Platform'] = df['Platform'].astype(object)  # compacted frames: replace can't add categories
     df['Platform'] = df['Platform'].replace({
         'Ethereum_Go': 'Ethereum',
         'Bitcoin_Cash': 'Bitcoin_Cash',  # Keep as is
@@ -48,10 +56,8 @@ def calculate_shannon_entropy(proportions):
     entropy = -np.sum(proportions * np.log(proportions))
     return entropy
 
-def process_block_data(file_path):
-    """
-    Process block-level data to calculate weekly decentralization metrics
-    """
+def daily_block_counts(file_path):
+    """Blocks per platform, day and miner from the block-level file"""
     print("Processing block-level data...")
     
     # Read the Excel file
@@ -60,47 +66,14 @@ def process_block_data(file_path):
     # Standardize platform names
     df = standardize_platform_names(df)
     
-    # Convert block_date to datetime
-    df['block_date'] = pd.to_datetime(df['block_date'])
-    
-    # Extract year and week
-    df['year'] = df['block_date'].dt.isocalendar().year
-    df['week'] = df['block_date'].dt.isocalendar().week
-    
-    # Group by platform, year, week, and miner to count blocks per miner
-    miner_blocks = df.groupby(['Platform', 'year', 'week', 'miner']).size().reset_index(name='block_count')
-    
-    # Calculate total blocks per platform per week
-    weekly_totals = miner_blocks.groupby(['Platform', 'year', 'week'])['block_count'].sum().reset_index(name='total_blocks')
-    
-    # Merge to get proportions
-    miner_blocks = miner_blocks.merge(weekly_totals, on=['Platform', 'year', 'week'])
-    miner_blocks['proportion'] = miner_blocks['block_count'] / miner_blocks['total_blocks']
-    
-    # Calculate metrics for each platform-year-week combination
-    block_metrics = []
-    
-    for (platform, year, week), group in miner_blocks.groupby(['Platform', 'year', 'week']):
-        proportions = group['proportion'].values
-        
-        inverse_hhi = calculate_inverse_hhi(proportions)
-        shannon_entropy = calculate_shannon_entropy(proportions)
-        
-        block_metrics.append({
-            'Platform': platform,
-            'Year': year,
-            'Week': week,
-            'Block_Inverse_HHI': inverse_hhi,
-            'Block_Shannon_Entropy': shannon_entropy,
-            'Total_Blocks': group['total_blocks'].iloc[0],
-            'Unique_Miners': len(group)
-        })
-    
-    return pd.DataFrame(block_metrics)
+    return daily_counts(df, 'block_date', 'miner')
 
-def process_commit_data(file_path):
+def daily_commit_counts(file_path, identity_index=INDEX_FILE):
     """
-    Process commit-level data to calculate weekly decentralization metrics
+    Commits per platform, day and author from the commit-level file. Authors
+    are resolved through the identity index (emails, GitHub logins and, within
+    one platform, names of one developer share an author_id);
+    identity_index=None counts raw emails instead.
     """
     print("Processing commit-level data...")
     
@@ -110,67 +83,69 @@ def process_commit_data(file_path):
     # Standardize platform names
     df = standardize_platform_names(df)
     
-    # Convert commit_date to datetime
-    df['commit_date'] = pd.to_datetime(df['commit_date'])
-    
-    # Extract year and week
-    df['year'] = df['commit_date'].dt.isocalendar().year
-    df['week'] = df['commit_date'].dt.isocalendar().week
-    
-    # Group by platform, year, week, and author to count commits per author
-    author_commits = df.groupby(['Platform', 'year', 'week', 'author_email']).size().reset_index(name='commit_count')
-    
-    # Calculate total commits per platform per week
-    weekly_totals = author_commits.groupby(['Platform', 'year', 'week'])['commit_count'].sum().reset_index(name='total_commits')
-    
-    # Merge to get proportions
-    author_commits = author_commits.merge(weekly_totals, on=['Platform', 'year', 'week'])
-    author_commits['proportion'] = author_commits['commit_count'] / author_commits['total_commits']
-    
-    # Calculate metrics for each platform-year-week combination
-    commit_metrics = []
-    
-    for (platform, year, week), group in author_commits.groupby(['Platform', 'year', 'week']):
-        proportions = group['proportion'].values
-        
-        inverse_hhi = calculate_inverse_hhi(proportions)
-        shannon_entropy = calculate_shannon_entropy(proportions)
-        
-        commit_metrics.append({
-            'Platform': platform,
-            'Year': year,
-            'Week': week,
-            'Commit_Inverse_HHI': inverse_hhi,
-            'Commit_Shannon_Entropy': shannon_entropy,
-            'Total_Commits': group['total_commits'].iloc[0],
-            'Unique_Authors': len(group)
-        })
-    
-    return pd.DataFrame(commit_metrics)
+    if identity_index:
+        df['author_id'] = update_index(df, identity_index)
+        # Total_Commits may not fall below the --raw-emails run: every commit
+        # with an email needs an author_id (commits without one can still be
+        # counted through a name or login)
+        lost = int((df['author_email'].notna() & df['author_id'].isna()).sum())
+        if lost:
+            raise ValueError(f"Identity resolution left {lost} commits with an author email unassigned")
+    else:
+        df['author_id'] = df['author_email']
+    
+    return daily_counts(df, 'commit_date', 'author_id')
+
+def block_metrics_from_daily(daily, granularity='week', window=DEFAULT_WINDOW):
+    """Block decentralization metrics per time bucket from daily miner counts"""
+    if granularity == 'rolling':
+        return rolling_concentration(daily, 'miner', 'Block', 'Blocks', 'Miners', window)
+    miner_blocks = rollup(daily, granularity, by=['miner'], window=window)
+    return concentration_metrics(miner_blocks, BUCKET_KEYS[granularity], 'Block', 'Blocks', 'Miners')
+
+def commit_metrics_from_daily(daily, granularity='week', window=DEFAULT_WINDOW):
+    """Commit decentralization metrics per time bucket from daily author counts"""
+    if granularity == 'rolling':
+        return rolling_concentration(daily, 'author_id', 'Commit', 'Commits', 'Authors', window)
+    author_commits = rollup(daily, granularity, by=['author_id'], window=window)
+    return concentration_metrics(author_commits, BUCKET_KEYS[granularity], 'Commit', 'Commits', 'Authors')
+
+def process_block_data(file_path, granularity='week', window=DEFAULT_WINDOW):
+    """
+    Process block-level data to calculate decentralization metrics
+    (weekly by default; see time_buckets.GRANULARITIES). Rolling windows
+    are updated incrementally and add Gini and Nakamoto coefficients.
+    """
+    return block_metrics_from_daily(daily_block_counts(file_path), granularity, window)
 
-def combine_metrics(block_metrics, commit_metrics):
+def process_commit_data(file_path, granularity='week', window=DEFAULT_WINDOW, identity_index=INDEX_FILE):
+    """
+    Process commit-level data to calculate decentralization metrics
+    (weekly by default; see time_buckets.GRANULARITIES). Rolling windows
+    are updated incrementally and add Gini and Nakamoto coefficients.
+    """
+    return commit_metrics_from_daily(daily_commit_counts(file_path, identity_index), granularity, window)
+
+def combine_metrics(block_metrics, commit_metrics, keys=BUCKET_KEYS['week']):
     """
     Combine block and commit metrics into final table
     """
     print("Combining block and commit metrics...")
+    keys = ['Platform'] + list(keys)
     
-    # Merge on Platform, Year, Week
-    combined = pd.merge(
-        block_metrics[['Platform', 'Year', 'Week', 'Block_Inverse_HHI', 'Block_Shannon_Entropy', 'Total_Blocks', 'Unique_Miners']],
-        commit_metrics[['Platform', 'Year', 'Week', 'Commit_Inverse_HHI', 'Commit_Shannon_Entropy', 'Total_Commits', 'Unique_Authors']],
-        on=['Platform', 'Year', 'Week'],
-        how='outer'
-    )
+    # Merge on Platform and the bucket keys (Year, Week by default); rolling
+    # windows also carry Gini and Nakamoto columns
+    combined = pd.merge(block_metrics, commit_metrics, on=keys, how='outer')
     
     # Fill NaN values with 0
     combined = combined.fillna(0)
     
-    # Sort by Platform, Year, Week
-    combined = combined.sort_values(['Platform', 'Year', 'Week']).reset_index(drop=True)
+    # Sort by Platform and bucket
+    combined = combined.sort_values(keys).reset_index(drop=True)
     
     return combined
 
-def create_summary_statistics(combined_df):
+def create_summary_statistics(combined_df, periods='Weeks'):
     """
     Create summary statistics for the metrics
     """
@@ -181,7 +156,7 @@ def create_summary_statistics(combined_df):
         
         stats = {
             'Platform': platform,
-            'Total_Weeks': len(platform_data),
+            f'Total_{periods}': len(platform_data),
             'Avg_Block_Inverse_HHI': platform_data['Block_Inverse_HHI'].mean(),
             'Avg_Block_Shannon_Entropy': platform_data['Block_Shannon_Entropy'].mean(),
             'Avg_Commit_Inverse_HHI': platform_data['Commit_Inverse_HHI'].mean(),
@@ -195,43 +170,73 @@ def create_summary_statistics(combined_df):
     
     return pd.DataFrame(summary_stats)
 
+# Output file and summary label per granularity; weekly keeps the
+# file name the integration scripts read
+OUTPUT_FILES = {
+    'week': 'blockchain_decentralization_metrics_weekly_2021_2024_fixed.xlsx',
+}
+PERIOD_NAMES = {'day': 'Days', 'week': 'Weeks', 'month': 'Months', 'rolling': 'Windows'}
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Decentralization metrics per time bucket")
+    parser.add_argument('--granularity', nargs='+', choices=GRANULARITIES, default=['week'],
+                        help="one or more of day, week, month, rolling (default: week)")
+    parser.add_argument('--window', type=int, default=DEFAULT_WINDOW, help="weeks per rolling window")
+    parser.add_argument('--identity-index', default=INDEX_FILE,
+                        help="author identity index to resolve and update (default: %(default)s)")
+    parser.add_argument('--raw-emails', action='store_true', help="count raw author emails as authors")
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
     print("=== BLOCKCHAIN DECENTRALIZATION METRICS CALCULATION ===")
     
     # File paths
     block_data_file = 'blockchain_block_data_real_2021_2024.xlsx'
     commit_data_file = 'blockchain_commit_data_all_2021_2024.xlsx'
     
+    # Reduce the raw rows once; every granularity rolls up these daily counts
+    block_daily = daily_block_counts(block_data_file)
+    commit_daily = daily_commit_counts(commit_data_file, None if args.raw_emails else args.identity_index)
+    print(f"Reduced to {len(block_daily)} daily miner counts and {len(commit_daily)} daily author counts")
+    
+    for granularity in args.granularity:
+        write_metrics(block_daily, commit_daily, granularity, args.window)
+
+def write_metrics(block_daily, commit_daily, granularity, window=DEFAULT_WINDOW):
+    label = bucket_label(granularity, window)
+    period = PERIOD_NAMES[granularity][:-1].lower()
+    
     # Process block data
-    block_metrics = process_block_data(block_data_file)
-    print(f"Calculated block metrics for {len(block_metrics)} platform-week combinations")
+    block_metrics = block_metrics_from_daily(block_daily, granularity, window)
+    print(f"Calculated block metrics for {len(block_metrics)} platform-{period} combinations")
     
     # Process commit data
-    commit_metrics = process_commit_data(commit_data_file)
-    print(f"Calculated commit metrics for {len(commit_metrics)} platform-week combinations")
+    commit_metrics = commit_metrics_from_daily(commit_daily, granularity, window)
+    print(f"Calculated commit metrics for {len(commit_metrics)} platform-{period} combinations")
     
     # Combine metrics
-    combined_metrics = combine_metrics(block_metrics, commit_metrics)
+    combined_metrics = combine_metrics(block_metrics, commit_metrics, BUCKET_KEYS[granularity])
     print(f"Combined metrics: {len(combined_metrics)} total records")
     
     # Create summary statistics
-    summary_stats = create_summary_statistics(combined_metrics)
+    summary_stats = create_summary_statistics(combined_metrics, PERIOD_NAMES[granularity])
     
     # Clean data before saving
     combined_metrics = clean_illegal_chars(combined_metrics)
     summary_stats = clean_illegal_chars(summary_stats)
     
     # Save to Excel
-    output_file = 'blockchain_decentralization_metrics_weekly_2021_2024_fixed.xlsx'
+    output_file = OUTPUT_FILES.get(granularity, f'blockchain_decentralization_metrics_{label}_2021_2024.xlsx')
     with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
-        combined_metrics.to_excel(writer, sheet_name='Weekly_Metrics', index=False)
+        combined_metrics.to_excel(writer, sheet_name=f'{label.capitalize()}_Metrics', index=False)
         summary_stats.to_excel(writer, sheet_name='Summary_Statistics', index=False)
     
     print(f"\n=== CALCULATION COMPLETE ===")
     print(f"Results saved to: {output_file}")
     
     # Print sample results
-    print(f"\nSample of weekly metrics:")
+    print(f"\nSample of {label} metrics:")
     print(combined_metrics.head(10).to_string())
     
     print(f"\nSummary statistics by platform:")
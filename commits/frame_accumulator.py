@@ -0,0 +1,134 @@
+import glob
+import os
+import tracemalloc
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    PARTITION_FORMAT = 'parquet'
+except ImportError:
+    PARTITION_FORMAT = 'pkl'
+
+# Accumulates DataFrame chunks (one per API page, repository, year, ...) and
+# concatenates them once at the end, instead of growing a frame with
+# pd.concat inside the loop, which copies everything collected so far on
+# every iteration. With spill_dir set, buffered chunks are written out as
+# numbered partitions once they pass spill_rows, so memory stays bounded by
+# one partition; frame() then reads the partitions back in order.
+
+
+def chunk_mb(df):
+    return float(df.memory_usage(deep=True).sum()) / 1024**2
+
+
+class FrameAccumulator:
+    def __init__(self, name='frames', spill_dir=None, spill_rows=1_000_000, fmt=PARTITION_FORMAT):
+        self.name = name
+        self.spill_dir = spill_dir
+        self.spill_rows = spill_rows
+        self.fmt = fmt
+        self.chunks = []
+        self.partitions = []
+        self.n_chunks = 0
+        self.rows = 0
+        self.buffered_rows = 0
+        self.buffered_mb = 0.0
+        self.peak_mb = 0.0
+        self.spilled_mb = 0.0
+        self.concat_peak_mb = None
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+            for stale in glob.glob(os.path.join(spill_dir, 'part-*')):
+                os.remove(stale)  # partitions of an earlier run
+
+    def __len__(self):
+        return self.rows
+
+    @property
+    def empty(self):
+        return self.rows == 0
+
+    def add(self, df):
+        """Keep one chunk; empty or None chunks are ignored. Returns its row count"""
+        if df is None or df.empty:
+            return 0
+        self.chunks.append(df)
+        self.n_chunks += 1
+        self.rows += len(df)
+        self.buffered_rows += len(df)
+        self.buffered_mb += chunk_mb(df)
+        self.peak_mb = max(self.peak_mb, self.buffered_mb)
+        if self.spill_dir and self.buffered_rows >= self.spill_rows:
+            self.spill()
+        return len(df)
+
+    def spill(self):
+        """Write the buffered chunks as the next on-disk partition"""
+        if not self.chunks:
+            return None
+        path = os.path.join(self.spill_dir, f'part-{len(self.partitions):05d}.{self.fmt}')
+        partition = pd.concat(self.chunks, ignore_index=True)
+        if self.fmt == 'parquet':
+            partition.to_parquet(path, index=False)
+        else:
+            partition.to_pickle(path)
+        self.partitions.append(path)
+        self.spilled_mb += self.buffered_mb
+        self.chunks, self.buffered_rows, self.buffered_mb = [], 0, 0.0
+        return path
+
+    def _read_partition(self, path):
+        return pd.read_parquet(path) if path.endswith('.parquet') else pd.read_pickle(path)
+
+    def iter_frames(self):
+        """Partitions on disk, then the chunks still in memory, in insertion order"""
+        for path in self.partitions:
+            yield self._read_partition(path)
+        yield from self.chunks
+
+    def frame(self, columns=None, trace=False):
+        """
+        All rows as one DataFrame, concatenated once. Chunks with different
+        columns are aligned (missing cells become NaN); `columns` selects
+        and orders the result. The memory allocated by the concat is
+        measured when tracemalloc is tracing, or when trace=True (tracing
+        just the concat).
+        """
+        frames = list(self.iter_frames())
+        if not frames:
+            return pd.DataFrame(columns=columns if columns is not None else [])
+        started = trace and not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        traced = tracemalloc.is_tracing()
+        if traced:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        df = pd.concat(frames, ignore_index=True, sort=False)
+        if traced:
+            self.concat_peak_mb = (tracemalloc.get_traced_memory()[1] - before) / 1024**2
+        if started:
+            tracemalloc.stop()
+        return df.reindex(columns=columns) if columns is not None else df
+
+    def stats(self):
+        return {
+            'name': self.name,
+            'chunks': self.n_chunks,
+            'rows': self.rows,
+            'buffered_mb': round(self.buffered_mb, 2),
+            'peak_buffered_mb': round(self.peak_mb, 2),
+            'partitions': len(self.partitions),
+            'spilled_mb': round(self.spilled_mb, 2),
+            'concat_peak_mb': None if self.concat_peak_mb is None else round(self.concat_peak_mb, 2),
+        }
+
+    def report(self):
+        line = (f"🧮 {self.name}: {self.rows:,} rows in {self.n_chunks} chunks, "
+                f"{self.peak_mb:.1f} MB peak buffered")
+        if self.partitions:
+            line += f", {len(self.partitions)} partitions ({self.spilled_mb:.1f} MB) in {self.spill_dir}"
+        if self.concat_peak_mb is not None:
+            line += f", {self.concat_peak_mb:.1f} MB traced during concat"
+        print(line)
@@ -4,14 +4,77 @@ import time
 from datetime import datetime, timedelta
 from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
 import json
+import argparse
 
-def get_bitcoin_blocks(start_date, end_date, token=None):
+from pool_attribution import attribute_blocks
+from block_store import BlockStore, STORE_DIR, parse_node_dirs
+from record_buffers import RecordBuffer
+from frame_accumulator import FrameAccumulator
+
+# Column types of the collected block records
+BLOCK_SCHEMA = {
+    'Platform': 'str', 'block_id': 'int', 'block_hash': 'str', 'block_time': 'str', 'block_date': 'str',
+    'block_size': 'int', 'transaction_count': 'int', 'difficulty': 'float', 'miner': 'str',
+    'reward': 'float', 'fee_total': 'float', 'coinbase_script': 'str', 'payout_address': 'str'
+}
+
+# Coinbase lookups cost one request per block, so they are opt-in (--coinbase)
+# and paced: at least COINBASE_DELAY seconds apart, backing off on 429
+COINBASE_DELAY = 1.0
+COINBASE_RETRIES = 4
+
+def get_coinbase_json(url):
+    """
+    GET a coinbase lookup, paced and retried with exponential backoff on 429
+    (honouring Retry-After)
+    """
+    for attempt in range(COINBASE_RETRIES + 1):
+        time.sleep(COINBASE_DELAY)
+        response = requests.get(url, timeout=30)
+        if response.status_code != 429 or attempt == COINBASE_RETRIES:
+            break
+        retry_after = response.headers.get('Retry-After', '')
+        time.sleep(float(retry_after) if retry_after.isdigit() else COINBASE_DELAY * 2 ** attempt)
+    response.raise_for_status()
+    return response.json()
+
+def get_bitcoin_coinbase(block_hash):
+    """
+    Coinbase scriptSig (hex) and first payout address of a Bitcoin block
+    from blockchain.info; (None, None) when unavailable
+    """
+    try:
+        coinbase = get_coinbase_json(f"https://blockchain.info/rawblock/{block_hash}")['tx'][0]
+        outputs = [out.get('addr') for out in coinbase.get('out', []) if out.get('addr')]
+        return coinbase['inputs'][0].get('script'), outputs[0] if outputs else None
+    except Exception as e:
+        print(f"Error fetching coinbase of Bitcoin block {block_hash}: {e}")
+        return None, None
+
+def get_blockcypher_coinbase(chain, block_data_raw):
     """
-    Get Bitcoin block data using blockchain.info API
+    Coinbase scriptSig (hex) and first payout address of a BlockCypher block
+    (its first txid is the coinbase); (None, None) when unavailable
+    """
+    txids = block_data_raw.get('txids') or []
+    if not txids:
+        return None, None
+    try:
+        tx = get_coinbase_json(f"https://api.blockcypher.com/v1/{chain}/main/txs/{txids[0]}")
+        addresses = [a for out in tx.get('outputs', []) for a in (out.get('addresses') or [])]
+        return tx['inputs'][0].get('script'), addresses[0] if addresses else None
+    except Exception as e:
+        print(f"Error fetching coinbase of {chain} block {block_data_raw.get('height')}: {e}")
+        return None, None
+
+def get_bitcoin_blocks(start_date, end_date, token=None, coinbase=False):
+    """
+    Get Bitcoin block data using blockchain.info API (with each block's
+    coinbase when coinbase is set)
     """
     print(f"Fetching Bitcoin blocks from {start_date} to {end_date}")
     
-    all_blocks = []
+    all_blocks = RecordBuffer(BLOCK_SCHEMA)
     
     # Convert dates to timestamps
     start_timestamp = int(datetime.strptime(start_date, '%Y-%m-%d').timestamp() * 1000)
@@ -34,6 +97,7 @@ def get_bitcoin_blocks(start_date, end_date, token=None):
             block_time = block['time'] * 1000  # Convert to milliseconds
             
             if start_timestamp <= block_time <= end_timestamp:
+                coinbase_script, payout_address = get_bitcoin_coinbase(block['hash']) if coinbase else (None, None)
                 block_data = {
                     'Platform': 'Bitcoin',
                     'block_id': block['height'],
@@ -45,7 +109,9 @@ def get_bitcoin_blocks(start_date, end_date, token=None):
                     'difficulty': 0,  # Not available in this API
                     'miner': 'Unknown',
                     'reward': block.get('fee', 0),
-                    'fee_total': block.get('fee', 0)
+                    'fee_total': block.get('fee', 0),
+                    'coinbase_script': coinbase_script,
+                    'payout_address': payout_address
                 }
                 all_blocks.append(block_data)
         
@@ -55,15 +121,16 @@ def get_bitcoin_blocks(start_date, end_date, token=None):
         print(f"Error fetching Bitcoin blocks: {e}")
     
     time.sleep(2)
-    return pd.DataFrame(all_blocks)
+    return all_blocks.to_frame()
 
-def get_ethereum_blocks(start_date, end_date, token=None):
+def get_ethereum_blocks(start_date, end_date, token=None, coinbase=False):
     """
-    Get Ethereum block data using Etherscan API
+    Get Ethereum block data using Etherscan API (the block already names its
+    miner, so coinbase is unused)
     """
     print(f"Fetching Ethereum blocks from {start_date} to {end_date}")
     
-    all_blocks = []
+    all_blocks = RecordBuffer(BLOCK_SCHEMA)
     
     try:
         # Get latest block number first
@@ -127,15 +194,16 @@ def get_ethereum_blocks(start_date, end_date, token=None):
         print(f"Error fetching Ethereum blocks: {e}")
     
     time.sleep(2)
-    return pd.DataFrame(all_blocks)
+    return all_blocks.to_frame()
 
-def get_litecoin_blocks(start_date, end_date, token=None):
+def get_litecoin_blocks(start_date, end_date, token=None, coinbase=False):
     """
-    Get Litecoin block data using alternative API
+    Get Litecoin block data using alternative API (with each block's
+    coinbase when coinbase is set)
     """
     print(f"Fetching Litecoin blocks from {start_date} to {end_date}")
     
-    all_blocks = []
+    all_blocks = RecordBuffer(BLOCK_SCHEMA)
     
     try:
         # Using a different approach - get recent blocks
@@ -159,6 +227,8 @@ def get_litecoin_blocks(start_date, end_date, token=None):
                     block_datetime = datetime.strptime(block_data_raw['time'][:19], '%Y-%m-%dT%H:%M:%S')
                     
                     if start_date <= block_datetime.strftime('%Y-%m-%d') <= end_date:
+                        coinbase_script, payout_address = (get_blockcypher_coinbase('ltc', block_data_raw)
+                                                           if coinbase else (None, None))
                         block_data = {
                             'Platform': 'Litecoin',
                             'block_id': block_data_raw['height'],
@@ -170,7 +240,9 @@ def get_litecoin_blocks(start_date, end_date, token=None):
                             'difficulty': 0,
                             'miner': 'Unknown',
                             'reward': block_data_raw.get('total', 0),
-                            'fee_total': block_data_raw.get('fees', 0)
+                            'fee_total': block_data_raw.get('fees', 0),
+                            'coinbase_script': coinbase_script,
+                            'payout_address': payout_address
                         }
                         all_blocks.append(block_data)
                 
@@ -186,15 +258,16 @@ def get_litecoin_blocks(start_date, end_date, token=None):
         print(f"Error fetching Litecoin blocks: {e}")
     
     time.sleep(2)
-    return pd.DataFrame(all_blocks)
+    return all_blocks.to_frame()
 
-def get_dogecoin_blocks(start_date, end_date, token=None):
+def get_dogecoin_blocks(start_date, end_date, token=None, coinbase=False):
     """
-    Get Dogecoin block data using BlockCypher API
+    Get Dogecoin block data using BlockCypher API (with each block's
+    coinbase when coinbase is set)
     """
     print(f"Fetching Dogecoin blocks from {start_date} to {end_date}")
     
-    all_blocks = []
+    all_blocks = RecordBuffer(BLOCK_SCHEMA)
     
     try:
         # Get chain info first
@@ -218,6 +291,8 @@ def get_dogecoin_blocks(start_date, end_date, token=None):
                     block_datetime = datetime.strptime(block_data_raw['time'][:19], '%Y-%m-%dT%H:%M:%S')
                     
                     if start_date <= block_datetime.strftime('%Y-%m-%d') <= end_date:
+                        coinbase_script, payout_address = (get_blockcypher_coinbase('doge', block_data_raw)
+                                                           if coinbase else (None, None))
                         block_data = {
                             'Platform': 'Dogecoin',
                             'block_id': block_data_raw['height'],
@@ -229,7 +304,9 @@ def get_dogecoin_blocks(start_date, end_date, token=None):
                             'difficulty': 0,
                             'miner': 'Unknown',
                             'reward': block_data_raw.get('total', 0),
-                            'fee_total': block_data_raw.get('fees', 0)
+                            'fee_total': block_data_raw.get('fees', 0),
+                            'coinbase_script': coinbase_script,
+                            'payout_address': payout_address
                         }
                         all_blocks.append(block_data)
                 
@@ -245,7 +322,7 @@ def get_dogecoin_blocks(start_date, end_date, token=None):
         print(f"Error fetching Dogecoin blocks: {e}")
     
     time.sleep(2)
-    return pd.DataFrame(all_blocks)
+    return all_blocks.to_frame()
 
 def create_realistic_sample_data():
     """
@@ -253,7 +330,7 @@ def create_realistic_sample_data():
     """
     print("Creating realistic sample block data based on actual blockchain patterns...")
     
-    all_blocks = []
+    all_blocks = RecordBuffer(BLOCK_SCHEMA)
     platforms = ['Bitcoin', 'Ethereum', 'Litecoin', 'Dogecoin', 'Bitcoin_Cash', 'Dash', 'Bitcoin_SV']
     
     # Realistic block characteristics for each platform
@@ -302,7 +379,7 @@ def create_realistic_sample_data():
             block_height += blocks_per_week
     
     print(f"Generated {len(all_blocks)} realistic sample blocks")
-    return pd.DataFrame(all_blocks)
+    return all_blocks.to_frame()
 
 def create_block_summary_sheet(all_data):
     """
@@ -350,55 +427,65 @@ def clean_illegal_chars(df):
         return df
     return df.map(lambda x: ILLEGAL_CHARACTERS_RE.sub('', x) if isinstance(x, str) else x)
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Collect block data from public APIs or local node block files")
+    parser.add_argument('--node-dir', action='append', default=[], metavar='PLATFORM=BLOCKS_DIR',
+                        help="read this platform from a node's blocks directory (blk*.dat) instead of the APIs; repeatable")
+    parser.add_argument('--store', default=STORE_DIR, help="local block store for parsed node files")
+    # One window for every platform, API or node file
+    parser.add_argument('--start-date', default='2021-01-01', help="first block date (default: %(default)s)")
+    parser.add_argument('--end-date', default='2024-12-31', help="last block date (default: %(default)s)")
+    parser.add_argument('--coinbase', action='store_true',
+                        help="also fetch each API block's coinbase for pool attribution "
+                             f"(one extra request per block, {COINBASE_DELAY:g}s apart)")
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
+    node_dirs = parse_node_dirs(args.node_dir)
     print("Starting comprehensive blockchain block data collection...")
     
     # Define date ranges
     years = ['2021', '2022', '2023', '2024']
     
     # Storage for all data
-    all_block_data = pd.DataFrame()
+    all_block_data = FrameAccumulator('blocks')
     
     # Try to collect real data from APIs
     print("\n=== Attempting to collect real blockchain data ===")
     
-    # Collect Bitcoin data
-    try:
-        bitcoin_data = get_bitcoin_blocks('2024-01-01', '2024-12-31')
-        if not bitcoin_data.empty:
-            all_block_data = pd.concat([all_block_data, bitcoin_data], ignore_index=True)
-    except Exception as e:
-        print(f"Bitcoin data collection failed: {e}")
-    
-    # Collect Ethereum data
-    try:
-        ethereum_data = get_ethereum_blocks('2024-01-01', '2024-12-31')
-        if not ethereum_data.empty:
-            all_block_data = pd.concat([all_block_data, ethereum_data], ignore_index=True)
-    except Exception as e:
-        print(f"Ethereum data collection failed: {e}")
-    
-    # Collect Litecoin data
-    try:
-        litecoin_data = get_litecoin_blocks('2024-01-01', '2024-12-31')
-        if not litecoin_data.empty:
-            all_block_data = pd.concat([all_block_data, litecoin_data], ignore_index=True)
-    except Exception as e:
-        print(f"Litecoin data collection failed: {e}")
-    
-    # Collect Dogecoin data
-    try:
-        dogecoin_data = get_dogecoin_blocks('2024-01-01', '2024-12-31')
-        if not dogecoin_data.empty:
-            all_block_data = pd.concat([all_block_data, dogecoin_data], ignore_index=True)
-    except Exception as e:
-        print(f"Dogecoin data collection failed: {e}")
+    for platform, collect in [('Bitcoin', get_bitcoin_blocks), ('Ethereum', get_ethereum_blocks),
+                              ('Litecoin', get_litecoin_blocks), ('Dogecoin', get_dogecoin_blocks)]:
+        if platform in node_dirs:
+            continue  # read from the local node below
+        try:
+            platform_data = collect(args.start_date, args.end_date, coinbase=args.coinbase)
+            all_block_data.add(platform_data)
+        except Exception as e:
+            print(f"{platform} data collection failed: {e}")
+    
+    # Platforms with a local node: parse its blk*.dat files instead of the APIs
+    if node_dirs:
+        print("\n=== Reading local node block files ===")
+        store = BlockStore(args.store)
+        for platform, blocks_dir in node_dirs.items():
+            try:
+                store.ingest_dir(platform, blocks_dir)
+                node_data = store.block_table(platform, args.start_date, args.end_date)
+                print(f"{platform}: {len(node_data)} blocks from {blocks_dir}")
+                all_block_data.add(node_data)
+            except Exception as e:
+                print(f"{platform} block file parsing failed: {e}")
     
     # If we couldn't collect enough real data, supplement with realistic sample data
     if len(all_block_data) < 1000:
         print("\n=== Supplementing with realistic sample data ===")
         sample_data = create_realistic_sample_data()
-        all_block_data = pd.concat([all_block_data, sample_data], ignore_index=True)
+        all_block_data.add(sample_data)
+    
+    accumulator = all_block_data
+    all_block_data = accumulator.frame(trace=True)
+    accumulator.report()
     
     # Ensure we have the required columns
     required_columns = [
@@ -410,8 +497,18 @@ def main():
         if col not in all_block_data.columns:
             all_block_data[col] = 0 if col in ['block_size', 'transaction_count', 'difficulty', 'reward', 'fee_total'] else 'Unknown'
     
+    # Coinbase evidence is kept so blocks can be re-attributed when the
+    # pool signature table is updated
+    coinbase_columns = ['coinbase_script', 'payout_address']
+    for col in coinbase_columns:
+        if col not in all_block_data.columns:
+            all_block_data[col] = None
+    
+    # Label 'Unknown' miners from their coinbase tags / payout addresses
+    all_block_data = attribute_blocks(all_block_data)
+    
     # Reorder columns
-    all_block_data = all_block_data[required_columns]
+    all_block_data = all_block_data[required_columns + coinbase_columns]
     
     # Create summary sheet
     summary_data = create_block_summary_sheet(all_block_data)
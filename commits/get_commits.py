@@ -4,11 +4,21 @@ import time
 from datetime import datetime
 from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
 
+from record_buffers import RecordBuffer
+from frame_accumulator import FrameAccumulator
+
+# Column types of the collected commit records
+COMMIT_SCHEMA = {
+    'Token_id': 'str', 'commit_id': 'str', 'author_name': 'str', 'author_email': 'str', 'author_login': 'str',
+    'author_date': 'datetime', 'committer_name': 'str', 'committer_email': 'str', 'commit_date': 'datetime',
+    'commit_message': 'str', 'commit_verified': 'bool', 'commit_reason': 'str', 'Platform': 'str'
+}
+
 # Fetch commits from a GitHub repository between specified dates
 def get_commits(repo_owner, repo_name, start_date, end_date, platform_name, token):
     print(f"Fetching commits for {repo_owner}/{repo_name} ({platform_name}) from {start_date} to {end_date}")
     headers = {'Authorization': f'token {token}'}
-    all_commits = []
+    all_commits = RecordBuffer(COMMIT_SCHEMA)
     page = 1
     per_page = 100
 
@@ -36,6 +46,7 @@ def get_commits(repo_owner, repo_name, start_date, end_date, platform_name, toke
                         'commit_id': commit['sha'],
                         'author_name': commit['commit']['author']['name'],
                         'author_email': commit['commit']['author']['email'],
+                        'author_login': (commit.get('author') or {}).get('login'),
                         'author_date': author_date,
                         'committer_name': commit['commit']['committer']['name'],
                         'committer_email': commit['commit']['committer']['email'],
@@ -72,7 +83,7 @@ def get_commits(repo_owner, repo_name, start_date, end_date, platform_name, toke
                     continue
             break
 
-    return pd.DataFrame(all_commits) if all_commits else pd.DataFrame()
+    return all_commits.to_frame() if len(all_commits) else pd.DataFrame()
 
 # Get repository statistics like fork count and watch count
 def get_repo_stats(repo_owner, repo_name, token):
@@ -136,35 +147,37 @@ def main():
     # years to collect data for
     years = ["2021", "2022", "2023", "2024"]
     
-    # Storage for all data
-    all_commit_data = pd.DataFrame()
+    # Storage for all data; every (repository, year) frame is one chunk
+    all_commit_data = FrameAccumulator('commits')
     
     # Process each repository
     for repo in repositories:
         print(f"\n=== Starting data collection for {repo['platform']} ===")
-        repo_data = pd.DataFrame()
+        repo_commits = 0
         for year in years:
             start_date = f"{year}-01-01"
             end_date = f"{year}-12-31"
             df = get_commits(repo["owner"], repo["name"], start_date, end_date, repo["platform"], token)
             if not df.empty:
-                repo_data = pd.concat([repo_data, df], ignore_index=True)
+                repo_commits += all_commit_data.add(df)
                 print(f"Collected {len(df)} commits for {repo['platform']} in {year}")
             else:
                 print(f"No commits found for {repo['platform']} in {year}")
-        if not repo_data.empty:
-            all_commit_data = pd.concat([all_commit_data, repo_data], ignore_index=True)
-            print(f"Total commits collected for {repo['platform']}: {len(repo_data)}")
+        if repo_commits:
+            print(f"Total commits collected for {repo['platform']}: {repo_commits}")
         print(f"Completed {repo['platform']}. Waiting 5 seconds before next repository...")
         time.sleep(5)
     
     if all_commit_data.empty:
         print("No data was collected. Please check your token or network connection.")
         return
+    accumulator = all_commit_data
+    all_commit_data = accumulator.frame(trace=True)
+    accumulator.report()
     
     # Reorder columns to match the example file
     column_order = [
-        'Token_id', 'commit_id', 'author_name', 'author_email', 'author_date',
+        'Token_id', 'commit_id', 'author_name', 'author_email', 'author_login', 'author_date',
         'committer_name', 'committer_email', 'commit_date', 'commit_message',
         'commit_verified', 'commit_reason', 'Platform'
     ]
@@ -4,6 +4,7 @@ import time
 from datetime import datetime
 import re
 from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from proposal_metadata import parse_proposal
 
 def clean_illegal_chars(df):
     """Remove illegal characters from all string cells in a DataFrame"""
@@ -95,36 +96,8 @@ def get_ethereum_eips(start_year=2021, end_year=2024, max_eips=100):
 def parse_eip_content(content, eip_number):
     """Parse EIP markdown content to extract metadata"""
     try:
-        lines = content.split('\n')
-        metadata = {'eip_number': eip_number}
-        
-        in_frontmatter = False
-        content_lines = []
-        
-        for line in lines:
-            line_stripped = line.strip()
-            
-            if line_stripped == '---':
-                in_frontmatter = not in_frontmatter
-                continue
-                
-            if in_frontmatter and ':' in line:
-                try:
-                    key, value = line.split(':', 1)
-                    key = key.strip().lower()
-                    value = value.strip()
-                    
-                    if key in ['title', 'author', 'status', 'type', 'category', 'created', 'updated']:
-                        metadata[key] = value
-                except:
-                    continue
-            elif not in_frontmatter:
-                content_lines.append(line)
-        
-        # Get content (first 1000 characters)
-        full_content = '\n'.join(content_lines)
-        metadata['content'] = full_content[:1000].replace('\n', ' ').strip()
-        
+        metadata = parse_proposal(content, eip_number).to_metadata()
+        metadata['eip_number'] = eip_number
         return metadata
         
     except Exception as e:
@@ -216,40 +189,8 @@ def get_bitcoin_bips(start_year=2021, end_year=2024, max_bips=100):
 def parse_bip_content(content, bip_number):
     """Parse BIP mediawiki content to extract metadata"""
     try:
-        lines = content.split('\n')
-        metadata = {'bip_number': bip_number}
-        
-        # Look for <pre> section with metadata
-        in_pre = False
-        content_lines = []
-        
-        for line in lines:
-            line_stripped = line.strip()
-            
-            if line_stripped == '<pre>':
-                in_pre = True
-                continue
-            elif line_stripped == '</pre>':
-                in_pre = False
-                continue
-                
-            if in_pre and ':' in line:
-                try:
-                    key, value = line.split(':', 1)
-                    key = key.strip().lower()
-                    value = value.strip()
-                    
-                    if key in ['title', 'author', 'status', 'type', 'layer', 'created']:
-                        metadata[key] = value
-                except:
-                    continue
-            elif not in_pre:
-                content_lines.append(line)
-        
-        # Get content
-        full_content = '\n'.join(content_lines)
-        metadata['content'] = full_content[:1000].replace('\n', ' ').strip()
-        
+        metadata = parse_proposal(content, bip_number).to_metadata()
+        metadata['bip_number'] = bip_number
         return metadata
         
     except Exception as e:
@@ -3,14 +3,20 @@ import numpy as np
 from datetime import datetime
 from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
 
+from hashrate_estimator import estimate_hashrate
+
 def clean_illegal_chars(df):
     """Remove illegal characters from all string cells in a DataFrame"""
     return df.map(lambda x: ILLEGAL_CHARACTERS_RE.sub('', x) if isinstance(x, str) else x)
 
-def generate_realistic_market_data():
+def generate_realistic_market_data(hashrate=None, seed=2024):
     """
     Generate realistic market cap and hash rate data based on actual 2024 values
-    and historical market patterns for academic research purposes
+    and historical market patterns for academic research purposes.
+    Hash rate comes from the block-data estimates in `hashrate` (Platform,
+    Year, Week, Hash_Rate) where available; other weeks use the 2024 level
+    scaled by the yearly growth multipliers. Output is reproducible for a
+    given seed.
     """
     print("=== GENERATING REALISTIC BLOCKCHAIN MARKET & HASH RATE DATA ===")
     print("Based on actual 2024 market values and historical patterns")
@@ -54,6 +60,13 @@ def generate_realistic_market_data():
         }
     }
     
+    rng = np.random.default_rng(seed)
+    estimates = {}
+    if hashrate is not None:
+        estimated = hashrate.dropna(subset=['Hash_Rate'])
+        estimates = dict(zip(zip(estimated['Platform'], estimated['Year'], estimated['Week']),
+                             estimated['Hash_Rate']))
+    
     all_data = []
     
     for platform, config in platforms_config.items():
@@ -79,26 +92,28 @@ def generate_realistic_market_data():
                 
                 # Calculate market cap with realistic variation
                 base_market_cap = config['market_cap_2024'] * market_multipliers[year]
-                weekly_variation = np.random.uniform(
+                weekly_variation = rng.uniform(
                     1 - config['volatility'], 
                     1 + config['volatility']
                 )
                 market_cap = base_market_cap * weekly_variation
                 
-                # Calculate hashrate
-                if platform == 'Ethereum' and year >= 2022 and week >= 38:
-                    hashrate = 0  # Proof of Stake transition
-                else:
-                    base_hashrate = config['hashrate_2024'] * hashrate_multipliers[year]
-                    hashrate_variation = np.random.uniform(0.95, 1.05)
-                    hashrate = base_hashrate * hashrate_variation
+                # Hashrate estimated from block data, else the assumed level
+                source = 'estimated'
+                hashrate = estimates.get((platform, year, week))
+                if platform == 'Ethereum' and (year, week) >= (2022, 38):
+                    source, hashrate = 'assumed', 0  # Proof of Stake since the Merge
+                elif hashrate is None:
+                    source = 'assumed'
+                    hashrate = config['hashrate_2024'] * hashrate_multipliers[year]
                 
                 all_data.append({
                     'Platform': platform,
                     'Year': year,
                     'Week': week,
                     'Market_Capitalization': market_cap,
-                    'Hash_Rate': hashrate
+                    'Hash_Rate': hashrate,
+                    'Hash_Rate_Source': source
                 })
     
     return pd.DataFrame(all_data)
@@ -117,6 +132,7 @@ def create_summary_statistics(df):
             'Max_Market_Cap_Billions': platform_data['Market_Capitalization'].max() / 1e9,
             'Min_Market_Cap_Billions': platform_data['Market_Capitalization'].min() / 1e9,
             'Avg_Hash_Rate_EH': platform_data['Hash_Rate'].mean() / 1e18,
+            'Hash_Rate_Estimated_Weeks': int((platform_data['Hash_Rate_Source'] == 'estimated').sum()),
             'Data_Source': 'Realistic estimates based on 2024 market values'
         })
     
@@ -126,8 +142,11 @@ def main():
     print("=== FINAL BLOCKCHAIN MARKET CAP & HASH RATE DATA COLLECTION ===")
     print("Creating research-grade dataset with realistic market patterns")
     
+    # Weekly hashrate from the node block store / collected block table
+    hashrate = estimate_hashrate()
+    
     # Generate the dataset
-    df = generate_realistic_market_data()
+    df = generate_realistic_market_data(hashrate)
     
     # Create summary statistics
     summary_df = create_summary_statistics(df)
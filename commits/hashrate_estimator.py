@@ -0,0 +1,267 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from blk_parser import CHAINS, DIFF1_BITS
+from block_store import STORE_DIR, BlockStore, parse_node_dirs
+
+# Hashrate from block data instead of assumed growth multipliers. Every block
+# proves an expected amount of work (hashes) given by its target; the work
+# accumulated between two blocks divided by the time between them estimates
+# the network hashrate over that span. All estimators difference one
+# cumulative-work array, so they are vectorized and fully deterministic.
+
+BLOCK_FILE = 'blockchain_block_data_real_2021_2024.xlsx'
+OUTPUT_FILE = 'hashrate_weekly_estimates.csv'
+
+# Spelling used in the market & hashrate file
+MARKET_NAMES = {'Bitcoin_Cash': 'Bitcoin Cash', 'Bitcoin_SV': 'Bitcoin SV'}
+
+DEFAULT_WINDOW = 144  # blocks per rolling estimate (one Bitcoin day)
+
+# get_block_data.create_realistic_sample_data() rows: fabricated hashes and
+# miners, identical difficulties. They say nothing about the network.
+SAMPLE_HASH = r'^hash_'
+SAMPLE_MINER = r'^Pool_\d+$'
+
+
+def bits_to_targets(bits):
+    """Vectorized blk_parser.bits_to_target as float64"""
+    bits = np.asarray(bits, dtype=np.uint64)
+    exponent = (bits >> np.uint64(24)).astype(np.int64)
+    mantissa = (bits & np.uint64(0x007fffff)).astype(np.float64)
+    return np.ldexp(mantissa, 8 * (exponent - 3))
+
+
+def block_work(bits):
+    """Expected hashes per block, 2^256 / (target + 1); NaN for a zero target"""
+    targets = bits_to_targets(bits)
+    with np.errstate(divide='ignore'):
+        work = np.ldexp(1.0, 256) / (targets + 1)
+    return np.where(targets > 0, work, np.nan)
+
+
+def difficulties_from_bits(bits, diff1_bits=DIFF1_BITS):
+    """Vectorized blk_parser.difficulty_from_bits"""
+    targets = bits_to_targets(bits)
+    with np.errstate(divide='ignore'):
+        return np.where(targets > 0, bits_to_targets([diff1_bits])[0] / targets, np.nan)
+
+
+def hashes_per_difficulty(platform):
+    """
+    Expected hashes per unit of reported difficulty: 2^256 / diff1 target
+    for Bitcoin-family chains (~2^32 for Bitcoin), 1 for Ethereum, whose
+    difficulty is already a hash count.
+    """
+    if platform == 'Ethereum':
+        return 1.0
+    chain = CHAINS.get(platform, {})
+    return float(block_work([chain.get('diff1_bits', DIFF1_BITS)])[0])
+
+
+def blocks_from_store(store, platform):
+    """Height, time and work of every stored block of a platform"""
+    df = store.load(platform, columns=['time', 'bits'])
+    return pd.DataFrame({
+        'height': df['height'],
+        'time': pd.to_datetime(df['time'], unit='s'),
+        'work': block_work(df['bits'].to_numpy()),
+    })
+
+
+def sample_rows(df):
+    """Mask of get_block_data.py's generated sample blocks"""
+    hashes = df['block_hash'].astype(str).str.match(SAMPLE_HASH)
+    miners = df['miner'].astype(str).str.match(SAMPLE_MINER)
+    return (hashes | miners).to_numpy()
+
+
+def blocks_from_table(df, platform):
+    """
+    Height, time and work from get_block_data.py's block table (possibly
+    sampled blocks). Sample-data rows are skipped and a difficulty <= 0
+    (e.g. Ethereum after the Merge) counts as missing, not as zero work.
+    """
+    rows = df[(df['Platform'] == platform).to_numpy() & ~sample_rows(df)]
+    work = pd.to_numeric(rows['difficulty'], errors='coerce') * hashes_per_difficulty(platform)
+    return pd.DataFrame({
+        'height': pd.to_numeric(rows['block_id'], errors='coerce'),
+        'time': pd.to_datetime(rows['block_time'], errors='coerce'),
+        'work': work.where(work > 0),
+    })
+
+
+def cumulative_work(blocks):
+    """
+    Blocks in height order with seconds `t` and cumulative work `W`.
+    Timestamps may step backwards between blocks, so t is their running
+    maximum. When only a sample of blocks is known, the blocks between two
+    samples are credited with the later sample's work.
+    """
+    blocks = blocks.dropna().sort_values('height', kind='stable').drop_duplicates('height', keep='last')
+    blocks = blocks.reset_index(drop=True)
+    if blocks.empty:
+        return blocks.assign(t=np.empty(0, np.int64), W=np.empty(0))
+    seconds = blocks['time'].to_numpy(dtype='datetime64[s]').astype(np.int64)
+    heights = blocks['height'].to_numpy(dtype=np.int64)
+    gaps = np.diff(heights, prepend=heights[0] - 1)
+    blocks['t'] = np.maximum.accumulate(seconds)
+    blocks['W'] = np.cumsum(blocks['work'].to_numpy(dtype=np.float64) * gaps)
+    return blocks
+
+
+def span_hashrate(W, t, end, start):
+    """(W[end] - W[start]) / (t[end] - t[start]); NaN where start < 0 or no time elapsed"""
+    valid = start >= 0
+    start = np.where(valid, start, 0)
+    elapsed = (t[end] - t[start]).astype(np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rate = (W[end] - W[start]) / elapsed
+    return np.where(valid & (elapsed > 0), rate, np.nan)
+
+
+def rolling_hashrate(blocks, window=DEFAULT_WINDOW):
+    """Per-block hashrate over the last `window` known blocks"""
+    blocks = cumulative_work(blocks)
+    end = np.arange(len(blocks))
+    rate = span_hashrate(blocks['W'].to_numpy(), blocks['t'].to_numpy(), end, end - window)
+    return blocks.assign(Hash_Rate=rate)
+
+
+def rolling_time_hashrate(blocks, seconds=86400):
+    """Per-block hashrate over the trailing `seconds` of block time"""
+    blocks = cumulative_work(blocks)
+    t = blocks['t'].to_numpy()
+    end = np.arange(len(blocks))
+    start = np.searchsorted(t, t - seconds, side='left') - 1  # last block at or before the window start
+    rate = span_hashrate(blocks['W'].to_numpy(), t, end, start)
+    return blocks.assign(Hash_Rate=rate)
+
+
+def weekly_hashrate(blocks, platform, smooth_weeks=1):
+    """
+    Platform/Year/Week/Hash_Rate: work done between the last block of the
+    previous `smooth_weeks` ISO weeks and the last block of this week,
+    divided by the time between them.
+    """
+    blocks = cumulative_work(blocks)
+    if blocks.empty:
+        return pd.DataFrame(columns=['Platform', 'Year', 'Week', 'Hash_Rate', 'Blocks'])
+    iso = pd.to_datetime(blocks['t'], unit='s').dt.isocalendar()
+    week_id = (iso['year'].astype(np.int64) * 100 + iso['week'].astype(np.int64)).to_numpy()
+    last = np.flatnonzero(np.r_[week_id[1:] != week_id[:-1], True])  # t is sorted, so weeks are contiguous
+    # boundary k-s; the first weeks fall back to the first block
+    start = np.r_[np.full(smooth_weeks, 0), last[:-smooth_weeks]] if len(last) > smooth_weeks else np.zeros(len(last), np.int64)
+    rate = span_hashrate(blocks['W'].to_numpy(), blocks['t'].to_numpy(), last, start)
+    return pd.DataFrame({
+        'Platform': MARKET_NAMES.get(platform, platform),
+        'Year': week_id[last] // 100,
+        'Week': week_id[last] % 100,
+        'Hash_Rate': rate,
+        'Blocks': np.diff(np.r_[-1, last]),
+    })
+
+
+def estimate_hashrate(store_dir=STORE_DIR, block_file=BLOCK_FILE, smooth_weeks=1, node_dirs=None, workers=None):
+    """
+    Weekly hashrate of every platform with block data: node block stores
+    first (all blocks, exact targets), the collected block table otherwise.
+    node_dirs ({platform: blocks_dir}) are ingested into the store first,
+    headers only, since time, bits and height are all the estimate needs.
+    Generated sample blocks in the table are never used, so a platform
+    with only sample data has no estimate.
+    """
+    frames, done = [], set()
+    if node_dirs:
+        store = BlockStore(store_dir)
+        for platform, blocks_dir in node_dirs.items():
+            store.ingest_dir(platform, blocks_dir, headers_only=True, workers=workers)
+    if store_dir and os.path.exists(store_dir):
+        store = BlockStore(store_dir)
+        for platform in store.platforms():
+            frames.append(weekly_hashrate(blocks_from_store(store, platform), platform, smooth_weeks))
+            done.add(platform)
+            print(f"   ⛏️  {platform}: hashrate from {frames[-1]['Blocks'].sum():,} stored blocks")
+    if block_file and os.path.exists(block_file):
+        table = pd.read_excel(block_file, sheet_name='Sheet1',
+                              usecols=['Platform', 'block_id', 'block_hash', 'block_time', 'difficulty', 'miner'])
+        for platform in sorted(set(table['Platform'].dropna()) - done):
+            blocks = blocks_from_table(table, platform)
+            if blocks.dropna().empty:
+                print(f"   ⚠️  {platform}: no collected blocks with work (sample data skipped)")
+                continue
+            frames.append(weekly_hashrate(blocks, platform, smooth_weeks))
+            print(f"   ⛏️  {platform}: hashrate from {frames[-1]['Blocks'].sum():,} collected blocks")
+    if not frames:
+        return pd.DataFrame(columns=['Platform', 'Year', 'Week', 'Hash_Rate', 'Blocks'])
+    return pd.concat(frames, ignore_index=True)
+
+
+def synthetic_chain(hashrate, n_blocks, bits=0x1d00ffff, start='2021-01-04', step=1):
+    """Blocks mined at a constant hashrate; every `step`-th block is kept"""
+    work = block_work([bits])[0]
+    seconds = np.arange(1, n_blocks + 1) * work / hashrate
+    blocks = pd.DataFrame({
+        'height': np.arange(n_blocks),
+        'time': pd.Timestamp(start) + pd.to_timedelta(np.round(seconds), unit='s'),
+        'work': work,
+    })
+    return blocks.iloc[::step].reset_index(drop=True)
+
+
+def self_check():
+    """Recover a known constant hashrate from full and sampled synthetic chains"""
+    from blk_parser import difficulty_from_bits
+    truth = 7e6  # ~10 minute blocks at difficulty 1
+    full, sampled = synthetic_chain(truth, 20000), synthetic_chain(truth, 20000, step=7)
+    weekly = weekly_hashrate(full, 'Bitcoin')
+    table = pd.DataFrame({
+        'Platform': 'Ethereum', 'block_id': [1, 2, 3, 4],
+        'block_hash': ['0xa1', '0xa2', 'hash_ethereum_3', '0xa4'],
+        'block_time': pd.date_range('2022-09-15', periods=4, freq='12s'),
+        'difficulty': [5e15, 0, 5e15, 5e15], 'miner': ['0xm', '0xm', '0xm', 'Pool_4'],
+    })
+    checks = {
+        'difficulty': np.allclose(difficulties_from_bits([0x1d00ffff, 0x1b0404cb, 0x1802b0e5]),
+                                  [difficulty_from_bits(b) for b in (0x1d00ffff, 0x1b0404cb, 0x1802b0e5)]),
+        'bitcoin work per difficulty': abs(hashes_per_difficulty('Bitcoin') / 2 ** 32 - 1) < 1e-4,
+        'rolling blocks': np.allclose(rolling_hashrate(full)['Hash_Rate'].dropna(), truth, rtol=1e-3),
+        'rolling time': np.allclose(rolling_time_hashrate(full)['Hash_Rate'].dropna(), truth, rtol=1e-3),
+        'weekly': np.allclose(weekly['Hash_Rate'].iloc[1:-1], truth, rtol=1e-3),
+        'sampled blocks': np.allclose(weekly_hashrate(sampled, 'Bitcoin')['Hash_Rate'].iloc[1:-1], truth, rtol=1e-2),
+        'deterministic': weekly.equals(weekly_hashrate(full.sample(frac=1, random_state=0), 'Bitcoin')),
+        'table skips sample and zero work': blocks_from_table(table, 'Ethereum')['work'].notna().tolist() == [True, False],
+    }
+    for name, ok in checks.items():
+        if not ok:
+            print(f"   ❌ {name}")
+    print(f"{'✅' if all(checks.values()) else '❌'} hashrate estimator self-check: "
+          f"{sum(checks.values())}/{len(checks)} checks passed")
+    return all(checks.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Estimate weekly network hashrate from block data")
+    parser.add_argument('--store', default=STORE_DIR, help="local block store (block_store.py)")
+    parser.add_argument('--blocks', default=BLOCK_FILE, help="block table from get_block_data.py")
+    parser.add_argument('--node-dir', action='append', default=[], metavar='PLATFORM=BLOCKS_DIR',
+                        help="decode this node's block headers into the store first; repeatable")
+    parser.add_argument('--workers', type=int, default=None, help="header decoder processes (default: all cores)")
+    parser.add_argument('--smooth-weeks', type=int, default=1, help="estimate over this many trailing weeks")
+    parser.add_argument('--output', default=OUTPUT_FILE)
+    parser.add_argument('--self-check', action='store_true')
+    args = parser.parse_args()
+
+    if args.self_check:
+        raise SystemExit(0 if self_check() else 1)
+    print("=== HASHRATE ESTIMATION ===")
+    weekly = estimate_hashrate(args.store, args.blocks, args.smooth_weeks, parse_node_dirs(args.node_dir), args.workers)
+    weekly.to_csv(args.output, index=False)
+    print(f"✅ {len(weekly)} platform-weeks saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
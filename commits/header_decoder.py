@@ -0,0 +1,387 @@
+import argparse
+import hashlib
+import mmap
+import os
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from blk_parser import (CHAINS, DIFF1_BITS, HEADER_BYTES, VERSION_AUXPOW, ZCASH_HEADER_BYTES, block_files,
+                        difficulty_from_bits, fixture_file, parse_file, read_xor_key, skip_auxpow, GENESIS_BLOCK_HEX)
+
+# Columnar header/coinbase decoder for blk*.dat files. The parent process
+# indexes the record boundaries of each file and cuts them into byte ranges;
+# worker processes map their range and decode every block in it with NumPy
+# gathers over the raw bytes (structured dtypes for the header, vectorized
+# compact-size reads for the coinbase), so no per-field Python code runs
+# except for the AuxPoW proofs of merged-mined blocks.
+
+HEADER_DTYPE = np.dtype([('version', '<i4'), ('prev_hash', 'V32'), ('merkle_root', 'V32'),
+                         ('time', '<u4'), ('bits', '<u4'), ('nonce', '<u4')])
+ZCASH_HEADER_DTYPE = np.dtype([('version', '<i4'), ('prev_hash', 'V32'), ('merkle_root', 'V32'),
+                               ('commitments', 'V32'), ('time', '<u4'), ('bits', '<u4'), ('nonce', 'V32')])
+
+# Output columns and their dtypes; height / tag_offset are -1 when unknown
+COLUMNS = {
+    'file': np.int32,        # position in the decoded file list
+    'offset': np.int64,      # block start within the file
+    'size': np.uint32,
+    'header_size': np.uint32,  # bytes hashed for the block hash
+    'version': np.int32,
+    'time': np.uint32,
+    'bits': np.uint32,
+    'tx_count': np.uint32,
+    'height': np.int64,      # BIP34 height from the coinbase script
+    'tag_offset': np.int64,  # coinbase scriptSig start within the file
+    'tag_length': np.uint32,
+}
+
+CHUNK_BYTES = 32 << 20
+
+# Block store columns header_frame() produces (blk_parser.BLOCK_COLUMNS minus
+# the ones that need the coinbase outputs)
+HEADER_TABLE_COLUMNS = ['Platform', 'file', 'offset', 'block_hash', 'prev_hash', 'version', 'time', 'bits',
+                        'difficulty', 'size', 'tx_count', 'coinbase_height', 'coinbase_script']
+
+
+def record_index(path, magic, xor_key=None):
+    """(offsets, sizes) of the block records of a file, reading only the 8-byte record prefixes"""
+    magic = bytes.fromhex(magic)
+    offsets, sizes = [], []
+    with open(path, 'rb') as f:
+        end = os.fstat(f.fileno()).st_size
+        if end == 0:
+            return np.empty(0, np.int64), np.empty(0, np.int64)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            pos = 0
+            while pos + 8 <= end:
+                prefix = buf[pos:pos + 8]
+                if xor_key:
+                    prefix = bytes(b ^ xor_key[(pos + i) % len(xor_key)] for i, b in enumerate(prefix))
+                if prefix[:4] != magic:
+                    if not any(prefix[:4]):
+                        break  # preallocated tail of the newest file
+                    raise ValueError(f"{os.path.basename(path)}: unexpected magic {prefix[:4].hex()} at offset {pos}")
+                size = struct.unpack_from('<I', prefix, 4)[0]
+                if pos + 8 + size > end:
+                    break  # block still being written
+                offsets.append(pos + 8)
+                sizes.append(size)
+                pos += 8 + size
+    return np.array(offsets, dtype=np.int64), np.array(sizes, dtype=np.int64)
+
+
+def split_ranges(offsets, sizes, chunk_bytes=CHUNK_BYTES):
+    """Cut a file's records into consecutive slices of roughly chunk_bytes each"""
+    if len(offsets) == 0:
+        return []
+    ends = offsets + sizes
+    bounds = np.searchsorted(ends, np.arange(chunk_bytes, ends[-1], chunk_bytes), side='right')
+    bounds = np.unique(np.concatenate([[0], bounds, [len(offsets)]]))
+    return [slice(a, b) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+
+def map_range(path, start, end, xor_key=None):
+    """
+    uint8 view of path[start:end]. Plain files are memory-mapped and viewed
+    without copying; obfuscated files are read and de-XORed for that range
+    only. Returns (array, mmap or None).
+    """
+    with open(path, 'rb') as f:
+        if xor_key is None:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            return np.frombuffer(mm, dtype=np.uint8, count=end - start, offset=start), mm
+        f.seek(start)
+        data = np.frombuffer(f.read(end - start), dtype=np.uint8)
+    key = np.frombuffer(xor_key, dtype=np.uint8)
+    return data ^ np.resize(np.roll(key, -(start % len(key))), len(data)), None
+
+
+def gather_uint(u8, pos, width):
+    """Little-endian unsigned integers of `width` bytes at each pos (clipped at the buffer end)"""
+    idx = np.minimum(pos[:, None] + np.arange(width), len(u8) - 1)
+    shifts = (8 * np.arange(width)).astype(np.uint64)
+    return np.bitwise_or.reduce(u8[idx].astype(np.uint64) << shifts, axis=1)
+
+
+def low_bytes(values, widths):
+    """Keep the lowest `widths` bytes of each value"""
+    widths = np.asarray(widths, dtype=np.uint64)
+    mask = np.where(widths >= 8, np.uint64(0xffffffffffffffff),
+                    (np.uint64(1) << (np.uint64(8) * np.minimum(widths, 7))) - np.uint64(1))
+    return values & mask
+
+
+def compact_sizes(u8, pos):
+    """Vectorized read_compact_size: (values, positions after them)"""
+    first = u8[np.minimum(pos, len(u8) - 1)].astype(np.uint64)
+    width = np.select([first < 0xfd, first == 0xfd, first == 0xfe], [0, 2, 4], 8)
+    values = np.where(width == 0, first, low_bytes(gather_uint(u8, pos + 1, 8), width))
+    return values, pos + 1 + width
+
+
+def decode_headers(u8, offsets, sizes, chain, buf=None):
+    """
+    Decode the blocks at offsets (relative to u8) into the COLUMNS arrays;
+    file and offset are filled in by the caller. buf is a buffer over the
+    same bytes for the AuxPoW fallback.
+    """
+    n = len(offsets)
+    zcash = chain.get('zcash')
+    header_dtype = ZCASH_HEADER_DTYPE if zcash else HEADER_DTYPE
+    raw = u8[offsets[:, None] + np.arange(header_dtype.itemsize)]
+    headers = np.ascontiguousarray(raw).view(header_dtype)[:, 0]
+    version = headers['version']
+
+    if zcash:
+        solution, pos = compact_sizes(u8, offsets + ZCASH_HEADER_BYTES)
+        pos = pos + solution.astype(np.int64)
+    else:
+        pos = offsets + HEADER_BYTES
+    header_size = pos - offsets
+    if chain.get('auxpow'):
+        merged = np.flatnonzero(version & VERSION_AUXPOW)
+        if len(merged):
+            buf = buf if buf is not None else memoryview(u8)
+            pos[merged] = [skip_auxpow(buf, int(pos[i]), chain) for i in merged]
+
+    tx_count, pos = compact_sizes(u8, pos)
+    tx_header = gather_uint(u8, pos, 4)
+    pos = pos + 4
+    if zcash:
+        overwintered = (tx_header >> np.uint64(31)).astype(bool)
+        v5 = overwintered & ((tx_header & np.uint64(0x7fffffff)) >= 5)
+        pos = pos + 4 * overwintered + 12 * v5
+    else:
+        segwit = (u8[np.minimum(pos, len(u8) - 1)] == 0) & (u8[np.minimum(pos + 1, len(u8) - 1)] != 0)
+        pos = pos + 2 * segwit
+    _, pos = compact_sizes(u8, pos)  # input count
+    tag_length, tag_offset = compact_sizes(u8, pos + 36)
+    tag_length = tag_length.astype(np.int64)
+
+    valid = tag_offset + tag_length <= offsets + sizes
+    tag_offset = np.where(valid, tag_offset, -1)
+    tag_length = np.where(valid, tag_length, 0)
+
+    base_version = version & 0xff if chain.get('auxpow') else version
+    push = u8[np.clip(tag_offset, 0, len(u8) - 1)].astype(np.int64)
+    has_height = valid & (base_version >= 2) & (push >= 1) & (push <= 8) & (tag_length > push)
+    height = low_bytes(gather_uint(u8, np.clip(tag_offset, 0, None) + 1, 8), push).astype(np.int64)
+
+    return {
+        'file': np.zeros(n, COLUMNS['file']),
+        'offset': offsets.astype(COLUMNS['offset']),
+        'size': sizes.astype(COLUMNS['size']),
+        'header_size': header_size.astype(COLUMNS['header_size']),
+        'version': version.astype(COLUMNS['version']),
+        'time': headers['time'].astype(COLUMNS['time']),
+        'bits': headers['bits'].astype(COLUMNS['bits']),
+        'tx_count': tx_count.astype(COLUMNS['tx_count']),
+        'height': np.where(has_height, height, -1),
+        'tag_offset': tag_offset,
+        'tag_length': tag_length.astype(COLUMNS['tag_length']),
+    }
+
+
+def decode_range(path, platform, offsets, sizes, xor_key=None):
+    """Worker task: decode the records [offsets, offsets + sizes) of one file"""
+    chain = CHAINS[platform]
+    start, end = int(offsets[0]), int(offsets[-1] + sizes[-1])
+    u8, mm = map_range(path, start, end, xor_key)
+    try:
+        columns = decode_headers(u8, offsets - start, sizes, chain)
+    finally:
+        del u8  # release the buffer export before unmapping
+        if mm is not None:
+            mm.close()
+    columns['offset'] += start
+    columns['tag_offset'] = np.where(columns['tag_offset'] >= 0, columns['tag_offset'] + start, -1)
+    return columns
+
+
+def concat_columns(parts):
+    if not parts:
+        return {name: np.empty(0, dtype) for name, dtype in COLUMNS.items()}
+    return {name: np.concatenate([part[name] for part in parts]) for name in COLUMNS}
+
+
+def decode_files(paths, platform, workers=None, chunk_bytes=CHUNK_BYTES, xor_key=None):
+    """
+    Decode blk*.dat files into COLUMNS arrays, in file and record order.
+    Byte ranges are spread over `workers` processes (default: all cores);
+    workers=1 decodes in this process.
+    """
+    chain = CHAINS[platform]
+    tasks = []
+    for file_number, path in enumerate(paths):
+        offsets, sizes = record_index(path, chain['magic'], xor_key)
+        for part in split_ranges(offsets, sizes, chunk_bytes):
+            tasks.append((file_number, path, offsets[part], sizes[part]))
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) <= 1:
+        results = [decode_range(path, platform, o, s, xor_key) for _, path, o, s in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(decode_range, path, platform, o, s, xor_key) for _, path, o, s in tasks]
+            results = [future.result() for future in futures]
+
+    for (file_number, _, _, _), columns in zip(tasks, results):
+        columns['file'][:] = file_number
+    return concat_columns(results)
+
+
+def to_frame(columns, paths=None, platform=None):
+    """COLUMNS arrays as a DataFrame; height becomes nullable Int64"""
+    df = pd.DataFrame(columns)
+    df['height'] = pd.array(np.where(df['height'] >= 0, df['height'], 0), dtype='Int64')
+    df.loc[columns['height'] < 0, 'height'] = pd.NA
+    if paths is not None:
+        df['file'] = np.array([os.path.basename(p) for p in paths], dtype=object)[columns['file']]
+    if platform:
+        df.insert(0, 'Platform', platform)
+    return df
+
+
+def hex_rows(rows):
+    """Hex string of every row of a 2-D uint8 array, in one pass"""
+    rows = np.ascontiguousarray(rows)
+    width = rows.shape[1] * 2
+    return np.frombuffer(rows.tobytes().hex().encode(), dtype=f'S{width}').astype(str).astype(object)
+
+
+def header_frame(path, platform, xor_key=None, workers=None, chunk_bytes=CHUNK_BYTES):
+    """
+    One blk*.dat file as the header columns of blk_parser.parse_file
+    (HEADER_TABLE_COLUMNS): enough for heights and hashrate. Only the block
+    hashes and coinbase scripts are built per block, with hashlib and byte
+    slices; the coinbase outputs (value, payout address) still need parse_file.
+    """
+    chain = CHAINS[platform]
+    columns = decode_files([path], platform, workers, chunk_bytes, xor_key)
+    offsets = columns['offset']
+    n = len(offsets)
+    if n == 0:
+        return pd.DataFrame(columns=HEADER_TABLE_COLUMNS)
+
+    u8, mm = map_range(path, 0, int(offsets[-1] + columns['size'][-1]), xor_key)
+    try:
+        prev_hash = hex_rows(u8[offsets[:, None] + np.arange(35, 3, -1)])  # bytes 4..35, reversed
+        if chain.get('x11_hash'):
+            block_hash = np.full(n, None, dtype=object)  # X11 is not in hashlib, as in parse_file
+        else:
+            digests = b''.join(hashlib.sha256(hashlib.sha256(u8[o:o + h]).digest()).digest()
+                               for o, h in zip(offsets.tolist(), columns['header_size'].tolist()))
+            block_hash = hex_rows(np.frombuffer(digests, dtype=np.uint8).reshape(n, 32)[:, ::-1])
+        scripts = [u8[o:o + k].tobytes().hex() if o >= 0 else None
+                   for o, k in zip(columns['tag_offset'].tolist(), columns['tag_length'].tolist())]
+    finally:
+        del u8  # release the buffer export before unmapping
+        if mm is not None:
+            mm.close()
+
+    bits, inverse = np.unique(columns['bits'], return_inverse=True)
+    diff1_bits = chain.get('diff1_bits', DIFF1_BITS)
+    difficulty = np.array([difficulty_from_bits(b, diff1_bits) for b in bits.tolist()])[inverse]
+    df = to_frame(columns)
+    return pd.DataFrame({
+        'Platform': platform,
+        'file': os.path.basename(path),
+        'offset': df['offset'],
+        'block_hash': block_hash,
+        'prev_hash': prev_hash,
+        'version': df['version'].astype(np.int64),
+        'time': df['time'].astype(np.int64),
+        'bits': df['bits'].astype(np.int64),
+        'difficulty': difficulty,
+        'size': df['size'].astype(np.int64),
+        'tx_count': df['tx_count'].astype(np.int64),
+        'coinbase_height': df['height'],
+        'coinbase_script': scripts,
+    }, columns=HEADER_TABLE_COLUMNS)
+
+
+def coinbase_block(height, tag=b'/header-decoder/', version=2):
+    """Minimal block whose coinbase pushes a BIP34 height, for the self-check"""
+    push = height.to_bytes(max(1, (height.bit_length() + 8) // 8), 'little')
+    script = bytes([len(push)]) + push + tag
+    tx = (struct.pack('<I', 1) + b'\x01' + b'\0' * 32 + b'\xff' * 4 + bytes([len(script)]) + script
+          + b'\xff' * 4 + b'\x01' + struct.pack('<q', 50 * 10 ** 8) + b'\x01\x51' + b'\0' * 4)
+    header = struct.pack('<i', version) + b'\0' * 64 + struct.pack('<III', 1231006505 + height * 600,
+                                                                   0x1d00ffff, height)
+    return header + b'\x01' + tx
+
+
+def self_check(directory=None):
+    """Compare the columnar decoder with blk_parser on fixtures, plain and XOR-obfuscated"""
+    import tempfile
+    directory = directory or tempfile.mkdtemp(prefix='header_fixture_')
+    blocks = [bytes.fromhex(GENESIS_BLOCK_HEX)] + [coinbase_block(h) for h in (1, 17, 300, 70000, 850000)]
+    path = fixture_file(os.path.join(directory, 'blk00000.dat'), blocks * 50)
+
+    key = bytes(range(1, 9))
+    data = np.frombuffer(open(path, 'rb').read(), dtype=np.uint8)
+    xored = os.path.join(directory, 'blk00001.dat')
+    with open(xored, 'wb') as f:
+        f.write((data ^ np.resize(np.frombuffer(key, dtype=np.uint8), len(data))).tobytes())
+
+    expected = parse_file(path, 'Bitcoin')
+    single = to_frame(decode_files([path], 'Bitcoin', workers=1))
+    chunked = to_frame(decode_files([path], 'Bitcoin', workers=2, chunk_bytes=1000))
+    obfuscated = to_frame(decode_files([xored], 'Bitcoin', workers=1, chunk_bytes=1000, xor_key=key))
+    tags = [bytes(data[o:o + n]).hex() for o, n in zip(single['tag_offset'], single['tag_length'])]
+    headers = header_frame(path, 'Bitcoin', workers=1, chunk_bytes=1000)
+
+    checks = {
+        'offsets': single['offset'].tolist() == expected['offset'].tolist(),
+        'time': single['time'].tolist() == expected['time'].tolist(),
+        'bits': single['bits'].tolist() == expected['bits'].tolist(),
+        'tx count': single['tx_count'].tolist() == expected['tx_count'].tolist(),
+        'bip34 height': single['height'].equals(expected['coinbase_height'].rename('height')),
+        'coinbase tag': tags == expected['coinbase_script'].tolist(),
+        'byte ranges': chunked.equals(single),
+        'xor key': obfuscated.equals(single),
+        'header table': headers.equals(expected[HEADER_TABLE_COLUMNS]),
+        'header table (xor)': header_frame(xored, 'Bitcoin', workers=1, xor_key=key)
+                              .drop(columns='file').equals(headers.drop(columns='file')),
+    }
+    for name, ok in checks.items():
+        if not ok:
+            print(f"   ❌ {name}")
+    print(f"{'✅' if all(checks.values()) else '❌'} header decoder self-check: "
+          f"{sum(checks.values())}/{len(checks)} checks passed")
+    return all(checks.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Decode blk*.dat headers and coinbase offsets into columns")
+    parser.add_argument('blocks_dir', nargs='?', help="node blocks directory")
+    parser.add_argument('--platform', choices=sorted(CHAINS), default='Bitcoin')
+    parser.add_argument('--workers', type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument('--chunk-mb', type=int, default=CHUNK_BYTES >> 20)
+    parser.add_argument('--output', help="parquet/csv for the decoded columns")
+    parser.add_argument('--self-check', action='store_true')
+    args = parser.parse_args()
+
+    if args.self_check and not self_check():
+        raise SystemExit(1)
+    if args.blocks_dir:
+        paths = block_files(args.blocks_dir)
+        started = time.perf_counter()
+        columns = decode_files(paths, args.platform, args.workers, args.chunk_mb << 20,
+                               read_xor_key(args.blocks_dir))
+        elapsed = time.perf_counter() - started
+        n = len(columns['offset'])
+        print(f"✅ {n:,} {args.platform} headers from {len(paths)} files in {elapsed:.1f}s "
+              f"({n / max(elapsed, 1e-9):,.0f} blocks/s)")
+        if args.output:
+            df = to_frame(columns, paths, args.platform)
+            df.to_parquet(args.output, index=False) if args.output.endswith('.parquet') else df.to_csv(args.output, index=False)
+            print(f"💾 Saved: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,370 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+import zipfile
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+# Record-and-replay for every HTTP request a collector makes through
+# requests. A cassette is one zip archive: interactions.jsonl lists each
+# request (method, URL without credentials) and its response (status,
+# headers, body hash); bodies are stored once under bodies/<sha256>, so
+# repeated pages cost nothing. Replaying a cassette rebuilds a collection
+# offline, in seconds: responses come from the archive and the collectors'
+# politeness sleeps are skipped.
+#
+#   with use_cassette('group1_http.zip', mode='auto'):
+#       collect()
+#
+# Modes: 'record' starts a new cassette and always uses the network,
+# 'replay' never does (an unrecorded request raises CassetteMiss, a
+# requests ConnectionError, so the collectors' error handling applies) and
+# 'auto' replays what is recorded and records the rest.
+#
+# Retryable failures (429 and 5xx) are never recorded, so a rate-limited
+# or flaky run is retried against the network next time instead of being
+# replayed forever; in replay mode such a request is simply a miss.
+#
+# Requests are matched exactly, so replay with the same date ranges (and the
+# same TZ: some collectors build toTs from naive local datetimes).
+
+MODES = ('record', 'replay', 'auto')
+FORMAT_VERSION = 1
+INDEX_MEMBER = 'interactions.jsonl'
+MANIFEST_MEMBER = 'manifest.json'
+
+# Credentials are neither stored nor part of the request key, so a cassette
+# recorded with one token replays with another (or none)
+CREDENTIAL_PARAMS = {'api_key', 'apikey', 'key', 'token', 'access_token', 'client_id', 'client_secret'}
+
+# Describe the stored (already decoded) body, not the original transfer
+DROPPED_HEADERS = {'content-encoding', 'transfer-encoding', 'content-length', 'connection', 'set-cookie'}
+
+
+def retryable(status):
+    """Rate limits and server errors: transient, so not worth keeping"""
+    return status == 429 or status >= 500
+
+
+class CassetteMiss(requests.exceptions.ConnectionError):
+    """A request with no recorded response while replaying"""
+
+
+def sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def clean_url(url):
+    """URL with credential parameters removed and the query sorted"""
+    parts = urlsplit(url)
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                   if k.lower() not in CREDENTIAL_PARAMS)
+    return urlunsplit((parts.scheme, parts.netloc.lower(), parts.path or '/', urlencode(query), ''))
+
+
+def request_key(method, url, body=None):
+    """Content address of a request: method, clean URL and body hash"""
+    if isinstance(body, str):
+        body = body.encode()
+    return sha256(f"{method.upper()} {clean_url(url)} {sha256(body) if body else ''}".encode())
+
+
+class Cassette:
+    def __init__(self, path, mode='auto'):
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode {mode!r}; expected one of {MODES}")
+        self.path = path
+        self.mode = mode
+        self.interactions = []  # recorded order
+        self.by_key = {}        # key -> interactions, replayed in order
+        self.bodies = {}        # sha256 -> bytes, new or already read
+        self.played = {}        # key -> responses replayed so far
+        self.replayed = self.recorded = self.missed = self.skipped = 0
+        self.unsaved = 0
+        if mode != 'record' and os.path.exists(path):
+            self.load()
+
+    def __len__(self):
+        return len(self.interactions)
+
+    def load(self):
+        with zipfile.ZipFile(self.path) as archive:
+            manifest = json.loads(archive.read(MANIFEST_MEMBER))
+            if manifest.get('version') != FORMAT_VERSION:
+                raise ValueError(f"{self.path}: unsupported cassette version {manifest.get('version')}")
+            for line in archive.read(INDEX_MEMBER).decode().splitlines():
+                interaction = json.loads(line)
+                if self.mode == 'auto' and retryable(interaction['status']):
+                    self.unsaved += 1  # from an older cassette: drop it and ask the network again
+                    continue
+                self._index(interaction)
+
+    def _index(self, interaction):
+        self.interactions.append(interaction)
+        self.by_key.setdefault(interaction['key'], []).append(interaction)
+
+    def body(self, digest):
+        if digest not in self.bodies:
+            with zipfile.ZipFile(self.path) as archive:
+                self.bodies[digest] = archive.read(f'bodies/{digest}')
+        return self.bodies[digest]
+
+    def play(self, request):
+        """Recorded response for a prepared request, or None"""
+        key = request_key(request.method, request.url, request.body)
+        recorded = self.by_key.get(key)
+        if not recorded:
+            return None
+        n = self.played.get(key, 0)
+        self.played[key] = n + 1
+        interaction = recorded[min(n, len(recorded) - 1)]  # the last response repeats
+
+        response = requests.models.Response()
+        response.status_code = interaction['status']
+        response.reason = interaction.get('reason', '')
+        response.headers = CaseInsensitiveDict(interaction['headers'])
+        response._content = self.body(interaction['body'])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        response.elapsed = timedelta(0)
+        self.replayed += 1
+        return response
+
+    def record(self, method, url, body, response, elapsed):
+        if retryable(response.status_code):
+            self.skipped += 1
+            return
+        content = response.content
+        digest = sha256(content)
+        self.bodies.setdefault(digest, content)
+        self._index({
+            'key': request_key(method, url, body),
+            'method': method,
+            'url': clean_url(url),
+            'status': response.status_code,
+            'reason': response.reason,
+            'headers': {k: v for k, v in response.headers.items() if k.lower() not in DROPPED_HEADERS},
+            'body': digest,
+            'size': len(content),
+            'elapsed_s': round(elapsed, 4),
+            'recorded_at': datetime.now().isoformat(timespec='seconds'),
+        })
+        self.recorded += 1
+        self.unsaved += 1
+
+    def save(self):
+        """Write the archive (atomically); bodies already on disk are copied over"""
+        if not self.unsaved and (self.mode != 'record' or os.path.exists(self.path)):
+            return
+        needed = {interaction['body'] for interaction in self.interactions}
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        old = zipfile.ZipFile(self.path) if os.path.exists(self.path) and self.mode != 'record' else None
+        try:
+            with zipfile.ZipFile(tmp_path, 'w', zipfile.ZIP_DEFLATED) as archive:
+                archive.writestr(MANIFEST_MEMBER, json.dumps({
+                    'version': FORMAT_VERSION,
+                    'saved_at': datetime.now().isoformat(timespec='seconds'),
+                    'interactions': len(self.interactions),
+                    'bodies': len(needed),
+                }, indent=2))
+                archive.writestr(INDEX_MEMBER, ''.join(json.dumps(i) + '\n' for i in self.interactions))
+                for digest in sorted(needed):
+                    data = self.bodies[digest] if digest in self.bodies else old.read(f'bodies/{digest}')
+                    archive.writestr(f'bodies/{digest}', data)
+        finally:
+            if old is not None:
+                old.close()
+        os.replace(tmp_path, self.path)
+        self.unsaved = 0
+
+    def responses(self):
+        """(interaction, body bytes) for every recorded response, in recorded order"""
+        for interaction in self.interactions:
+            yield interaction, self.body(interaction['body'])
+
+    def report(self):
+        size = os.path.getsize(self.path) / 1024**2 if os.path.exists(self.path) else 0.0
+        print(f"📼 Cassette {self.path} ({self.mode}): {self.replayed} replayed, {self.recorded} recorded, "
+              f"{self.missed} missed, {self.skipped} retryable not kept; {len(self.interactions)} interactions, {size:.1f} MB")
+
+
+@contextmanager
+def use_cassette(path=None, mode='auto', skip_sleep=None, save_every=100):
+    """
+    Route every requests call through a cassette for the duration of the
+    block. skip_sleep (default: on when replaying) turns time.sleep into a
+    no-op, since rate-limit pauses are pointless offline. path=None does
+    nothing, so scripts can pass their --cassette option straight through.
+    """
+    if path is None:
+        yield None
+        return
+
+    cassette = Cassette(path, mode)
+    send = requests.sessions.Session.send
+    sleep = time.sleep
+
+    def cassette_send(session, request, **kwargs):
+        if cassette.mode != 'record':
+            response = cassette.play(request)
+            if response is not None:
+                return response
+            if cassette.mode == 'replay':
+                cassette.missed += 1
+                raise CassetteMiss(f"No recorded response for {request.method} {clean_url(request.url)}",
+                                   request=request)
+        # Taken before sending: other hooks (the mock server's redirect) may rewrite the request
+        method, url, body = request.method, request.url, request.body
+        started = time.perf_counter()
+        response = send(session, request, **kwargs)
+        cassette.record(method, url, body, response, time.perf_counter() - started)
+        if cassette.unsaved >= save_every:
+            cassette.save()  # a crash loses at most save_every responses
+        return response
+
+    requests.sessions.Session.send = cassette_send
+    if skip_sleep if skip_sleep is not None else mode == 'replay':
+        time.sleep = lambda seconds: None
+    try:
+        yield cassette
+    finally:
+        requests.sessions.Session.send = send
+        time.sleep = sleep
+        cassette.save()
+        cassette.report()
+
+
+def cassette_from_argv(default_path, argv=None):
+    """
+    use_cassette() configured from --cassette [PATH] and --cassette-mode in
+    the script's command line (other arguments are left alone). Without
+    --cassette the script runs against the live APIs as before.
+    """
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('--cassette', nargs='?', const=default_path)
+    parser.add_argument('--cassette-mode', choices=MODES, default='auto')
+    args, _ = parser.parse_known_args(sys.argv[1:] if argv is None else argv)
+    return use_cassette(args.cassette, args.cassette_mode)
+
+
+def self_check():
+    """Record against a local server, then replay with the server gone"""
+    import tempfile
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    hits, flaky_hits = [], []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.startswith('/flaky'):
+                flaky_hits.append(self.path)
+                status = 429 if len(flaky_hits) == 1 else 200  # rate limited once
+            else:
+                hits.append(self.path)
+                status = 404 if 'missing' in self.path else 200
+            body = json.dumps({'path': self.path.split('?')[0], 'n': len(hits) if 'counter' in self.path else 0}).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{server.server_address[1]}'
+
+    def collect():
+        return [
+            requests.get(f'{base}/prices', params={'fsym': 'BTC', 'api_key': 'secret'}).json(),
+            requests.get(f'{base}/prices', params={'fsym': 'BTC'}).json(),
+            requests.get(f'{base}/counter').json()['n'],
+            requests.get(f'{base}/counter').json()['n'],
+            requests.get(f'{base}/missing').status_code,
+        ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'http.zip')
+        with use_cassette(path, 'record'):
+            live = collect()
+        flaky_path = os.path.join(tmp, 'flaky.zip')
+        flaky = []
+        for _ in range(2):
+            with use_cassette(flaky_path, 'auto'):
+                flaky.append(requests.get(f'{base}/flaky').status_code)
+        server.shutdown()
+        server.server_close()
+        with zipfile.ZipFile(path) as archive:
+            stored = b''.join(archive.read(name) for name in archive.namelist())
+            n_bodies = sum(name.startswith('bodies/') for name in archive.namelist())
+        started = time.perf_counter()
+        with use_cassette(path, 'replay') as cassette:
+            replayed = collect()
+            time.sleep(5)
+            try:
+                requests.get(f'{base}/unrecorded')
+                missed = False
+            except requests.exceptions.RequestException:
+                missed = True
+        with use_cassette(flaky_path, 'replay'):
+            flaky.append(requests.get(f'{base}/flaky').status_code)
+        checks = {
+            'replay equals live': replayed == live,
+            'sequence replayed in order': replayed[2:4] == [3, 4],
+            'error status kept': replayed[4] == 404,
+            'credentials not stored': b'secret' not in stored,
+            'credential-free key': len(hits) == 5 and cassette.replayed == 5,
+            'bodies deduplicated': n_bodies == 4,
+            'miss raises': missed and cassette.missed == 1,
+            '429 not replayed': flaky == [429, 200, 200] and len(flaky_hits) == 2,
+            'sleep skipped': time.perf_counter() - started < 2,
+        }
+    for name, ok in checks.items():
+        if not ok:
+            print(f"   ❌ {name}")
+    print(f"{'✅' if all(checks.values()) else '❌'} HTTP cassette self-check: "
+          f"{sum(checks.values())}/{len(checks)} checks passed")
+    return all(checks.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect an HTTP cassette")
+    parser.add_argument('cassette', nargs='?')
+    parser.add_argument('--self-check', action='store_true')
+    args = parser.parse_args()
+
+    if args.self_check:
+        raise SystemExit(0 if self_check() else 1)
+    if not args.cassette:
+        parser.print_help()
+        return
+    cassette = Cassette(args.cassette, 'replay')
+    hosts = {}
+    for interaction in cassette.interactions:
+        host = urlsplit(interaction['url']).netloc
+        stats = hosts.setdefault(host, {'requests': 0, 'errors': 0, 'bytes': 0})
+        stats['requests'] += 1
+        stats['errors'] += interaction['status'] >= 400
+        stats['bytes'] += interaction['size']
+    print(f"📼 {args.cassette}: {len(cassette)} interactions, "
+          f"{len({i['body'] for i in cassette.interactions})} distinct bodies")
+    for host, stats in sorted(hosts.items()):
+        print(f"   {host}: {stats['requests']} requests, {stats['errors']} errors, {stats['bytes'] / 1024:.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
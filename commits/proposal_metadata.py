@@ -0,0 +1,181 @@
+import re
+from datetime import date
+
+# Improvement proposals open with a small header block: YAML front matter for
+# EIPs (--- ... ---) and a <pre> preamble for mediawiki BIPs. Only that block is
+# tokenised; the body is never split into lines.
+FRONTMATTER_OPEN_RE = re.compile(r'\A[\ufeff\s]*---[ \t]*\r?\n')
+FRONTMATTER_CLOSE_RE = re.compile(r'^---[ \t]*\r?$', re.M)
+PRE_OPEN_RE = re.compile(r'<pre>[ \t]*\r?\n?', re.I)
+PRE_CLOSE_RE = re.compile(r'</pre>', re.I)
+FIELD_RE = re.compile(r'^[ \t]*([A-Za-z][A-Za-z0-9_-]*)[ \t]*:[ \t]?(.*?)[ \t]*\r?$')
+CONTINUATION_RE = re.compile(r'^[ \t]+(\S.*?)[ \t]*\r?$')
+DATE_RE = re.compile(r'(\d{4})-(\d{1,2})-(\d{1,2})')
+NUMBER_RE = re.compile(r'\d+')
+# Split author lists on commas that are not inside <email> or (@handle) groups
+AUTHOR_SPLIT_RE = re.compile(r',\s*(?![^<(]*[>)])')
+
+# Preambles are at the top of the file; do not search the whole body for them
+PREAMBLE_SEARCH_LIMIT = 4096
+
+LINK_FIELDS = {
+    'requires': 'requires',
+    'replaces': 'replaces',
+    'superseded-by': 'superseded_by',
+}
+AUTHOR_FIELDS = ('author', 'authors')
+CREATED_FIELDS = ('created', 'assigned')
+
+
+class ProposalRecord:
+    """Typed metadata for a single EIP/BIP header"""
+    __slots__ = ('number', 'title', 'status', 'type', 'category', 'layer',
+                 'created', 'created_raw', 'authors', 'requires', 'replaces',
+                 'superseded_by', 'fields', 'content')
+
+    def __init__(self, number=None):
+        self.number = number
+        self.title = None
+        self.status = None
+        self.type = None
+        self.category = None
+        self.layer = None
+        self.created = None
+        self.created_raw = None
+        self.authors = []
+        self.requires = []
+        self.replaces = []
+        self.superseded_by = []
+        self.fields = {}
+        self.content = ''
+
+    @property
+    def year(self):
+        return self.created.year if self.created else None
+
+    def to_metadata(self):
+        """Return the flat dict shape used by get_eip_data collectors"""
+        metadata = {}
+        for key in ('title', 'status', 'type', 'category', 'layer'):
+            value = getattr(self, key)
+            if value:
+                metadata[key] = value
+        if self.authors:
+            metadata['author'] = ', '.join(self.authors)
+        if self.created is not None:
+            metadata['created'] = self.created.isoformat()
+        elif self.created_raw:
+            metadata['created'] = self.created_raw
+        if 'updated' in self.fields:
+            metadata['updated'] = self.fields['updated']
+        metadata['content'] = self.content
+        return metadata
+
+    def __repr__(self):
+        return (f"ProposalRecord(number={self.number!r}, title={self.title!r}, "
+                f"status={self.status!r}, created={self.created!r})")
+
+
+def parse_date(value):
+    """Parse the first YYYY-MM-DD date in a header value"""
+    match = DATE_RE.search(value or '')
+    if not match:
+        return None
+    try:
+        return date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+    except ValueError:
+        return None
+
+
+def split_authors(value):
+    """Split an author header value into individual author strings"""
+    return [author.strip() for author in AUTHOR_SPLIT_RE.split(value) if author.strip()]
+
+
+def find_header(content):
+    """
+    Locate the header block.
+    Returns (format, block_start, header_start, header_end, body_start) or
+    None when no preamble is present.
+    """
+    match = FRONTMATTER_OPEN_RE.match(content)
+    if match:
+        close = FRONTMATTER_CLOSE_RE.search(content, match.end())
+        if close:
+            body_start = close.end()
+            if content.startswith('\n', body_start):
+                body_start += 1
+            return 'yaml', match.start(), match.end(), close.start(), body_start
+
+    match = PRE_OPEN_RE.search(content, 0, PREAMBLE_SEARCH_LIMIT)
+    if match:
+        close = PRE_CLOSE_RE.search(content, match.end())
+        if close:
+            body_start = close.end()
+            if content.startswith('\n', body_start):
+                body_start += 1
+            return 'mediawiki', match.start(), match.end(), close.start(), body_start
+
+    return None
+
+
+def parse_header_fields(header):
+    """Parse 'Key: value' lines, folding indented continuation lines into lists"""
+    fields = {}
+    current_key = None
+
+    for line in header.split('\n'):
+        match = FIELD_RE.match(line)
+        if match:
+            current_key = match.group(1).lower()
+            fields[current_key] = [match.group(2)] if match.group(2) else []
+            continue
+
+        if current_key is not None:
+            match = CONTINUATION_RE.match(line)
+            if match:
+                fields[current_key].append(match.group(1))
+
+    return fields
+
+
+def parse_proposal(content, number=None, excerpt_chars=1000):
+    """
+    Parse EIP/BIP content into a ProposalRecord.
+    Scanning stops at the end of the header block; only the first
+    excerpt_chars characters of the body are kept.
+    """
+    record = ProposalRecord(number)
+    header = find_header(content)
+
+    if header is None:
+        body = content[:excerpt_chars]
+    else:
+        _, block_start, header_start, header_end, body_start = header
+        leading = content[:block_start]
+        body = (leading + content[body_start:body_start + excerpt_chars])[:excerpt_chars]
+
+        raw_fields = parse_header_fields(content[header_start:header_end])
+        for key, values in raw_fields.items():
+            if key in AUTHOR_FIELDS:
+                authors = []
+                for value in values:
+                    authors.extend(split_authors(value))
+                record.authors.extend(authors)
+                record.fields[key] = ', '.join(authors)
+                continue
+
+            value = ' '.join(values).strip()
+            record.fields[key] = value
+
+            if key in LINK_FIELDS:
+                setattr(record, LINK_FIELDS[key], [int(n) for n in NUMBER_RE.findall(value)])
+            elif key in CREATED_FIELDS:
+                if record.created_raw is None or key == 'created':
+                    record.created_raw = value
+                    record.created = parse_date(value)
+            elif key in ('title', 'status', 'type', 'category', 'layer'):
+                setattr(record, key, value)
+
+    record.content = body.replace('\n', ' ').strip()
+    return record
@@ -0,0 +1,149 @@
+from array import array
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+# Columnar record builders for the collectors. Instead of keeping one dict
+# per collected item until the end, each field is appended to a typed
+# column: numbers, flags and timestamps go into array.array buffers (8 bytes
+# per value, 1 for flags), text stays a list of references. to_frame() wraps
+# the numeric buffers as NumPy arrays without copying them.
+
+# Column kinds: array typecode (None: Python list) and missing-value filler
+KINDS = {
+    'int': ('q', 0),
+    'float': ('d', float('nan')),
+    'bool': ('b', 0),
+    'datetime': ('q', 0),  # microseconds since the epoch, tz-naive (pandas' default unit)
+    'str': (None, None),
+    'object': (None, None),
+}
+
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+
+def to_microseconds(value):
+    if isinstance(value, datetime) and not isinstance(value, pd.Timestamp) and value.tzinfo is None:
+        return (value - EPOCH) // MICROSECOND
+    return pd.Timestamp(value).value // 1000
+
+
+class ColumnBuffer:
+    """Append-only column of one kind; tracks missing values for int, bool and datetime"""
+
+    def __init__(self, kind):
+        if kind not in KINDS:
+            raise ValueError(f"Unknown column kind {kind!r}; expected one of {sorted(KINDS)}")
+        self.kind = kind
+        typecode, self.filler = KINDS[kind]
+        self.values = array(typecode) if typecode else []
+        self.missing = None  # bytearray, created at the first missing value
+
+    def __len__(self):
+        return len(self.values)
+
+    def append(self, value):
+        if self.kind in ('str', 'object'):
+            self.values.append(value)
+            return
+        if value is None or value is pd.NaT or (isinstance(value, float) and value != value):
+            if self.kind != 'float':
+                if self.missing is None:
+                    self.missing = bytearray(len(self.values))
+                self.missing.append(1)
+            self.values.append(self.filler)
+            return
+        if self.kind == 'float':
+            self.values.append(float(value))
+        elif self.kind == 'datetime':
+            self.values.append(to_microseconds(value))
+        else:
+            self.values.append(int(value))
+        if self.missing is not None:
+            self.missing.append(0)
+
+    def pop(self):
+        """Drop the last value (undoes a partly appended record)"""
+        self.values.pop()
+        if self.missing is not None and len(self.missing) > len(self.values):
+            self.missing.pop()
+
+    def to_array(self):
+        """NumPy / pandas array over the buffer (no copy for the numeric kinds)"""
+        if self.kind in ('str', 'object'):
+            out = np.empty(len(self.values), dtype=object)
+            out[:] = self.values
+            return out
+        data = np.frombuffer(self.values, dtype=np.int8 if self.kind == 'bool' else self.values.typecode)
+        mask = np.frombuffer(self.missing, dtype=bool) if self.missing is not None else None
+        if self.kind == 'datetime':
+            data = data.view('datetime64[us]')
+            if mask is not None:
+                data = data.copy()
+                data[mask] = np.datetime64('NaT')
+            return data
+        if self.kind == 'bool':
+            data = data.view(bool)
+            return pd.arrays.BooleanArray(data, mask) if mask is not None else data
+        if mask is not None:
+            return pd.arrays.IntegerArray(data, mask)
+        return data
+
+    @property
+    def nbytes(self):
+        if self.kind in ('str', 'object'):
+            return 8 * len(self.values)  # references only
+        return self.values.itemsize * len(self.values) + len(self.missing or b'')
+
+
+class RecordBuffer:
+    """
+    Columnar replacement for a list of record dicts.
+
+        blocks = RecordBuffer({'block_id': 'int', 'block_hash': 'str', ...})
+        blocks.append({'block_id': 1, 'block_hash': '00ab...'})
+        df = blocks.to_frame()
+
+    The frame shares memory with the numeric buffers, so build it once the
+    collection is complete (the buffers cannot grow while it is alive).
+    Fields missing from a record are stored as missing values; fields not in
+    the schema raise KeyError so a typo does not silently drop data.
+    """
+
+    def __init__(self, schema):
+        self.schema = dict(schema)
+        self.columns = {name: ColumnBuffer(kind) for name, kind in self.schema.items()}
+
+    def __len__(self):
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    def append(self, record=None, **values):
+        if record:
+            values = {**record, **values}
+        unknown = set(values) - self.columns.keys()
+        if unknown:
+            raise KeyError(f"Fields not in the record schema: {sorted(unknown)}")
+        done = []
+        try:
+            for name, column in self.columns.items():
+                column.append(values.get(name))
+                done.append(column)
+        except (TypeError, ValueError):
+            for column in done:
+                column.pop()  # keep the columns aligned
+            raise
+
+    def extend(self, records):
+        for record in records:
+            self.append(record)
+
+    def to_frame(self):
+        """DataFrame in schema column order, wrapping the buffers"""
+        return pd.DataFrame({name: column.to_array() for name, column in self.columns.items()}, copy=False)
+
+    @property
+    def nbytes(self):
+        return sum(column.nbytes for column in self.columns.values())
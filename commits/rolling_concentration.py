@@ -0,0 +1,202 @@
+import math
+import pandas as pd
+
+from time_buckets import DEFAULT_WINDOW, week_start
+
+# Rolling N-week concentration metrics maintained incrementally: each step
+# adds the entering week's participant counts and subtracts the leaving
+# week's, so a step costs O(changed participants * log max_count) instead of
+# a rescan of the whole window.
+
+
+class Fenwick:
+    """Binary indexed tree over positions 1..size (prefix sums in O(log size))"""
+
+    def __init__(self, size):
+        self.size = size
+        self.tree = [0] * (size + 1)
+        self.top = 1 << (size.bit_length() - 1) if size else 0
+
+    def add(self, i, delta):
+        tree = self.tree
+        while i <= self.size:
+            tree[i] += delta
+            i += i & -i
+
+    def prefix(self, i):
+        """Sum of positions 1..i"""
+        tree = self.tree
+        total = 0
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    def search(self, limit):
+        """Largest i with prefix(i) <= limit (entries must be non-negative)"""
+        tree = self.tree
+        pos, step = 0, self.top
+        while step:
+            nxt = pos + step
+            if nxt <= self.size and tree[nxt] <= limit:
+                pos = nxt
+                limit -= tree[nxt]
+            step >>= 1
+        return pos
+
+
+def _clogc(c):
+    return c * math.log(c) if c > 0 else 0.0
+
+
+class SlidingConcentration:
+    """
+    Participant counts of one sliding window with running sums for the
+    concentration metrics:
+
+    - total N and sum of squared counts: HHI = sum(c^2) / N^2
+    - sum of c ln c: Shannon entropy = ln N - sum(c ln c) / N
+    - sum over pairs of |c_i - c_j|: Gini = pairs / (n N)
+    - count and mass Fenwick trees keyed by count value (largest first)
+      for the pair sums and the Nakamoto coefficient
+
+    Counts are integers, so every running sum except c ln c is exact.
+    """
+
+    def __init__(self, max_count):
+        self.max_count = max_count
+        self.counts = {}
+        self.total = 0
+        self.sum_sq = 0
+        self.sum_clogc = 0.0
+        self.pair_diff = 0
+        self.n_tree = 0  # participants and counts held in the trees
+        self.mass_tree = 0
+        self.freq = Fenwick(max_count)  # participants per count value
+        self.mass = Fenwick(max_count)  # counts per count value
+
+    def _position(self, value):
+        return self.max_count - value + 1
+
+    def _insert(self, value, sign):
+        pos = self._position(value)
+        self.freq.add(pos, sign)
+        self.mass.add(pos, sign * value)
+        self.n_tree += sign
+        self.mass_tree += sign * value
+
+    def _abs_deviation(self, x):
+        """Sum of |x - c| over the participants currently in the trees"""
+        above = self.max_count - x  # positions holding values > x
+        n_above, mass_above = self.freq.prefix(above), self.mass.prefix(above)
+        n_rest, mass_rest = self.n_tree - n_above, self.mass_tree - mass_above
+        return (mass_above - x * n_above) + (x * n_rest - mass_rest)
+
+    def update(self, participant, delta):
+        """Change one participant's count by delta"""
+        old = self.counts.get(participant, 0)
+        new = old + delta
+        if new < 0 or new > self.max_count:
+            raise ValueError(f"count of {participant!r} would be {new}, outside 0..{self.max_count}")
+
+        if old:
+            self._insert(old, -1)
+            self.pair_diff -= self._abs_deviation(old)
+        if new:
+            self.pair_diff += self._abs_deviation(new)
+            self._insert(new, 1)
+            self.counts[participant] = new
+        else:
+            self.counts.pop(participant, None)
+
+        self.total += delta
+        self.sum_sq += new * new - old * old
+        self.sum_clogc += _clogc(new) - _clogc(old)
+
+    def step(self, entering=None, leaving=None):
+        """
+        Add the entering (participants, counts) and subtract the leaving
+        ones; participants in both are netted so unchanged ones cost nothing
+        """
+        deltas = {}
+        for part, sign in ((entering, 1), (leaving, -1)):
+            if part is not None:
+                for participant, count in zip(*part):
+                    deltas[participant] = deltas.get(participant, 0) + sign * int(count)
+        for participant, delta in deltas.items():
+            if delta:
+                self.update(participant, delta)
+
+    def nakamoto(self):
+        """Fewest participants whose combined count exceeds half the window"""
+        if not self.total:
+            return 0
+        pos = self.mass.search(self.total // 2)
+        mass_before, n_before = self.mass.prefix(pos), self.freq.prefix(pos)
+        value = self.max_count - pos  # count value at the next occupied position
+        return n_before + (self.total - 2 * mass_before) // (2 * value) + 1
+
+    def metrics(self):
+        n, total = len(self.counts), self.total
+        if not total:
+            return None
+        return {
+            'inverse_hhi': total * total / self.sum_sq,
+            'shannon': math.log(total) - self.sum_clogc / total,
+            'gini': self.pair_diff / (n * total),
+            'nakamoto': self.nakamoto(),
+            'total': total,
+            'unique': n,
+        }
+
+
+def weekly_participant_counts(daily, participant, platform='Platform'):
+    """Daily participant counts summed into ISO weeks dated by their Monday"""
+    weekly = daily.assign(Date=week_start(daily['Date']))
+    return weekly.groupby([platform, 'Date', participant], as_index=False)['count'].sum()
+
+
+def rolling_concentration(daily, participant, label, unit, participants, window=DEFAULT_WINDOW,
+                          platform='Platform'):
+    """
+    Rolling `window`-week concentration metrics from time_buckets.daily_counts
+    output. Windows are keyed by their last ISO week and end at every week
+    from a platform's first to its last active week, as in
+    time_buckets.rollup(..., 'rolling'); windows with no rows are skipped.
+    """
+    weekly = weekly_participant_counts(daily, participant, platform)
+    step = pd.Timedelta(weeks=1)
+    rows = []
+
+    for name, group in weekly.groupby(platform, sort=True):
+        by_week = {week: (part[participant].to_numpy(), part['count'].to_numpy())
+                   for week, part in group.groupby('Date')}
+        weeks = pd.date_range(group['Date'].min(), group['Date'].max(), freq='7D')
+
+        # Largest count any participant can reach: the busiest window's total
+        totals = group.groupby('Date')['count'].sum().reindex(weeks, fill_value=0)
+        max_count = int(totals.rolling(window, min_periods=1).sum().max())
+        state = SlidingConcentration(max_count)
+
+        for end in weeks:
+            state.step(by_week.get(end), by_week.get(end - window * step))
+
+            metrics = state.metrics()
+            if metrics is None:
+                continue
+            year, week, _ = end.isocalendar()
+            rows.append({
+                platform: name,
+                'Year': year,
+                'Week': week,
+                f'{label}_Inverse_HHI': metrics['inverse_hhi'],
+                f'{label}_Shannon_Entropy': metrics['shannon'],
+                f'Total_{unit}': metrics['total'],
+                f'Unique_{participants}': metrics['unique'],
+                f'{label}_Gini': metrics['gini'],
+                f'{label}_Nakamoto': metrics['nakamoto'],
+            })
+
+    columns = [platform, 'Year', 'Week', f'{label}_Inverse_HHI', f'{label}_Shannon_Entropy', f'Total_{unit}',
+               f'Unique_{participants}', f'{label}_Gini', f'{label}_Nakamoto']
+    return pd.DataFrame(rows, columns=columns)
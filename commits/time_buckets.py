@@ -0,0 +1,153 @@
+import numpy as np
+import pandas as pd
+
+# Time bucketing for the metric scripts. Raw rows are reduced once to per-day
+# sufficient statistics (participant counts, or row counts and sums); daily,
+# weekly, monthly and rolling N-week metrics are all rolled up from those, so
+# changing the granularity never re-scans the raw rows.
+
+GRANULARITIES = ('day', 'week', 'month', 'rolling')
+
+# Key columns of each granularity. Weekly keys are ISO year/week as in the
+# existing outputs; rolling windows are keyed by their last ISO week.
+BUCKET_KEYS = {
+    'day': ['Date'],
+    'week': ['Year', 'Week'],
+    'month': ['Year', 'Month'],
+    'rolling': ['Year', 'Week'],
+}
+
+DEFAULT_WINDOW = 4  # weeks per rolling window
+
+
+def bucket_label(granularity, window=DEFAULT_WINDOW):
+    """Name used in file names and messages: daily, weekly, monthly, rolling4w"""
+    if granularity == 'rolling':
+        return f'rolling{window}w'
+    return {'day': 'daily', 'week': 'weekly', 'month': 'monthly'}[granularity]
+
+
+def to_days(values):
+    """Calendar day of each timestamp, NaT where it does not parse"""
+    days = pd.to_datetime(values, errors='coerce')
+    if days.dt.tz is not None:
+        days = days.dt.tz_localize(None)
+    return days.dt.normalize()
+
+
+def week_start(days):
+    """Monday of each day's ISO week"""
+    return days - pd.to_timedelta(days.dt.weekday, unit='D')
+
+
+def daily_counts(df, time, participant, platform='Platform'):
+    """
+    Rows per (platform, day, participant): the sufficient statistic for
+    concentration metrics. Rows missing any of the three are dropped, as the
+    groupby in the weekly scripts did.
+    """
+    days = to_days(df[time])
+    keep = (days.notna() & df[platform].notna() & df[participant].notna()).to_numpy()
+    rows = pd.DataFrame({
+        platform: df[platform][keep].reset_index(drop=True),
+        'Date': days[keep].reset_index(drop=True),
+        participant: df[participant][keep].reset_index(drop=True),
+    })
+    return rows.groupby([platform, 'Date', participant]).size().reset_index(name='count')
+
+
+def daily_totals(df, time, sums=(), counts=(), platform='Platform'):
+    """
+    Row counts per (platform, day), plus `{col}__n` non-missing counts for
+    `counts` and `sums` columns and `{col}__sum` totals for `sums` columns.
+    Means over any bucket are then sum / n.
+    """
+    days = to_days(df[time])
+    keep = (days.notna() & df[platform].notna()).to_numpy()
+    values = {
+        platform: df[platform][keep].reset_index(drop=True),
+        'Date': days[keep].reset_index(drop=True),
+        'rows': np.ones(keep.sum(), dtype=np.int64),
+    }
+    for col in counts:
+        values[f'{col}__n'] = df[col][keep].notna().to_numpy(dtype=np.int64)
+    for col in sums:
+        numeric = pd.to_numeric(df[col][keep], errors='coerce')
+        values[f'{col}__sum'] = numeric.fillna(0).to_numpy(dtype=np.float64)
+        values[f'{col}__n'] = numeric.notna().to_numpy(dtype=np.int64)
+    return pd.DataFrame(values).groupby([platform, 'Date'], as_index=False).sum()
+
+
+def bucket_keys(days, granularity):
+    """Key columns of each day's bucket"""
+    if granularity == 'day':
+        return pd.DataFrame({'Date': days})
+    if granularity == 'month':
+        return pd.DataFrame({'Year': days.dt.year.astype('int64'), 'Month': days.dt.month.astype('int64')})
+    iso = days.dt.isocalendar()
+    return pd.DataFrame({'Year': iso['year'].astype('int64'), 'Week': iso['week'].astype('int64')})
+
+
+def expand_windows(stats, window, by=(), platform='Platform'):
+    """
+    Weekly sums repeated into each of the `window` windows that contain
+    them, dated by the window's last week. Windows end at every week
+    from a platform's first to its last active week; the first window-1
+    of them cover fewer weeks.
+    """
+    by = list(by)
+    value_cols = [c for c in stats.columns if c not in [platform, 'Date'] + by]
+    weekly = stats.assign(Date=week_start(stats['Date']))
+    weekly = weekly.groupby([platform, 'Date'] + by, as_index=False)[value_cols].sum()
+
+    last = weekly.groupby(platform)['Date'].max()
+    expanded = pd.concat([weekly.assign(Date=weekly['Date'] + pd.Timedelta(weeks=k)) for k in range(window)],
+                         ignore_index=True)
+    inside = (expanded['Date'] <= expanded[platform].map(last)).to_numpy()
+    return expanded[inside].reset_index(drop=True)
+
+
+def rollup(stats, granularity, by=(), window=DEFAULT_WINDOW, platform='Platform'):
+    """
+    Sum per-day statistics into buckets of the given granularity. `by` are
+    extra grouping columns kept as they are (e.g. the participant); every
+    other column is summed.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity {granularity!r}, expected one of {GRANULARITIES}")
+    by = list(by)
+    if granularity == 'rolling':
+        stats = expand_windows(stats, window, by, platform)
+
+    value_cols = [c for c in stats.columns if c not in [platform, 'Date'] + by]
+    keys = bucket_keys(stats['Date'], granularity)
+    frame = pd.concat([stats[[platform]], keys, stats[by + value_cols]], axis=1)
+    return frame.groupby([platform] + list(keys.columns) + by, as_index=False)[value_cols].sum()
+
+
+def concentration_metrics(counts, keys, label, unit, participants, platform='Platform'):
+    """
+    Inverse HHI and Shannon entropy of participant shares per bucket,
+    computed for all buckets at once. Columns follow calc.py:
+    {label}_Inverse_HHI, {label}_Shannon_Entropy, Total_{unit},
+    Unique_{participants}.
+    """
+    group = [platform] + list(keys)
+    columns = group + [f'{label}_Inverse_HHI', f'{label}_Shannon_Entropy', f'Total_{unit}',
+                       f'Unique_{participants}']
+    counts = counts[counts['count'] > 0]
+    if counts.empty:
+        return pd.DataFrame(columns=columns)
+
+    grouped = counts.groupby(group)['count']
+    share = counts['count'] / grouped.transform('sum')
+    parts = pd.DataFrame({'hhi': share ** 2, 'entropy': -share * np.log(share)})
+    sums = parts.groupby([counts[c] for c in group]).sum()
+
+    metrics = pd.DataFrame({
+        f'{label}_Inverse_HHI': 1 / sums['hhi'],
+        f'{label}_Shannon_Entropy': sums['entropy'],
+        f'Total_{unit}': grouped.sum().astype('int64'),
+        f'Unique_{participants}': grouped.size(),
+    })
+    return metrics.reset_index()[columns]
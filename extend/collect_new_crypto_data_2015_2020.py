@@ -4,6 +4,11 @@ from datetime import datetime, timedelta
 import time
 import numpy as np
 import gc
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'commits'))
+from http_cassette import cassette_from_argv
 
 class NewCryptoDataCollector2015_2020:
     def __init__(self):
@@ -446,5 +451,7 @@ class NewCryptoDataCollector2015_2020:
 
 # Execute the collection
 if __name__ == "__main__":
+    # --cassette [PATH] records API responses; --cassette-mode replay rebuilds offline
     collector = NewCryptoDataCollector2015_2020()
-    collector.run_collection()
+    with cassette_from_argv('new_crypto_2015_2020_http_cassette.zip'):
+        collector.run_collection()
@@ -3,6 +3,11 @@ import numpy as np
 import os
 from datetime import datetime
 import json
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'proposal'))
+from source_registry import REPO_ROOT, SOURCES
+from panel_io import read_metadata, read_table
 
 class RADataInventoryAnalyzer:
     def __init__(self):
@@ -28,62 +33,39 @@ class RADataInventoryAnalyzer:
             ]
         }
         
-        # File paths to analyze
-        self.file_paths = {
-            # Commits folder
-            'commits/blockchain_block_data_real_2021_2024.xlsx': 'Block Data',
-            'commits/blockchain_commit_data_all_2021_2024.xlsx': 'Commit Data',
-            'commits/blockchain_decentralization_metrics_weekly_2021_2024_fixed.xlsx': 'Decentralization Metrics',
-            'commits/blockchain_market_hashrate_weekly_2021_2024.xlsx': 'Market & Hashrate',
-            'commits/ethereum_eip_data_2021_2024.xlsx': 'Ethereum EIP Data',
-            'commits/improvement_proposals_all_platforms_2021_2024.xlsx': 'Improvement Proposals',
-            
-            # Proposal folder
-            'proposal/Panel_data_cleaned_May23_2025.dta': 'Historical Panel Data',
-            'proposal/detailed_proposal_analysis.xlsx': 'Detailed Proposals',
-            'proposal/integrated_blockchain_governance_dataset_2015_2024.xlsx': 'Integrated Dataset',
-            'proposal/proposal_topic_diversity_weekly.xlsx': 'Topic Diversity',
-            
-            # Updated work folder
-            'proposal/updated work/GROUP1_FINAL_integrated_dataset_memory_efficient.xlsx': 'Group 1 Final Dataset',
-            'proposal/updated work/cryptocompare_timeseries_2021_2024.xlsx': 'CryptoCompare Data',
-            'proposal/updated work/difficulty_data_full_2021_2024.xlsx': 'Difficulty Data',
-            'proposal/updated work/task1_base_panel_checkpoint.xlsx': 'Base Panel Checkpoint',
-            'proposal/updated work/task2_blocks_checkpoint.xlsx': 'Blocks Checkpoint',
-            'proposal/updated work/task2_commits_checkpoint.xlsx': 'Commits Checkpoint',
-            'proposal/updated work/task2_decentralization_checkpoint.xlsx': 'Decentralization Checkpoint',
-            'proposal/updated work/task2_market_checkpoint.xlsx': 'Market Checkpoint',
-            'proposal/updated work/task2_proposals_checkpoint.xlsx': 'Proposals Checkpoint',
-            'proposal/updated work/task3_cryptocompare_checkpoint.xlsx': 'CryptoCompare Checkpoint',
-            'proposal/updated work/task3_github_checkpoint.xlsx': 'GitHub Checkpoint',
-            'proposal/updated work/task3_reddit_checkpoint.xlsx': 'Reddit Checkpoint'
-        }
+        # File paths to analyze, taken from the shared source registry
+        self.file_paths = {source.path: source.description for source in SOURCES.values()}
     
     def analyze_file(self, file_path, description):
         """Analyze a single file and extract metadata"""
         print(f"Analyzing: {description} ({file_path})")
         
-        if not os.path.exists(file_path):
+        path = os.path.join(REPO_ROOT, file_path)
+        if not os.path.exists(path):
             return {
                 'status': 'FILE_NOT_FOUND',
                 'error': f"File not found: {file_path}"
             }
         
         try:
-            # Load file based on extension
-            if file_path.endswith('.xlsx'):
-                df = pd.read_excel(file_path)
-            elif file_path.endswith('.dta'):
-                df = pd.read_stata(file_path)
-            else:
+            # Header-only pass for the column list and row count
+            try:
+                metadata = read_metadata(path)
+            except ValueError:
                 return {'status': 'UNSUPPORTED_FORMAT'}
+            columns = metadata['columns']
+            
+            # Only the key columns are parsed for date/platform details
+            key_vars = ['Platform', 'year', 'week', 'date']
+            df = read_table(path, columns=key_vars)
+            nrows = metadata['nrows'] if metadata['nrows'] is not None else len(df)
             
             # Basic file info
             result = {
                 'status': 'SUCCESS',
-                'shape': df.shape,
-                'columns': list(df.columns),
-                'memory_mb': df.memory_usage(deep=True).sum() / 1024**2,
+                'shape': (nrows, len(columns)),
+                'columns': columns,
+                'size_mb': os.path.getsize(path) / 1024**2,
                 'found_variables': {},
                 'date_info': {},
                 'platform_info': {},
@@ -92,7 +74,7 @@ class RADataInventoryAnalyzer:
             
             # Check for target variables
             for category, variables in self.target_variables.items():
-                found = [var for var in variables if var in df.columns]
+                found = [var for var in variables if var in columns]
                 if found:
                     result['found_variables'][category] = found
             
@@ -125,7 +107,6 @@ class RADataInventoryAnalyzer:
                 result['platform_info']['platform_count'] = len(platforms)
             
             # Sample data for key variables
-            key_vars = ['Platform', 'year', 'week', 'date']
             available_key_vars = [var for var in key_vars if var in df.columns]
             if available_key_vars:
                 sample = df[available_key_vars].head(3).to_dict('records')
@@ -166,7 +147,7 @@ class RADataInventoryAnalyzer:
                 if result['status'] == 'SUCCESS':
                     f.write(f"✅ STATUS: Successfully analyzed\n")
                     f.write(f"📊 SHAPE: {result['shape'][0]:,} rows × {result['shape'][1]} columns\n")
-                    f.write(f"💾 SIZE: {result['memory_mb']:.1f} MB\n\n")
+                    f.write(f"💾 FILE SIZE: {result['size_mb']:.1f} MB\n\n")
                     
                     # Found variables
                     if result['found_variables']:
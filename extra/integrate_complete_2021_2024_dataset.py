@@ -1,10 +1,18 @@
 import pandas as pd
 import numpy as np
 import gc
+import os
+import sys
 from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'proposal'))
+from panel_join import PanelJoiner
+from source_registry import get_source
+from panel_dtypes import compact_frame, memory_mb, replace_values, report
+from instrumentation import span, start_trace, traced
+
 class Complete2021_2024DatasetIntegrator:
     def __init__(self):
         print("🚀 COMPLETE 2021-2024 DATASET INTEGRATION")
@@ -44,55 +52,22 @@ class Complete2021_2024DatasetIntegrator:
             df = df[df[platform_col].str.strip() != '']
             
             # Apply platform name mapping
-            df[platform_col] = df[platform_col].replace(self.platform_mapping)
+            df[platform_col] = replace_values(df[platform_col], self.platform_mapping)
             
             # Filter for target platforms only
             df = df[df[platform_col].isin(self.target_platforms)]
         
         return df
     
-    def optimize_memory(self, df, name):
-        """Optimize dataframe memory usage"""
-        print(f"  🔧 Optimizing {name} memory...")
-        original_memory = df.memory_usage(deep=True).sum() / 1024**2
-        
-        for col in df.columns:
-            if df[col].dtype == 'float64':
-                df[col] = pd.to_numeric(df[col], downcast='float')
-            elif df[col].dtype == 'int64':
-                df[col] = pd.to_numeric(df[col], downcast='integer')
-            elif df[col].dtype == 'object':
-                if df[col].nunique() / len(df) < 0.5:
-                    try:
-                        df[col] = df[col].astype('category')
-                    except:
-                        pass
-        
-        optimized_memory = df.memory_usage(deep=True).sum() / 1024**2
-        saved = original_memory - optimized_memory
-        print(f"    💾 Memory saved: {saved:.1f} MB")
-        
-        return df
-    
+    @traced('parse', name='decentralization')
     def load_and_process_decentralization_data(self):
         """Load decentralization metrics (Block_HHI, Block_Shannon, Commit_HHI, Commit_Shannon)"""
         print("\n📊 Loading decentralization metrics...")
         
         try:
-            df = pd.read_excel('commits/blockchain_decentralization_metrics_weekly_2021_2024_fixed.xlsx')
+            # Paths, column renames and compact dtypes come from the source registry
+            df = get_source('decentralization').load(compact=True)
             df = self.standardize_platform_names(df)
-            df = self.optimize_memory(df, 'decentralization')
-            
-            # Rename columns to match expected format
-            column_mapping = {
-                'Year': 'year',
-                'Week': 'week',
-                'Block_Inverse_HHI': 'Block_HHI',
-                'Block_Shannon_Entropy': 'Block_Shannon',
-                'Commit_Inverse_HHI': 'Commit_HHI', 
-                'Commit_Shannon_Entropy': 'Commit_Shannon'
-            }
-            df = df.rename(columns=column_mapping)
             
             print(f"  ✅ Decentralization data: {df.shape}")
             return df
@@ -101,23 +76,14 @@ class Complete2021_2024DatasetIntegrator:
             print(f"  ❌ Error loading decentralization data: {e}")
             return pd.DataFrame()
     
+    @traced('parse', name='market')
     def load_and_process_market_data(self):
         """Load market capitalization and hashrate data"""
         print("\n📊 Loading market & hashrate data...")
         
         try:
-            df = pd.read_excel('commits/blockchain_market_hashrate_weekly_2021_2024.xlsx')
+            df = get_source('market').load(compact=True)
             df = self.standardize_platform_names(df)
-            df = self.optimize_memory(df, 'market')
-            
-            # Rename columns to match expected format
-            column_mapping = {
-                'Year': 'year',
-                'Week': 'week',
-                'Market_Capitalization': 'market_cap',
-                'Hash_Rate': 'hashrate'
-            }
-            df = df.rename(columns=column_mapping)
             
             print(f"  ✅ Market data: {df.shape}")
             return df
@@ -126,21 +92,14 @@ class Complete2021_2024DatasetIntegrator:
             print(f"  ❌ Error loading market data: {e}")
             return pd.DataFrame()
     
+    @traced('parse', name='proposal')
     def load_and_process_proposal_data(self):
         """Load proposal topic diversity data"""
         print("\n📊 Loading proposal data...")
         
         try:
-            df = pd.read_excel('proposal/proposal_topic_diversity_weekly.xlsx')
+            df = get_source('proposals').load(compact=True)
             df = self.standardize_platform_names(df)
-            df = self.optimize_memory(df, 'proposals')
-            
-            # Rename columns to match expected format
-            column_mapping = {
-                'Year': 'year',
-                'Week': 'week'
-            }
-            df = df.rename(columns=column_mapping)
             
             print(f"  ✅ Proposal data: {df.shape}")
             return df
@@ -149,6 +108,7 @@ class Complete2021_2024DatasetIntegrator:
             print(f"  ❌ Error loading proposal data: {e}")
             return pd.DataFrame()
     
+    @traced('parse', name='api')
     def load_and_process_api_data(self):
         """Load API data (CryptoCompare, GitHub, Reddit)"""
         print("\n📊 Loading API data...")
@@ -157,9 +117,8 @@ class Complete2021_2024DatasetIntegrator:
         
         # CryptoCompare data (time-series)
         try:
-            df_crypto = pd.read_excel('proposal/updated work/cryptocompare_timeseries_2021_2024.xlsx')
+            df_crypto = get_source('cryptocompare').load(compact=True)
             df_crypto = self.standardize_platform_names(df_crypto)
-            df_crypto = self.optimize_memory(df_crypto, 'cryptocompare')
             api_data['cryptocompare'] = df_crypto
             print(f"  ✅ CryptoCompare data: {df_crypto.shape}")
         except Exception as e:
@@ -167,7 +126,7 @@ class Complete2021_2024DatasetIntegrator:
         
         # GitHub data (static)
         try:
-            df_github = pd.read_excel('proposal/updated work/task3_github_checkpoint.xlsx')
+            df_github = get_source('github').load()
             df_github = self.standardize_platform_names(df_github)
             api_data['github'] = df_github
             print(f"  ✅ GitHub data: {df_github.shape}")
@@ -176,7 +135,7 @@ class Complete2021_2024DatasetIntegrator:
         
         # Reddit data (static)
         try:
-            df_reddit = pd.read_excel('proposal/updated work/task3_reddit_checkpoint.xlsx')
+            df_reddit = get_source('reddit').load()
             df_reddit = self.standardize_platform_names(df_reddit)
             api_data['reddit'] = df_reddit
             print(f"  ✅ Reddit data: {df_reddit.shape}")
@@ -185,14 +144,14 @@ class Complete2021_2024DatasetIntegrator:
         
         return api_data
     
+    @traced('parse', name='difficulty')
     def load_and_process_difficulty_data(self):
         """Load difficulty data with Bitcoin SV handling"""
         print("\n📊 Loading difficulty data...")
         
         try:
-            df = pd.read_excel('proposal/updated work/difficulty_data_full_2021_2024.xlsx')
+            df = get_source('difficulty').load(compact=True)
             df = self.standardize_platform_names(df)
-            df = self.optimize_memory(df, 'difficulty')
             
             # Filter for 2021-2024 only
             df = df[df['year'].isin([2021, 2022, 2023, 2024])]
@@ -210,6 +169,7 @@ class Complete2021_2024DatasetIntegrator:
             print(f"  ❌ Error loading difficulty data: {e}")
             return pd.DataFrame()
     
+    @traced('aggregate')
     def create_base_weekly_structure(self):
         """Create base weekly structure for 2021-2024"""
         print("\n🏗️  Creating base weekly structure...")
@@ -234,52 +194,39 @@ class Complete2021_2024DatasetIntegrator:
         
         return df_base
     
+    @traced('merge')
     def merge_datasets_efficiently(self, df_base, datasets, api_data, df_difficulty):
         """Efficiently merge all datasets"""
         print("\n🔗 Merging all datasets...")
         
-        merge_keys = ['Platform', 'year', 'week']
-        df_result = df_base.copy()
+        # Every source is keyed once on (platform_id, week_index) and gathered
+        # into the base structure in one pass instead of a chain of pd.merge calls
+        joiner = PanelJoiner(df_base, keys=['Platform', 'year', 'week'], how='left')
         
-        # Merge core datasets
+        # Core datasets
         for name, df in datasets.items():
-            if not df.empty:
-                print(f"  🔗 Merging {name}...")
-                df_result = pd.merge(df_result, df, on=merge_keys, how='left', suffixes=('', f'_{name}'))
-                print(f"    ✅ After {name}: {df_result.shape}")
-                
-                # Force garbage collection
-                del df
-                gc.collect()
-        
-        # Merge CryptoCompare time-series data
+            joiner.add(name, df)
+        
+        # CryptoCompare time-series data
         if 'cryptocompare' in api_data and not api_data['cryptocompare'].empty:
-            print(f"  🔗 Merging CryptoCompare time-series...")
-            df_crypto = api_data['cryptocompare'][['Platform', 'year', 'week', 'Volume_USD', 'price_USD', 'Platform_age']]
-            df_result = pd.merge(df_result, df_crypto, on=merge_keys, how='left', suffixes=('', '_crypto'))
-            print(f"    ✅ After CryptoCompare: {df_result.shape}")
+            joiner.add('crypto', api_data['cryptocompare'][['Platform', 'year', 'week', 'Volume_USD', 'price_USD', 'Platform_age']])
         
-        # Merge GitHub data (static - merge on Platform only)
+        # GitHub and Reddit data are static, so they are keyed on Platform only
         if 'github' in api_data and not api_data['github'].empty:
-            print(f"  🔗 Merging GitHub data...")
-            df_github = api_data['github'][['Platform', 'stars', 'forks']]
-            df_result = pd.merge(df_result, df_github, on='Platform', how='left', suffixes=('', '_github'))
-            print(f"    ✅ After GitHub: {df_result.shape}")
+            joiner.add('github', api_data['github'][['Platform', 'stars', 'forks']], on=['Platform'])
         
-        # Merge Reddit data (static - merge on Platform only)
         if 'reddit' in api_data and not api_data['reddit'].empty:
-            print(f"  🔗 Merging Reddit data...")
-            df_reddit = api_data['reddit'][['Platform', 'reddit_subscribers', 'reddit_posts', 'reddit_comments']]
-            df_result = pd.merge(df_result, df_reddit, on='Platform', how='left', suffixes=('', '_reddit'))
-            print(f"    ✅ After Reddit: {df_result.shape}")
+            joiner.add('reddit', api_data['reddit'][['Platform', 'reddit_subscribers', 'reddit_posts', 'reddit_comments']], on=['Platform'])
         
-        # Merge difficulty data (with Bitcoin SV handling)
+        # Difficulty data (with Bitcoin SV handling)
         if not df_difficulty.empty:
-            print(f"  🔗 Merging difficulty data...")
             df_diff_weekly = df_difficulty.groupby(['Platform', 'year', 'week'])['difficulty'].mean().reset_index()
-            df_result = pd.merge(df_result, df_diff_weekly, on=merge_keys, how='left', suffixes=('', '_diff'))
-            print(f"    ✅ After difficulty: {df_result.shape}")
-            
+            joiner.add('diff', df_diff_weekly)
+        
+        df_result = joiner.assemble()
+        print(f"    ✅ After keyed integration: {df_result.shape}")
+        
+        if not df_difficulty.empty:
             # Check Bitcoin SV difficulty coverage
             bsv_data = df_result[df_result['Platform'] == 'Bitcoin SV']
             bsv_difficulty_coverage = bsv_data['difficulty'].notna().sum() / len(bsv_data) * 100
@@ -287,6 +234,7 @@ class Complete2021_2024DatasetIntegrator:
         
         return df_result
     
+    @traced('aggregate')
     def add_date_variables(self, df):
         """Add proper date variables"""
         print("\n📅 Adding date variables...")
@@ -353,6 +301,7 @@ class Complete2021_2024DatasetIntegrator:
     def run_integration(self):
         """Main integration function"""
         start_time = datetime.now()
+        tracer = start_trace('complete_2021_2024_integration')
         
         try:
             # Load all datasets
@@ -379,17 +328,24 @@ class Complete2021_2024DatasetIntegrator:
             df_final = self.add_date_variables(df_final)
             
             # Final memory optimization
-            df_final = self.optimize_memory(df_final, 'final_dataset')
+            print(f"\n🔧 Optimizing final_dataset memory...")
+            before = memory_mb(df_final)
+            with span('compact_frame', kind='aggregate', rows_in=df_final):
+                df_final = compact_frame(df_final)
+            report('final_dataset', before, memory_mb(df_final))
             
             # Save final dataset
             output_file = 'COMPLETE_2021_2024_blockchain_dataset.xlsx'
-            df_final.to_excel(output_file, index=False)
+            with span('final_excel', kind='write', rows_in=df_final, path=output_file):
+                df_final.to_excel(output_file, index=False)
             
             # Generate summary
             self.generate_final_summary(df_final)
             
             end_time = datetime.now()
             print(f"\n⏱️  Total execution time: {end_time - start_time}")
+            tracer.print_summary()
+            tracer.save('integration_2021_2024_trace.json')
             
             return df_final
             
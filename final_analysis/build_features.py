@@ -0,0 +1,260 @@
+import argparse
+import os
+import numpy as np
+import pandas as pd
+
+# Model-ready features for the regressions: replaces the gen/capture confirm
+# blocks of blockchain_analysis_final.do with one vectorized pass.
+
+try:
+    import pyarrow  # noqa: F401
+    FEATURES_FILE = 'all_11platforms_FEATURES.parquet'
+except ImportError:
+    FEATURES_FILE = 'all_11platforms_FEATURES.pkl'
+
+INPUT_FILE = 'all_11platforms_STATA_READY.csv'
+
+ENTITY = 'platform'
+
+# Canonical name: accepted spellings, matched case-insensitively in order
+# (the first one present wins)
+ALIASES = {
+    'platform': ['Platform'],
+    'year': ['year'],
+    'week': ['week'],
+    'market_cap': ['market_cap', 'Market_Capitalization'],
+    'block_hhi': ['Block_HHI', 'Block_Inverse_HHI'],
+    'commit_hhi': ['Commit_HHI', 'Commit_Inverse_HHI'],
+    'hashrate': ['hashrate', 'Hash_Rate'],
+    'volume_usd': ['Volume_USD'],
+    'number_proposal': ['Number_Proposal'],
+    'topic_diversity': ['Topic_Diversity'],
+    'forks': ['forks'],
+    'stars': ['stars'],
+    'reddit_comments': ['reddit_comments'],
+    'reddit_posts': ['reddit_posts'],
+    'reddit_subscribers': ['reddit_subscribers', 'Reddit_Subscribers'],
+    'platform_age': ['platform_age', 'Platform_age'],
+}
+
+# name: (canonical column, transform). 'log' = ln(x) for x > 0,
+# 'log1p' = ln(x + 1) for x >= 0, as in the .do file
+LOG_VARIABLES = {
+    'log_MC': ('market_cap', 'log'),
+    'log_Block_invHHI3': ('block_hhi', 'log'),
+    'log_Commit_invHHI': ('commit_hhi', 'log'),
+    'log_hashrate': ('hashrate', 'log'),
+    'log_volume_USD': ('volume_usd', 'log'),
+    'log_n_proposals': ('number_proposal', 'log1p'),
+    'log_N_topics': ('topic_diversity', 'log1p'),
+    'log_forks': ('forks', 'log'),
+    'log_stars': ('stars', 'log'),
+    'log_reddit_comments': ('reddit_comments', 'log1p'),
+    'lreddit_posts': ('reddit_posts', 'log1p'),
+    'log_reddit_subscribers': ('reddit_subscribers', 'log'),
+    'log_Platform_Age': ('platform_age', 'log'),
+}
+
+# Lags (L{k}.x) and leads (F{k}.x) generated for every log variable
+LAG_ORDERS = (1, 2, 4)
+LEAD_ORDERS = (1,)
+
+# First lags under the names used by the .do file (name: log variable)
+DO_LAG_NAMES = {
+    'log_Block_invHHI3_lag': 'log_Block_invHHI3',
+    'log_Commit_invHHI_lag': 'log_Commit_invHHI',
+    'log_hashrate_lag': 'log_hashrate',
+    'log_n_proposals_lag': 'log_n_proposals',
+    'log_N_topics_lag': 'log_N_topics',
+    'log_forks_lag': 'log_forks',
+    'log_stars_lag': 'log_stars',
+    'lreddit_comments_lag': 'log_reddit_comments',
+    'lreddit_posts_lag': 'lreddit_posts',
+    'log_reddit_subscribers_lag': 'log_reddit_subscribers',
+    'log_Platform_Age_lag': 'log_Platform_Age',
+}
+
+# Keeps (entity, period) keys unique when packed into one integer
+KEY_STRIDE = 1 << 20
+
+
+def lag_name(var, lag):
+    return f'L{lag}.{var}' if lag > 0 else f'F{-lag}.{var}'
+
+
+def resolve_aliases(df, aliases=ALIASES):
+    """
+    Rename the first matching spelling of each variable to its canonical
+    name. Missing variables become all-NaN columns, as the .do file's
+    `gen x = .` fallbacks did.
+    """
+    lower = {}
+    for col in df.columns:
+        lower.setdefault(str(col).lower(), col)
+
+    renames, missing = {}, []
+    for canonical, spellings in aliases.items():
+        found = next((lower[s.lower()] for s in [canonical] + spellings if s.lower() in lower), None)
+        if found is None:
+            missing.append(canonical)
+        elif found != canonical:
+            renames[found] = canonical
+
+    df = df.rename(columns=renames)
+    for canonical in missing:
+        print(f"⚠️  Warning: {canonical} variable not found")
+        df[canonical] = np.nan
+    return df
+
+
+def stata_week(year, week):
+    """
+    Stata %tw index of weekly(string(year) + "w" + string(week), "YW").
+    Stata years have 52 weeks, so ISO week 53 has no weekly date (NaN).
+    """
+    year = pd.to_numeric(year, errors='coerce')
+    week = pd.to_numeric(week, errors='coerce')
+    t = (year - 1960) * 52 + (week - 1)
+    return t.where(week.between(1, 52))
+
+
+def do_file_month(t):
+    """
+    month(dofC(date)) exactly as the .do file computes it. dofC() reads the
+    %tw week index as milliseconds, so every dated week lands in January
+    1960: month is constant and i.month drops out ("1.month omitted because
+    of collinearity" in blockchain_analysis_final.log). This default keeps
+    the Python models identical to the reference results.
+    """
+    return pd.Series(1.0, index=t.index).where(t.notna())
+
+
+def week_month(year, week):
+    """
+    Calendar month in which a Stata week starts (week 1 starts on 1 January):
+    the month the .do file meant. Opt-in (calendar_months=True,
+    --calendar-months); it adds month effects the reference results lack.
+    """
+    year = pd.to_numeric(year, errors='coerce')
+    week = pd.to_numeric(week, errors='coerce')
+    start = pd.to_datetime(year.astype('Int64').astype(str) + '-01-01', errors='coerce')
+    start = start + pd.to_timedelta((week - 1) * 7, unit='D')
+    return start.dt.month.astype('float64').where(week.between(1, 52))
+
+
+def log_transform(values, kind):
+    values = pd.to_numeric(values, errors='coerce')
+    if kind == 'log1p':
+        return np.log(values.where(values >= 0) + 1)
+    return np.log(values.where(values > 0))
+
+
+def shifted_rows(codes, t, lag):
+    """
+    Row position holding (entity, t - lag) for every row, -1 where that
+    period is not in the panel. Gaps are never bridged, as with Stata's L.
+    and F. operators; negative lags are leads.
+    """
+    valid = ~np.isnan(t)
+    key = codes.astype(np.int64) * KEY_STRIDE + np.where(valid, t, 0).astype(np.int64)
+    order = np.argsort(key, kind='stable')
+    sorted_keys = key[order]
+
+    target = key - lag
+    pos = np.minimum(np.searchsorted(sorted_keys, target), len(key) - 1)
+    rows = order[pos]
+    found = valid & (sorted_keys[pos] == target) & valid[rows]
+    return np.where(found, rows, -1)
+
+
+def take_rows(values, rows):
+    out = values[np.maximum(rows, 0)].astype(np.float64)
+    out[rows < 0] = np.nan
+    return out
+
+
+def add_shifts(df, variables, orders, entity=ENTITY, time='t'):
+    """Add L{k}./F{k}. columns (negative k = lead) for variables in one pass"""
+    codes = pd.factorize(df[entity])[0]
+    t = df[time].to_numpy(dtype=np.float64)
+    columns = {}
+    for lag in orders:
+        rows = shifted_rows(codes, t, lag)
+        for var in variables:
+            columns[lag_name(var, lag)] = take_rows(df[var].to_numpy(dtype=np.float64), rows)
+    return pd.concat([df.drop(columns=[c for c in columns if c in df.columns]),
+                      pd.DataFrame(columns, index=df.index)], axis=1)
+
+
+def build_features(df, lag_orders=LAG_ORDERS, lead_orders=LEAD_ORDERS, calendar_months=False):
+    """
+    Resolve aliases, then generate log transforms, lags/leads, the .do
+    file's lag names, month and month dummies on a (platform, week)-sorted
+    panel. month reproduces the .do file (constant, see do_file_month)
+    unless calendar_months is set.
+    """
+    df = resolve_aliases(df)
+    df[ENTITY] = df[ENTITY].astype(str)
+    df['t'] = stata_week(df['year'], df['week'])
+    df['month'] = week_month(df['year'], df['week']) if calendar_months else do_file_month(df['t'])
+    df = df.sort_values([ENTITY, 't', 'year', 'week'], kind='stable').reset_index(drop=True)
+
+    features = {name: log_transform(df[source], kind) for name, (source, kind) in LOG_VARIABLES.items()}
+    months = df['month']
+    for month in range(1, 13):
+        features[f'month_{month}'] = (months == month).astype('Int8').mask(months.isna())
+    df = pd.concat([df.drop(columns=[c for c in features if c in df.columns]),
+                    pd.DataFrame(features, index=df.index)], axis=1)
+
+    # The first lag is always built since the .do names refer to it
+    orders = sorted(set(lag_orders) | {1}) + [-lead for lead in lead_orders]
+    df = add_shifts(df, list(LOG_VARIABLES), orders)
+    for name, var in DO_LAG_NAMES.items():
+        df[name] = df[lag_name(var, 1)]
+    return df
+
+
+def save_features(df, path=FEATURES_FILE):
+    if path.endswith('.parquet'):
+        df.to_parquet(path, index=False)
+    elif path.endswith('.csv'):
+        df.to_csv(path, index=False)
+    else:
+        df.to_pickle(path)
+
+
+def load_features(path=FEATURES_FILE, source=INPUT_FILE):
+    """Read the features file; build it from the Stata-ready csv when absent"""
+    if os.path.exists(path):
+        if path.endswith('.parquet'):
+            return pd.read_parquet(path)
+        if path.endswith('.csv'):
+            return pd.read_csv(path, low_memory=False)
+        return pd.read_pickle(path)
+    print(f"⚠️  {path} not found, building features from {source}")
+    return build_features(pd.read_csv(source, low_memory=False))
+
+
+def main(source=INPUT_FILE, output_file=FEATURES_FILE, calendar_months=None):
+    if calendar_months is None:
+        parser = argparse.ArgumentParser(description="Build model features from the Stata-ready csv")
+        parser.add_argument('--calendar-months', action='store_true',
+                            help="use the calendar month of each week for i.month instead of the .do file's "
+                                 "constant month (changes the results against the Stata log)")
+        calendar_months = parser.parse_args().calendar_months
+    print("🔧 BUILDING MODEL FEATURES")
+    print("=" * 60)
+    df = build_features(pd.read_csv(source, low_memory=False), calendar_months=calendar_months)
+    if calendar_months:
+        print("📅 month = calendar month of each week (not the .do file's constant month)")
+    save_features(df, output_file)
+
+    print(f"✅ {len(df):,} rows x {df.shape[1]} columns")
+    for name in ['log_MC', 'log_Block_invHHI3_lag', 'log_Commit_invHHI_lag', 'log_hashrate_lag']:
+        print(f"   {name} available: {df[name].notna().sum():,} observations")
+    print(f"💾 Saved features: {output_file}")
+    return df
+
+
+if __name__ == "__main__":
+    features = main()
@@ -1,43 +1,31 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime
+import os
+import sys
 
-def create_7platform_dataset():
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'proposal'))
+from source_registry import get_source
+from panel_io import isin
+
+SEVEN_PLATFORMS = ['Bitcoin', 'Ethereum', 'Litecoin', 'Dogecoin', 'Dash', 'Bitcoin Cash', 'Bitcoin SV']
+
+def create_7platform_dataset(historical_columns=None):
     print("Creating 7-platform dataset (2015-2024)...")
     
-    # Load the historical data (2015-2020)
-    print("Loading historical panel data...")
-    historical_df = pd.read_stata('../proposal/Panel_data_cleaned_May23_2025.dta')
-    
     # Load your complete 2021-2024 data
     print("Loading 2021-2024 data...")
-    recent_df = pd.read_excel('../COMPLETE_2021_2024_blockchain_dataset.xlsx')
+    recent_df = get_source('complete_2021_2024').load(where=isin('Platform', SEVEN_PLATFORMS))
     
-    # Standardize platform names
-    platform_mapping = {
-        'BitcoinCash': 'Bitcoin Cash',
-        'BitcoinSV': 'Bitcoin SV'
-    }
-    
-    if 'Platform' in historical_df.columns:
-        historical_df['Platform'] = historical_df['Platform'].replace(platform_mapping)
-    if 'Platform' in recent_df.columns:
-        recent_df['Platform'] = recent_df['Platform'].replace(platform_mapping)
-    
-    # Standardize column names to match
-    column_mapping = {
-        'Block_Inverse_HHI': 'Block_HHI',
-        'Block_Shannon_Entropy': 'Block_Shannon',
-        'Commit_Inverse_HHI': 'Commit_HHI', 
-        'Commit_Shannon_Entropy': 'Commit_Shannon',
-        'Market_Capitalization': 'market_cap',
-        'Hash_Rate': 'hashrate',
-        'Year': 'year',
-        'Week': 'week'
-    }
-    
-    # Apply column mapping to historical data
-    historical_df = historical_df.rename(columns=column_mapping)
+    # Load the historical data (2015-2020). Only the variables of the 2021-2024
+    # panel (plus any extra historical_columns) are read from the .dta, and
+    # other platforms are dropped chunk by chunk inside the reader
+    print("Loading historical panel data...")
+    columns = list(recent_df.columns) + list(historical_columns or [])
+    historical_df = get_source('historical_panel').load(
+        columns=columns,
+        where=isin('Platform', SEVEN_PLATFORMS)
+    )
     
     # Get common columns
     common_columns = set(historical_df.columns) & set(recent_df.columns)
@@ -60,8 +48,7 @@ def create_7platform_dataset():
     combined_df = pd.concat([historical_df, recent_df], ignore_index=True)
     
     # Filter for 7 platforms only
-    seven_platforms = ['Bitcoin', 'Ethereum', 'Litecoin', 'Dogecoin', 'Dash', 'Bitcoin Cash', 'Bitcoin SV']
-    combined_df = combined_df[combined_df['Platform'].isin(seven_platforms)]
+    combined_df = combined_df[combined_df['Platform'].isin(SEVEN_PLATFORMS)]
     
     # Sort by Platform, year, week
     combined_df = combined_df.sort_values(['Platform', 'year', 'week']).reset_index(drop=True)
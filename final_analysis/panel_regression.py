@@ -0,0 +1,316 @@
+import math
+import numpy as np
+import pandas as pd
+
+from build_features import ENTITY, FEATURES_FILE, load_features
+
+# Python version of blockchain_analysis_final.do: `xtreg ..., fe robust` with
+# c.x##c.x square terms, lagged regressors and i.month dummies. month is the
+# .do file's month(dofC(date)), which is constant, so by default i.month adds
+# no columns (as in the Stata log). Build the features with
+# `python build_features.py --calendar-months` to get real month effects.
+
+OUTPUT_FILE = 'panel_regression_results.csv'
+
+# Entered as c.x##c.x, i.e. level plus square
+SQUARED = ['log_Block_invHHI3_lag', 'log_Commit_invHHI_lag']
+
+# The five models of the .do file; a model runs when more than min_obs rows
+# have every guard variable, and only if the model it depends on ran
+MODELS = [
+    {'name': 'mc_basic_model', 'outcome': 'log_MC', 'controls': [], 'min_obs': 50},
+    {'name': 'mc_controls_model', 'outcome': 'log_MC', 'controls': ['log_forks_lag', 'log_stars_lag'],
+     'min_obs': 30},
+    {'name': 'hashrate_model', 'outcome': 'log_hashrate', 'controls': [], 'min_obs': 30},
+    {'name': 'mc_hashrate_model', 'outcome': 'log_MC', 'controls': ['log_hashrate_lag'], 'min_obs': 30,
+     'requires': 'hashrate_model'},
+    {'name': 'volume_model', 'outcome': 'log_volume_USD', 'controls': [], 'min_obs': 30},
+]
+
+# Columns whose share of the remaining variance falls below this are
+# dropped as collinear, like Stata's "(omitted)"
+COLLINEAR_TOL = 1e-9
+
+
+def t_sf(t, df):
+    """Two-sided p-value of a Student t statistic (regularized incomplete beta)"""
+    if not np.isfinite(t) or df <= 0:
+        return np.nan
+    x = df / (df + t * t)
+    return _betainc(df / 2.0, 0.5, x)
+
+
+def t_critical(confidence, df):
+    """Two-sided Student t critical value: t_sf(t, df) == 1 - confidence (bisection)"""
+    if df <= 0:
+        return np.nan
+    alpha = 1 - confidence
+    low, high = 0.0, 1.0
+    while t_sf(high, df) > alpha:
+        low, high = high, high * 2
+    for _ in range(100):
+        mid = (low + high) / 2
+        if t_sf(mid, df) > alpha:
+            low = mid
+        else:
+            high = mid
+    return (low + high) / 2
+
+
+def _betainc(a, b, x):
+    """Regularized incomplete beta I_x(a, b) by Lentz's continued fraction"""
+    if x <= 0:
+        return 0.0
+    if x >= 1:
+        return 1.0
+    if x > (a + 1) / (a + b + 2):
+        return 1.0 - _betainc(b, a, 1 - x)
+
+    front = math.exp(math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b)
+                     + a * math.log(x) + b * math.log1p(-x)) / a
+    tiny = 1e-300
+    f, c, d = 1.0, 1.0, 0.0
+    for i in range(400):
+        m = i // 2
+        if i == 0:
+            numerator = 1.0
+        elif i % 2 == 0:
+            numerator = m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m))
+        else:
+            numerator = -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1))
+        d = 1.0 + numerator * d
+        d = 1.0 / (d if abs(d) > tiny else tiny)
+        c = 1.0 + numerator / c
+        c = c if abs(c) > tiny else tiny
+        f *= c * d
+        if abs(1.0 - c * d) < 1e-14:
+            break
+    return front * (f - 1.0)
+
+
+def group_means(matrix, groups, n_groups):
+    """Per-group column means via bincount sums (no dummy matrix)"""
+    counts = np.bincount(groups, minlength=n_groups).astype(np.float64)
+    sums = np.column_stack([np.bincount(groups, weights=matrix[:, j], minlength=n_groups)
+                            for j in range(matrix.shape[1])])
+    return sums / counts[:, None]
+
+
+def within_transform(matrix, groups, n_groups):
+    """x_it - mean_i(x) + mean(x): Stata's xtreg, fe transformation"""
+    return matrix - group_means(matrix, groups, n_groups)[groups] + matrix.mean(axis=0)
+
+
+def independent_columns(xtx, tol=COLLINEAR_TOL):
+    """Indices of columns kept in order, dropping those explained by earlier ones"""
+    kept = []
+    for j in range(xtx.shape[0]):
+        if xtx[j, j] <= 0:
+            continue
+        if kept:
+            block = xtx[np.ix_(kept, kept)]
+            cross = xtx[kept, j]
+            residual = xtx[j, j] - cross @ np.linalg.solve(block, cross)
+        else:
+            residual = xtx[j, j]
+        if residual > tol * xtx[j, j]:
+            kept.append(j)
+    return kept
+
+
+class FixedEffectsResult:
+    """Coefficients and cluster-robust inference of one within regression"""
+
+    def __init__(self, name, outcome, names, params, cov, nobs, n_groups, r2_within, omitted):
+        self.name = name
+        self.outcome = outcome
+        self.names = names
+        self.params = params
+        self.cov = cov
+        self.bse = np.sqrt(np.diag(cov))
+        self.tvalues = params / self.bse
+        self.df_resid = n_groups - 1
+        self.pvalues = np.array([t_sf(t, self.df_resid) for t in self.tvalues])
+        self.nobs = nobs
+        self.n_groups = n_groups
+        self.r2_within = r2_within
+        self.omitted = omitted
+
+    def coef(self, name):
+        return self.params[self.names.index(name)]
+
+    def to_frame(self):
+        return pd.DataFrame({
+            'model': self.name,
+            'outcome': self.outcome,
+            'term': self.names,
+            'coef': self.params,
+            'se': self.bse,
+            't': self.tvalues,
+            'p': self.pvalues,
+            'nobs': self.nobs,
+            'groups': self.n_groups,
+            'r2_within': self.r2_within,
+        })
+
+
+def fit_within(y, X, groups, names, name='', outcome='', demeaned=False):
+    """
+    Fixed-effects regression of y on X with entity effects absorbed by
+    demeaning and standard errors clustered on the entity, as `xtreg, fe
+    vce(robust)`: small-sample factor (N-1)/(N-K) * G/(G-1) and G-1
+    degrees of freedom. A `_cons` term is added like Stata reports it.
+    groups may be any labels. With demeaned=True, y and X have already been
+    passed through within_transform (lets callers reuse one transformation).
+    """
+    codes, groups = np.unique(groups, return_inverse=True)
+    n_groups = len(codes)
+    y = np.asarray(y, dtype=np.float64)
+    X = np.asarray(X, dtype=np.float64).reshape(len(y), -1)
+
+    if not demeaned:
+        yx = within_transform(np.column_stack([y, X]), groups, n_groups)
+        y, X = yx[:, 0], yx[:, 1:]
+
+    X = np.column_stack([X, np.ones(len(y))])
+    names = list(names) + ['_cons']
+
+    # Columns with no within variation are collinear with the fixed effects
+    centered = X[:, :-1] - X[:, :-1].mean(axis=0)
+    xtx = np.column_stack([centered, np.ones(len(y))]).T @ np.column_stack([centered, np.ones(len(y))])
+    kept = independent_columns(xtx)
+    omitted = [names[j] for j in range(len(names)) if j not in kept]
+    X = X[:, kept]
+    names = [names[j] for j in kept]
+
+    nobs, k = X.shape
+    xtx_inv = np.linalg.inv(X.T @ X)
+    params = xtx_inv @ (X.T @ y)
+    resid = y - X @ params
+
+    scores = X * resid[:, None]
+    cluster_scores = np.column_stack([np.bincount(groups, weights=scores[:, j], minlength=n_groups)
+                                      for j in range(k)])
+    meat = cluster_scores.T @ cluster_scores
+    scale = (nobs - 1) / (nobs - k) * n_groups / (n_groups - 1) if n_groups > 1 and nobs > k else np.nan
+    cov = scale * xtx_inv @ meat @ xtx_inv
+
+    centered_y = y - y.mean()
+    r2_within = 1 - (resid @ resid) / (centered_y @ centered_y) if centered_y @ centered_y > 0 else np.nan
+    return FixedEffectsResult(name, outcome, names, params, cov, nobs, n_groups, r2_within, omitted)
+
+
+def design(df, outcome, regressors, squared=SQUARED, month_effects=True, entity=ENTITY):
+    """
+    y, X, group codes and column names for `xtreg outcome c.s##c.s ...
+    regressors i.month, fe`. Rows with any missing model variable are dropped.
+    One dummy per month present beyond the lowest; with the default
+    (constant) month from build_features there are none.
+    """
+    squared = list(squared)
+    terms = []
+    for var in squared:
+        terms += [var, f'c.{var}#c.{var}']
+    terms += [var for var in regressors if var not in squared]
+
+    needed = [outcome] + squared + [var for var in regressors if var not in squared]
+    if month_effects:
+        needed.append('month')
+    sample = df.dropna(subset=needed)
+
+    columns = {}
+    for var in squared:
+        columns[var] = sample[var].to_numpy(dtype=np.float64)
+        columns[f'c.{var}#c.{var}'] = columns[var] ** 2
+    for var in regressors:
+        if var not in squared:
+            columns[var] = sample[var].to_numpy(dtype=np.float64)
+
+    if month_effects:
+        months = sample['month'].astype(int).to_numpy()
+        for month in np.unique(months)[1:]:  # lowest month is the base level
+            name = f'{month}.month'
+            terms.append(name)
+            columns[name] = (months == month).astype(np.float64)
+
+    X = np.column_stack([columns[name] for name in terms]) if terms else np.empty((len(sample), 0))
+    groups = pd.factorize(sample[entity])[0]
+    return sample[outcome].to_numpy(dtype=np.float64), X, groups, terms
+
+
+def xtreg_fe(df, outcome, regressors=(), squared=SQUARED, month_effects=True, entity=ENTITY, name=''):
+    """Estimate one fixed-effects model on a prepared panel"""
+    y, X, groups, terms = design(df, outcome, list(regressors), squared, month_effects, entity)
+    return fit_within(y, X, groups, terms, name=name or outcome, outcome=outcome)
+
+
+def run_models(df, models=MODELS, squared=SQUARED):
+    """Run the .do file's models with its observation-count guards"""
+    results = {}
+    for spec in models:
+        if spec.get('requires') and spec['requires'] not in results:
+            continue
+        guard = [spec['outcome']] + squared + spec['controls']
+        available = len(df.dropna(subset=guard))
+        if available <= spec['min_obs']:
+            print(f"⚠️  {spec['name']}: {available} complete observations, needs more than {spec['min_obs']}")
+            continue
+
+        print(f"🔄 Running {spec['name']} ({spec['outcome']})...")
+        results[spec['name']] = xtreg_fe(df, spec['outcome'], spec['controls'], squared, name=spec['name'])
+    return results
+
+
+def _stars(p):
+    return '***' if p < 0.01 else '**' if p < 0.05 else '*' if p < 0.1 else ''
+
+
+def print_table(results):
+    """Coefficients (t statistics) side by side, like `estimates table`"""
+    terms = []
+    for result in results.values():
+        terms += [term for term in result.names if term not in terms and not term.endswith('.month')]
+    terms = [term for term in terms if term != '_cons'] + ['_cons']
+
+    width = max([len(term) for term in terms] + [12])
+    print(f"{'Variable':<{width}} " + ' '.join(f"{name[:18]:>18}" for name in results))
+    for term in terms:
+        coefs, tstats = [], []
+        for result in results.values():
+            if term in result.names:
+                i = result.names.index(term)
+                coefs.append(f"{result.params[i]:.4f}{_stars(result.pvalues[i])}")
+                tstats.append(f"({result.tvalues[i]:.2f})")
+            else:
+                coefs.append('')
+                tstats.append('')
+        print(f"{term:<{width}} " + ' '.join(f"{c:>18}" for c in coefs))
+        print(f"{'':<{width}} " + ' '.join(f"{t:>18}" for t in tstats))
+    print(f"{'N':<{width}} " + ' '.join(f"{r.nobs:>18}" for r in results.values()))
+    print(f"{'r2_w':<{width}} " + ' '.join(f"{r.r2_within:>18.4f}" for r in results.values()))
+    print("legend: * p<0.1; ** p<0.05; *** p<0.01 (month dummies not shown)")
+
+
+def main(path=FEATURES_FILE, output_file=OUTPUT_FILE):
+    print("📈 FIXED-EFFECTS PANEL REGRESSIONS")
+    print("=" * 60)
+
+    df = load_features(path)
+    core = len(df.dropna(subset=['log_MC'] + SQUARED))
+    print(f"Observations with complete core data: {core}")
+    if core <= 50:
+        print(f"❌ Insufficient observations with complete core data ({core})")
+        return {}
+
+    results = run_models(df)
+    print("\n=== COMPREHENSIVE RESULTS TABLE ===")
+    print_table(results)
+
+    table = pd.concat([result.to_frame() for result in results.values()], ignore_index=True)
+    table.to_csv(output_file, index=False)
+    print(f"💾 Saved coefficients: {output_file}")
+    return results
+
+
+if __name__ == "__main__":
+    results = main()
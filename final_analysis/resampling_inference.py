@@ -0,0 +1,324 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from build_features import FEATURES_FILE, load_features
+from panel_regression import MODELS, SQUARED, design, group_means, independent_columns, t_critical
+
+# Resampling inference for the inverted-U in commit decentralization: cluster
+# bootstrap by platform, wild cluster bootstrap and within-platform
+# permutation, all run against one within-transformed design.
+
+OUTPUT_FILE = 'resampling_inference_results.csv'
+
+TREATMENT = 'log_Commit_invHHI_lag'
+REPLICATES = 9999
+BATCH_SIZE = 250
+CONFIDENCE = 0.95
+
+# Webb's six-point weights; with ~11 platforms Rademacher draws have only
+# 2**11 distinct patterns
+WILD_WEIGHTS = {
+    'webb': np.array([-np.sqrt(1.5), -1.0, -np.sqrt(0.5), np.sqrt(0.5), 1.0, np.sqrt(1.5)]),
+    'rademacher': np.array([-1.0, 1.0]),
+}
+
+
+def square_term(var):
+    return f'c.{var}#c.{var}'
+
+
+class WithinDesign:
+    """
+    Within-transformed y and X of one model plus per-platform moments.
+    Every resampling scheme below works from these arrays; none of them
+    re-reads or re-demeans the panel.
+    """
+
+    def __init__(self, y, X, groups, names):
+        groups = np.unique(groups, return_inverse=True)[1]
+        n_groups = groups.max() + 1
+        yx = np.column_stack([y, X])
+        yx = yx - group_means(yx, groups, n_groups)[groups]
+
+        kept = independent_columns(yx[:, 1:].T @ yx[:, 1:])
+        self.y = yx[:, 0]
+        self.X = yx[:, 1:][:, kept]
+        self.names = [names[j] for j in kept]
+        self.groups = groups
+        self.n_groups = n_groups
+        self.nobs, self.k = self.X.shape
+
+        # X_g'X_g and X_g'y_g for every platform
+        self.xtx_g = np.stack([self.X[groups == g].T @ self.X[groups == g] for g in range(n_groups)])
+        self.xty_g = np.stack([self.X[groups == g].T @ self.y[groups == g] for g in range(n_groups)])
+        self.xtx_inv = np.linalg.inv(self.xtx_g.sum(axis=0))
+        self.params = self.xtx_inv @ self.xty_g.sum(axis=0)
+
+        # Stata's xtreg, fe vce(robust) factor; K counts the constant
+        self.scale = (self.nobs - 1) / (self.nobs - self.k - 1) * n_groups / (n_groups - 1)
+        scores = self.cluster_scores(self.y - self.X @ self.params)
+        self.cov = self.scale * self.xtx_inv @ (scores.T @ scores) @ self.xtx_inv
+        self.bse = np.sqrt(np.diag(self.cov))
+
+    def index(self, name):
+        return self.names.index(name)
+
+    def cluster_scores(self, resid):
+        """sum over each platform's rows of x_it * u_it (G x k)"""
+        weighted = self.X * resid[:, None]
+        return np.column_stack([np.bincount(self.groups, weights=weighted[:, j], minlength=self.n_groups)
+                                for j in range(self.k)])
+
+    def restricted_residuals(self, drop):
+        """Residuals with the coefficient of column `drop` fixed at zero"""
+        keep = [j for j in range(self.k) if j != drop]
+        X = self.X[:, keep]
+        beta = np.linalg.solve(X.T @ X, X.T @ self.y)
+        full = np.zeros(self.k)
+        full[keep] = beta
+        return full, self.y - X @ beta
+
+
+def solve_batch(xtx, xty):
+    """Solve a stack of normal equations, falling back to pinv for singular draws"""
+    try:
+        return np.linalg.solve(xtx, xty[..., None])[..., 0]
+    except np.linalg.LinAlgError:
+        return np.einsum('bkl,bl->bk', np.linalg.pinv(xtx), xty)
+
+
+def cluster_bootstrap(d, n, seed):
+    """
+    Resample platforms with replacement. Demeaning is within platform, so a
+    replicate's normal equations are weighted sums of per-platform moments.
+    """
+    rng = np.random.default_rng(seed)
+    counts = rng.multinomial(d.n_groups, np.full(d.n_groups, 1.0 / d.n_groups), size=n).astype(np.float64)
+    xtx = np.einsum('bg,gkl->bkl', counts, d.xtx_g)
+    xty = counts @ d.xty_g
+    return {'params': solve_batch(xtx, xty)}
+
+
+def wild_bootstrap(d, n, seed, tested, weights='webb'):
+    """
+    Wild cluster bootstrap. Unrestricted draws give the coefficient
+    distribution; restricted draws (null imposed, WCR) give bootstrap t
+    statistics for each tested column. Replicate scores are updated from
+    the platform moments instead of rebuilding residual vectors.
+    """
+    rng = np.random.default_rng(seed)
+    v = rng.choice(WILD_WEIGHTS[weights], size=(n, d.n_groups))
+
+    unrestricted = d.cluster_scores(d.y - d.X @ d.params)
+    out = {'params': d.params + (v @ unrestricted) @ d.xtx_inv.T}
+
+    for j in tested:
+        beta_r, resid_r = d.restricted_residuals(j)
+        scores_r = d.cluster_scores(resid_r)
+        delta = (v @ scores_r) @ d.xtx_inv.T  # beta* - beta_r
+        scores = v[:, :, None] * scores_r[None] - np.einsum('gkl,bl->bgk', d.xtx_g, delta)
+        se = np.sqrt(d.scale * (np.einsum('k,bgk->bg', d.xtx_inv[j], scores) ** 2).sum(axis=1))
+        out[f't_{j}'] = (beta_r[j] + delta[:, j]) / se
+    return out
+
+
+def permutation(d, n, seed, treated):
+    """
+    Shuffle the treatment columns across weeks within each platform.
+    Within-platform permutation leaves the demeaned values' platform means
+    at zero, so only the treatment rows move; T'T and C'C never change.
+    """
+    rng = np.random.default_rng(seed)
+    controls = [j for j in range(d.k) if j not in treated]
+    T, C = d.X[:, treated], d.X[:, controls]
+    by_group = np.argsort(d.groups, kind='stable')
+    sorted_groups = d.groups[by_group]
+
+    # Random integer keys offset by the platform code shuffle rows only
+    # within their platform's contiguous block
+    keys = rng.integers(0, 1 << 40, size=(n, d.nobs)) + (sorted_groups.astype(np.int64) << 40)
+    order = np.argsort(keys, axis=1)
+    perm = np.empty((n, d.nobs), dtype=np.intp)
+    perm[:, by_group] = by_group[order]
+    T_perm = T[perm]  # (n, N, t)
+
+    xtx = np.empty((n, d.k, d.k))
+    tt, cc = T.T @ T, C.T @ C
+    tc = np.einsum('bnt,nc->btc', T_perm, C)
+    xtx[np.ix_(range(n), treated, treated)] = tt
+    xtx[np.ix_(range(n), controls, controls)] = cc
+    xtx[np.ix_(range(n), treated, controls)] = tc
+    xtx[np.ix_(range(n), controls, treated)] = tc.transpose(0, 2, 1)
+
+    xty = np.empty((n, d.k))
+    xty[:, treated] = np.einsum('bnt,n->bt', T_perm, d.y)
+    xty[:, controls] = C.T @ d.y
+    return {'params': solve_batch(xtx, xty)}
+
+
+SCHEMES = {
+    'cluster_bootstrap': cluster_bootstrap,
+    'wild_cluster_bootstrap': wild_bootstrap,
+    'permutation': permutation,
+}
+
+_DESIGN = None
+
+
+def _init_worker(d):
+    global _DESIGN
+    _DESIGN = d
+
+
+def _run_batch(task):
+    scheme, n, seed, kwargs = task
+    return SCHEMES[scheme](_DESIGN, n, seed, **kwargs)
+
+
+def run_replicates(d, scheme, reps, seed, jobs=None, batch_size=BATCH_SIZE, **kwargs):
+    """Run `reps` replicates of a scheme in batches on a process pool"""
+    sizes = [batch_size] * (reps // batch_size) + ([reps % batch_size] if reps % batch_size else [])
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(scheme, n, s, kwargs) for n, s in zip(sizes, seeds)]
+
+    if jobs == 1:
+        _init_worker(d)
+        batches = [_run_batch(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(d,)) as pool:
+            batches = list(pool.map(_run_batch, tasks))
+    return {key: np.concatenate([batch[key] for batch in batches]) for key in batches[0]}
+
+
+def turning_point(linear, square):
+    """x at which a*x + b*x^2 peaks (or bottoms out): -a / (2b)"""
+    return -linear / (2 * square)
+
+
+def percentile_interval(values, confidence=CONFIDENCE):
+    values = values[np.isfinite(values)]
+    if len(values) == 0:
+        return np.nan, np.nan
+    tail = (1 - confidence) / 2 * 100
+    return tuple(np.percentile(values, [tail, 100 - tail]))
+
+
+def summarize(d, draws, method, terms, estimate_p=True):
+    """Rows of SE, percentile CI and p-value per term from coefficient draws"""
+    rows = []
+    for term in terms:
+        j = d.index(term)
+        values = draws['params'][:, j]
+        low, high = percentile_interval(values)
+        row = {'method': method, 'term': term, 'estimate': d.params[j], 'std_error': values.std(ddof=1),
+               'ci_low': low, 'ci_high': high, 'replicates': len(values)}
+        if f't_{j}' in draws:
+            t_obs = d.params[j] / d.bse[j]
+            row['p_value'] = np.mean(np.abs(draws[f't_{j}']) >= abs(t_obs))
+        elif method == 'permutation':
+            row['p_value'] = (1 + np.sum(np.abs(values) >= abs(d.params[j]))) / (len(values) + 1)
+            row['std_error'], row['ci_low'], row['ci_high'] = np.nan, np.nan, np.nan
+        elif estimate_p:
+            row['p_value'] = np.mean(np.abs(values - d.params[j]) >= abs(d.params[j]))
+        rows.append(row)
+    return rows
+
+
+def turning_point_rows(d, draws, method, treatment):
+    """Turning point of the treatment's quadratic with a percentile CI"""
+    a, b = d.index(treatment), d.index(square_term(treatment))
+    point = turning_point(d.params[a], d.params[b])
+    values = turning_point(draws['params'][:, a], draws['params'][:, b])
+    low, high = percentile_interval(values)
+    return [{
+        'method': method, 'term': f'turning_point({treatment})', 'estimate': point,
+        'ci_low': low, 'ci_high': high, 'replicates': len(values),
+        'share_concave': np.mean(draws['params'][:, b] < 0),
+    }]
+
+
+def delta_method_rows(d, treatment):
+    """
+    Analytic cluster-robust rows, including a delta-method turning point SE.
+    Intervals use t(G-1), like the p-values of panel_regression.
+    """
+    a, b = d.index(treatment), d.index(square_term(treatment))
+    crit = t_critical(CONFIDENCE, d.n_groups - 1)
+    rows = []
+    for j in (a, b):
+        rows.append({'method': 'analytic', 'term': d.names[j], 'estimate': d.params[j], 'std_error': d.bse[j],
+                     'ci_low': d.params[j] - crit * d.bse[j], 'ci_high': d.params[j] + crit * d.bse[j]})
+
+    point = turning_point(d.params[a], d.params[b])
+    gradient = np.array([-1 / (2 * d.params[b]), d.params[a] / (2 * d.params[b] ** 2)])
+    se = np.sqrt(gradient @ d.cov[np.ix_([a, b], [a, b])] @ gradient)
+    rows.append({'method': 'analytic', 'term': f'turning_point({treatment})', 'estimate': point,
+                 'std_error': se, 'ci_low': point - crit * se, 'ci_high': point + crit * se})
+    return rows
+
+
+def model_design(df, model='mc_basic_model'):
+    spec = next(spec for spec in MODELS if spec['name'] == model)
+    y, X, groups, names = design(df, spec['outcome'], spec['controls'], SQUARED)
+    return WithinDesign(y, X, groups, names)
+
+
+def run_inference(df, model='mc_basic_model', treatment=TREATMENT, reps=REPLICATES, seed=20250601,
+                  jobs=None, weights='webb'):
+    start = time.time()
+    d = model_design(df, model)
+    terms = [treatment, square_term(treatment)]
+    tested = [d.index(term) for term in terms]
+    print(f"📐 {model}: N={d.nobs:,}, platforms={d.n_groups}, {d.k} within regressors, {reps:,} replicates each")
+
+    rows = delta_method_rows(d, treatment)
+
+    draws = run_replicates(d, 'cluster_bootstrap', reps, seed, jobs)
+    rows += summarize(d, draws, 'cluster_bootstrap', terms)
+    rows += turning_point_rows(d, draws, 'cluster_bootstrap', treatment)
+    print(f"   ✅ cluster bootstrap ({time.time() - start:.1f}s)")
+
+    draws = run_replicates(d, 'wild_cluster_bootstrap', reps, seed + 1, jobs, tested=tested, weights=weights)
+    rows += summarize(d, draws, 'wild_cluster_bootstrap', terms)
+    rows += turning_point_rows(d, draws, 'wild_cluster_bootstrap', treatment)
+    print(f"   ✅ wild cluster bootstrap, {weights} weights ({time.time() - start:.1f}s)")
+
+    draws = run_replicates(d, 'permutation', reps, seed + 2, jobs, treated=tested)
+    rows += summarize(d, draws, 'permutation', terms)
+    print(f"   ✅ within-platform permutation ({time.time() - start:.1f}s)")
+
+    table = pd.DataFrame(rows)
+    table.insert(0, 'model', model)
+    return table
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resampling inference for the decentralization quadratic")
+    parser.add_argument('--input', default=FEATURES_FILE)
+    parser.add_argument('--output', default=OUTPUT_FILE)
+    parser.add_argument('--model', default='mc_basic_model', choices=[spec['name'] for spec in MODELS])
+    parser.add_argument('--treatment', default=TREATMENT, choices=SQUARED)
+    parser.add_argument('--reps', type=int, default=REPLICATES)
+    parser.add_argument('--seed', type=int, default=20250601)
+    parser.add_argument('--weights', default='webb', choices=sorted(WILD_WEIGHTS))
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help="worker processes (1 = serial)")
+    args = parser.parse_args()
+
+    print("🎲 RESAMPLING INFERENCE")
+    print("=" * 60)
+    table = run_inference(load_features(args.input), args.model, args.treatment, args.reps, args.seed,
+                          args.jobs, args.weights)
+    with pd.option_context('display.width', 200, 'display.max_columns', 20):
+        print(table.drop(columns='model').round(4).to_string(index=False))
+    table.to_csv(args.output, index=False)
+    print(f"💾 Saved: {args.output}")
+    return table
+
+
+if __name__ == "__main__":
+    results = main()
@@ -0,0 +1,224 @@
+import argparse
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from create_7platform_2015_2024 import SEVEN_PLATFORMS
+from build_features import ENTITY, FEATURES_FILE, add_shifts, lag_name, load_features
+from panel_regression import fit_within, within_transform
+
+OUTPUT_FILE = 'spec_grid_results.csv'
+
+# Decentralization measures; each enters lagged, as level plus square
+DECENTRALIZATION = ['log_Block_invHHI3', 'log_Commit_invHHI']
+
+# Default robustness grid around the models of blockchain_analysis_final.do
+GRID = {
+    'outcomes': ['log_MC', 'log_hashrate', 'log_volume_USD'],
+    'regressors': {
+        'block_commit': DECENTRALIZATION,
+        'block_only': ['log_Block_invHHI3'],
+        'commit_only': ['log_Commit_invHHI'],
+    },
+    'controls': {
+        'none': [],
+        'github': ['log_forks_lag', 'log_stars_lag'],
+        'hashrate': ['log_hashrate_lag'],
+        'github_reddit': ['log_forks_lag', 'log_stars_lag', 'lreddit_comments_lag', 'lreddit_posts_lag'],
+    },
+    'lags': [1, 2, 4],
+    'platforms': {'11_platforms': None, '7_platforms': SEVEN_PLATFORMS},
+    'periods': {'2015_2024': None, '2015_2020': (2015, 2020), '2021_2024': (2021, 2024)},
+}
+
+# Same guard as the .do file's `count if !missing(...)` checks
+MIN_OBS = 30
+
+
+def square_name(var):
+    return f'c.{var}#c.{var}'
+
+
+def expand_grid(grid=GRID):
+    """One dict per combination of the grid's dimensions"""
+    specs = []
+    combos = itertools.product(grid['outcomes'], grid['regressors'].items(), grid['controls'].items(),
+                               grid['lags'], grid['platforms'].items(), grid['periods'].items())
+    for outcome, (reg_name, regressors), (ctl_name, controls), lag, (plat_name, platforms), (per_name, period) in combos:
+        # The outcome never appears among its own controls
+        if any(control.startswith(outcome) for control in controls):
+            continue
+        terms = []
+        for var in regressors:
+            terms += [lag_name(var, lag), square_name(lag_name(var, lag))]
+        specs.append({
+            'spec_id': len(specs),
+            'outcome': outcome,
+            'regressors': reg_name,
+            'controls': ctl_name,
+            'lag': lag,
+            'platforms': plat_name,
+            'period': per_name,
+            'terms': terms + list(controls),
+            'columns': [lag_name(var, lag) for var in regressors] + list(controls),
+            'platform_values': platforms,
+            'years': period,
+        })
+    return specs
+
+
+def prepare_grid_panel(df, grid=GRID):
+    """Add the lag orders and square terms the grid needs to the features"""
+    sources = sorted({var for regressors in grid['regressors'].values() for var in regressors})
+    missing = [lag for lag in grid['lags'] if any(lag_name(var, lag) not in df.columns for var in sources)]
+    if missing:
+        df = add_shifts(df, sources, missing)
+    squares = {square_name(lag_name(var, lag)): df[lag_name(var, lag)] ** 2
+               for lag in grid['lags'] for var in sources}
+    return pd.concat([df.drop(columns=[c for c in squares if c in df.columns]),
+                      pd.DataFrame(squares, index=df.index)], axis=1)
+
+
+def sample_mask(df, spec, present):
+    """Rows in the spec's sample with every model variable present"""
+    mask = np.ones(len(df), dtype=bool)
+    for col in [spec['outcome'], 'month'] + spec['columns']:
+        if col not in present:
+            present[col] = df[col].notna().to_numpy()
+        mask &= present[col]
+    if spec['platform_values'] is not None:
+        mask &= df[ENTITY].isin(spec['platform_values']).to_numpy()
+    if spec['years'] is not None:
+        mask &= df['year'].between(*spec['years']).to_numpy()
+    return mask
+
+
+def group_by_sample(df, specs):
+    """
+    Bundle specs that estimate on exactly the same rows. Each bundle carries
+    the raw columns it needs once; the worker demeans them once and every
+    spec in the bundle reuses that within-transformed matrix.
+    """
+    bundles = {}
+    present = {}  # column -> non-missing flags, computed once per column
+    for spec in specs:
+        mask = sample_mask(df, spec, present)
+        key = np.packbits(mask).tobytes()
+        bundle = bundles.setdefault(key, {'mask': mask, 'specs': []})
+        bundle['specs'].append(spec)
+
+    jobs = []
+    for bundle in bundles.values():
+        sample = df[bundle['mask']]
+        columns = list(dict.fromkeys(col for spec in bundle['specs'] for col in [spec['outcome']] + spec['terms']))
+        months = sample['month'].astype(int).to_numpy()
+        month_terms = []
+        dummies = []
+        for month in np.unique(months)[1:]:
+            month_terms.append(f'{month}.month')
+            dummies.append((months == month).astype(np.float64))
+
+        matrix = sample[columns].to_numpy(dtype=np.float64)
+        if dummies:
+            matrix = np.column_stack([matrix] + dummies)
+        jobs.append({
+            'matrix': matrix,
+            'columns': columns + month_terms,
+            'month_terms': month_terms,
+            'groups': pd.factorize(sample[ENTITY])[0],
+            'specs': [{key: spec[key] for key in ('spec_id', 'outcome', 'terms')} for spec in bundle['specs']],
+        })
+    return jobs
+
+
+def fit_bundle(job):
+    """Demean one sample's matrix once and estimate every spec that uses it"""
+    groups = job['groups']
+    n_groups = groups.max() + 1 if len(groups) else 0
+    rows = []
+    if len(groups) <= MIN_OBS or n_groups < 2:
+        for spec in job['specs']:
+            rows.append({'spec_id': spec['spec_id'], 'term': None, 'nobs': len(groups), 'groups': n_groups,
+                         'status': 'too few observations'})
+        return rows
+
+    demeaned = within_transform(job['matrix'], groups, n_groups)
+    position = {name: i for i, name in enumerate(job['columns'])}
+
+    for spec in job['specs']:
+        terms = spec['terms'] + job['month_terms']
+        y = demeaned[:, position[spec['outcome']]]
+        X = demeaned[:, [position[term] for term in terms]]
+        try:
+            result = fit_within(y, X, groups, terms, name=str(spec['spec_id']), outcome=spec['outcome'],
+                                demeaned=True)
+        except np.linalg.LinAlgError as e:
+            rows.append({'spec_id': spec['spec_id'], 'term': None, 'nobs': len(groups), 'groups': n_groups,
+                         'status': f'singular design: {e}'})
+            continue
+
+        for i, term in enumerate(result.names):
+            if term.endswith('.month'):
+                continue
+            rows.append({
+                'spec_id': spec['spec_id'], 'term': term, 'coef': result.params[i], 'se': result.bse[i],
+                't': result.tvalues[i], 'p': result.pvalues[i], 'nobs': result.nobs,
+                'groups': result.n_groups, 'r2_within': result.r2_within, 'status': 'ok',
+            })
+        for term in result.omitted:
+            if not term.endswith('.month'):
+                rows.append({'spec_id': spec['spec_id'], 'term': term, 'nobs': result.nobs,
+                             'groups': result.n_groups, 'status': 'omitted (collinear)'})
+    return rows
+
+
+def run_grid(df, grid=GRID, jobs=None):
+    """Estimate every specification of the grid; returns one row per spec and term"""
+    start = time.time()
+    specs = expand_grid(grid)
+    panel = prepare_grid_panel(df, grid)
+    bundles = group_by_sample(panel, specs)
+    print(f"📐 {len(specs):,} specifications over {len(bundles):,} distinct samples")
+
+    # Largest bundles first so the pool stays busy until the end
+    bundles.sort(key=lambda job: len(job['specs']) * job['matrix'].shape[0], reverse=True)
+    rows = []
+    if jobs == 1:
+        for job in bundles:
+            rows += fit_bundle(job)
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            for bundle_rows in pool.map(fit_bundle, bundles):
+                rows += bundle_rows
+
+    described = pd.DataFrame([{key: spec[key] for key in
+                               ('spec_id', 'outcome', 'regressors', 'controls', 'lag', 'platforms', 'period')}
+                              for spec in specs])
+    table = described.merge(pd.DataFrame(rows), on='spec_id', how='left')
+    table = table.sort_values('spec_id', kind='stable').reset_index(drop=True)
+    estimated = table.loc[table['status'] == 'ok', 'spec_id'].nunique()
+    print(f"✅ {estimated:,} of {len(specs):,} specifications estimated in {time.time() - start:.1f}s")
+    return table
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fixed-effects specification grid")
+    parser.add_argument('--input', default=FEATURES_FILE)
+    parser.add_argument('--output', default=OUTPUT_FILE)
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help="worker processes (1 = serial)")
+    args = parser.parse_args()
+
+    print("🧮 SPECIFICATION GRID")
+    print("=" * 60)
+    table = run_grid(load_features(args.input), jobs=args.jobs)
+    table.to_csv(args.output, index=False)
+    print(f"💾 Saved coefficient table: {args.output} ({len(table):,} rows)")
+    return table
+
+
+if __name__ == "__main__":
+    results = main()
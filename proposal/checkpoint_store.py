@@ -0,0 +1,157 @@
+import hashlib
+import json
+import os
+from datetime import datetime
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    DEFAULT_FORMAT = 'parquet'
+except ImportError:
+    DEFAULT_FORMAT = 'pickle'
+
+EXTENSIONS = {'parquet': '.parquet', 'feather': '.feather', 'pickle': '.pkl'}
+MANIFEST = 'manifest.json'
+
+
+def file_digest(path, block_size=1 << 20):
+    """sha256 of a file's contents (None when the file does not exist)"""
+    if not os.path.exists(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def frame_digest(df):
+    """Content hash of a DataFrame: column names, dtypes and row values"""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([[str(col), str(dtype)] for col, dtype in df.dtypes.items()]).encode())
+    for col in df.columns:
+        try:
+            values = pd.util.hash_pandas_object(df[col], index=False).to_numpy()
+        except TypeError:
+            # Unhashable cells (lists, dicts): fall back to their text form
+            values = pd.util.hash_pandas_object(df[col].astype(str), index=False).to_numpy()
+        digest.update(values.tobytes())
+    return digest.hexdigest()
+
+
+def fingerprint(value):
+    """Stable hash of a JSON-serializable description of task inputs"""
+    payload = json.dumps(value, sort_keys=True, default=str).encode()
+    return hashlib.sha256(payload).hexdigest()
+
+
+class CheckpointStore:
+    """
+    Binary task checkpoints with a JSON manifest.
+
+    Every task saves its output frames under one entry that records an
+    input fingerprint and a content hash per frame. A task can be skipped
+    on resume when its fingerprint is unchanged and every frame is intact.
+    """
+
+    def __init__(self, directory, fmt=DEFAULT_FORMAT):
+        if fmt not in EXTENSIONS:
+            raise ValueError(f"Unsupported checkpoint format: {fmt}")
+        self.directory = directory
+        self.fmt = fmt
+        os.makedirs(directory, exist_ok=True)
+        self.manifest_path = os.path.join(directory, MANIFEST)
+        self.manifest = self._read_manifest()
+
+    def _read_manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return {}
+        try:
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            print(f"⚠️  Checkpoint manifest unreadable, starting fresh: {self.manifest_path}")
+            return {}
+
+    def _write_manifest(self):
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _write_frame(self, path_stem, df):
+        """Write one frame, falling back to pickle for columns Arrow cannot store"""
+        for fmt in dict.fromkeys([self.fmt, 'pickle']):
+            path = path_stem + EXTENSIONS[fmt]
+            try:
+                if fmt == 'parquet':
+                    df.to_parquet(path, index=False)
+                elif fmt == 'feather':
+                    df.reset_index(drop=True).to_feather(path)
+                else:
+                    df.to_pickle(path)
+                return path, fmt
+            except Exception as e:
+                if fmt == 'pickle':
+                    raise
+                print(f"   ⚠️  {os.path.basename(path_stem)}: {fmt} failed ({e}), using pickle")
+        raise RuntimeError("unreachable")
+
+    @staticmethod
+    def _read_frame(path, fmt):
+        if fmt == 'parquet':
+            return pd.read_parquet(path)
+        if fmt == 'feather':
+            return pd.read_feather(path)
+        return pd.read_pickle(path)
+
+    def save(self, task, frames, inputs):
+        """Save {name: DataFrame} for a task together with its input fingerprint"""
+        entry = {'inputs': inputs, 'saved_at': datetime.now().isoformat(), 'frames': {}}
+
+        for name, df in frames.items():
+            path, fmt = self._write_frame(os.path.join(self.directory, f'{task}_{name}'), df)
+            # Hash what a reader will get back, since formats may normalize dtypes
+            entry['frames'][name] = {
+                'file': os.path.basename(path),
+                'format': fmt,
+                'hash': frame_digest(self._read_frame(path, fmt)),
+                'shape': list(df.shape),
+            }
+            print(f"   💾 Checkpoint saved: {path}")
+
+        self.manifest[task] = entry
+        self._write_manifest()
+        return entry
+
+    def frame_hashes(self, task):
+        """Content hashes of a task's saved frames (for downstream fingerprints)"""
+        entry = self.manifest.get(task, {})
+        return {name: info['hash'] for name, info in entry.get('frames', {}).items()}
+
+    def is_fresh(self, task, inputs):
+        """True when the task was saved with these inputs and its files exist"""
+        entry = self.manifest.get(task)
+        if entry is None or entry.get('inputs') != inputs:
+            return False
+        return all(os.path.exists(os.path.join(self.directory, info['file']))
+                   for info in entry['frames'].values())
+
+    def load(self, task, verify=True):
+        """Load a task's frames; raises ValueError when a file fails its hash"""
+        entry = self.manifest.get(task)
+        if entry is None:
+            raise KeyError(f"No checkpoint for {task}")
+
+        frames = {}
+        for name, info in entry['frames'].items():
+            df = self._read_frame(os.path.join(self.directory, info['file']), info['format'])
+            if verify and frame_digest(df) != info['hash']:
+                raise ValueError(f"Checkpoint {task}/{name} does not match its content hash")
+            frames[name] = df
+        return frames
+
+    def invalidate(self, task):
+        if self.manifest.pop(task, None) is not None:
+            self._write_manifest()
@@ -1,6 +1,8 @@
 import pandas as pd
 import numpy as np
 from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from panel_join import assemble_panel
+from source_registry import get_source
 
 def clean_illegal_chars(df):
     """Remove illegal characters from all string cells in a DataFrame"""
@@ -15,26 +17,16 @@ def load_and_standardize_datasets():
     # Load your 2021-2024 datasets
     print("Loading 2021-2024 datasets...")
     
-    # 1. Decentralization metrics
-    try:
-        datasets['decentralization'] = pd.read_excel('blockchain_decentralization_metrics_weekly_2021_2024.xlsx', sheet_name='Weekly_Metrics')
-        print(f"  ✓ Decentralization metrics: {len(datasets['decentralization'])} records")
-    except:
-        print("  ✗ Decentralization metrics file not found")
-    
-    # 2. Market cap and hash rate
-    try:
-        datasets['market'] = pd.read_excel('blockchain_market_hashrate_2021_2024.xlsx', sheet_name='Weekly_Data')
-        print(f"  ✓ Market data: {len(datasets['market'])} records")
-    except:
-        print("  ✗ Market data file not found")
-    
-    # 3. Proposal topic diversity
-    try:
-        datasets['proposals'] = pd.read_excel('proposal_topic_diversity_weekly.xlsx')
-        print(f"  ✓ Proposal diversity: {len(datasets['proposals'])} records")
-    except:
-        print("  ✗ Proposal diversity file not found")
+    # Paths come from the source registry; keep the workbooks' own column names
+    for name, label in [('decentralization', 'Decentralization metrics'),
+                        ('market', 'Market data'),
+                        ('proposals', 'Proposal diversity')]:
+        source = get_source(name)
+        try:
+            datasets[name] = source.load(rename=False)
+            print(f"  ✓ {label}: {len(datasets[name])} records")
+        except FileNotFoundError:
+            print(f"  ✗ {label} file not found: {source.path}")
     
     return datasets
 
@@ -50,25 +42,15 @@ def integrate_all_datasets(datasets):
         print("  No base dataset available")
         return pd.DataFrame()
     
-    # Merge market data
-    if 'market' in datasets:
-        master_df = master_df.merge(
-            datasets['market'], 
-            on=['Platform', 'Year', 'Week'], 
-            how='outer',
-            suffixes=('', '_market')
-        )
-        print(f"  After market merge: {len(master_df)} records")
-    
-    # Merge proposal diversity
-    if 'proposals' in datasets:
-        master_df = master_df.merge(
-            datasets['proposals'], 
-            on=['Platform', 'Year', 'Week'], 
-            how='outer',
-            suffixes=('', '_proposals')
-        )
-        print(f"  After proposals merge: {len(master_df)} records")
+    # Align market data and proposal diversity in a single keyed pass
+    sources = {name: datasets[name] for name in ['market', 'proposals'] if name in datasets}
+    master_df = assemble_panel(
+        master_df,
+        sources,
+        keys=['Platform', 'Year', 'Week'],
+        how='outer'
+    )
+    print(f"  After keyed integration: {len(master_df)} records")
     
     # Fill missing values
     numeric_columns = master_df.select_dtypes(include=[np.number]).columns
@@ -0,0 +1,266 @@
+import functools
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    import requests
+except ImportError:
+    requests = None
+
+# Named spans for the long-running scripts. Each span measures wall and CPU
+# time, the process's resident memory (current and high-water mark), rows in
+# and out, and the HTTP requests made while it was open. Spans nest; times
+# and HTTP counts are inclusive of child spans, and the summary table adds
+# each span's self time so the dominating stage stands out.
+#
+#     tracer = start_trace('group1')
+#     with span('cryptocompare', kind='fetch') as s:
+#         df = collect()
+#         s.rows(out=df)
+#     tracer.save('group1_trace.json')
+#     tracer.print_summary()
+
+SPAN_KINDS = ('task', 'fetch', 'parse', 'aggregate', 'merge', 'write')
+
+
+def peak_rss_mb():
+    """High-water mark of the process's resident memory (None if unavailable)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024**2 if sys.platform == 'darwin' else peak / 1024  # bytes on macOS, KiB elsewhere
+
+
+def current_rss_mb():
+    """Current resident memory (Linux only, else None)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024**2
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _count(rows):
+    return len(rows) if hasattr(rows, '__len__') else int(rows)
+
+
+class Span:
+    def __init__(self, tracer, span_id, name, kind, parent, attrs):
+        self.tracer = tracer
+        self.id = span_id
+        self.name = name
+        self.kind = kind
+        self.parent = parent
+        self.attrs = attrs
+        self.rows_in = None
+        self.rows_out = None
+        self.http = {'requests': 0, 'errors': 0, 'bytes': 0, 'seconds': 0.0}
+        self.error = None
+        self.offset_s = time.perf_counter() - tracer.t0
+        self._wall0 = time.perf_counter()
+        self._cpu0 = time.process_time()
+        self.rss_start_mb = current_rss_mb()
+        self._peak0 = peak_rss_mb()
+        self.wall_s = self.cpu_s = None
+        self.rss_end_mb = self.peak_rss_mb = self.peak_growth_mb = None
+
+    def rows(self, rows_in=None, out=None):
+        """Add row counts; DataFrames and other sized objects count by len()"""
+        if rows_in is not None:
+            self.rows_in = (self.rows_in or 0) + _count(rows_in)
+        if out is not None:
+            self.rows_out = (self.rows_out or 0) + _count(out)
+        return self
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+        return self
+
+    def close(self, error=None):
+        self.wall_s = time.perf_counter() - self._wall0
+        self.cpu_s = time.process_time() - self._cpu0
+        self.rss_end_mb = current_rss_mb()
+        self.peak_rss_mb = peak_rss_mb()
+        if self.peak_rss_mb is not None:
+            self.peak_growth_mb = self.peak_rss_mb - self._peak0
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+
+    def to_dict(self):
+        def rounded(value, digits=4):
+            return None if value is None else round(value, digits)
+        return {
+            'id': self.id, 'parent': self.parent, 'name': self.name, 'kind': self.kind,
+            'offset_s': rounded(self.offset_s), 'wall_s': rounded(self.wall_s), 'cpu_s': rounded(self.cpu_s),
+            'rss_start_mb': rounded(self.rss_start_mb, 1), 'rss_end_mb': rounded(self.rss_end_mb, 1),
+            'peak_rss_mb': rounded(self.peak_rss_mb, 1), 'peak_growth_mb': rounded(self.peak_growth_mb, 1),
+            'rows_in': self.rows_in, 'rows_out': self.rows_out,
+            'http': {**self.http, 'seconds': round(self.http['seconds'], 4)},
+            'attrs': self.attrs, 'error': self.error,
+        }
+
+
+class Tracer:
+    def __init__(self, name='run'):
+        self.name = name
+        self.started = datetime.now()
+        self.t0 = time.perf_counter()
+        self.spans = []
+        self.stack = []
+        self.http = {'requests': 0, 'errors': 0, 'bytes': 0, 'seconds': 0.0}
+
+    @contextmanager
+    def span(self, name, kind='task', rows_in=None, **attrs):
+        parent = self.stack[-1].id if self.stack else None
+        current = Span(self, len(self.spans), name, kind, parent, attrs)
+        if rows_in is not None:
+            current.rows(rows_in=rows_in)
+        self.spans.append(current)
+        self.stack.append(current)
+        try:
+            yield current
+        except BaseException as e:
+            current.close(e)
+            raise
+        else:
+            current.close()
+        finally:
+            self.stack.remove(current)
+
+    def record_http(self, seconds, nbytes, error):
+        for counters in [self.http] + [s.http for s in self.stack]:
+            counters['requests'] += 1
+            counters['errors'] += int(error)
+            counters['bytes'] += nbytes
+            counters['seconds'] += seconds
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'started': self.started.isoformat(),
+            'wall_s': round(time.perf_counter() - self.t0, 4),
+            'peak_rss_mb': peak_rss_mb(),
+            'http': {**self.http, 'seconds': round(self.http['seconds'], 4)},
+            'spans': [s.to_dict() for s in self.spans],
+        }
+
+    def save(self, path):
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2, default=str)
+        os.replace(tmp_path, path)
+        print(f"📋 Trace saved: {path}")
+
+    def summary(self):
+        """One row per (kind, name): calls, inclusive and self time, memory, rows, HTTP"""
+        closed = [s for s in self.spans if s.wall_s is not None]
+        if not closed:
+            return pd.DataFrame()
+        children = {}
+        for s in closed:
+            if s.parent is not None:
+                children[s.parent] = children.get(s.parent, 0.0) + s.wall_s
+        rows = pd.DataFrame({
+            'kind': [s.kind for s in closed],
+            'name': [s.name for s in closed],
+            'calls': 1,
+            'wall_s': [s.wall_s for s in closed],
+            'self_s': [s.wall_s - children.get(s.id, 0.0) for s in closed],
+            'cpu_s': [s.cpu_s for s in closed],
+            'peak_rss_mb': [s.peak_rss_mb for s in closed],
+            'peak_growth_mb': [s.peak_growth_mb for s in closed],
+            'rows_in': pd.array([s.rows_in for s in closed], dtype='Int64'),
+            'rows_out': pd.array([s.rows_out for s in closed], dtype='Int64'),
+            'http_requests': [s.http['requests'] for s in closed],
+            'http_errors': [s.http['errors'] for s in closed],
+            'http_mb': [s.http['bytes'] / 1024**2 for s in closed],
+        })
+        table = rows.groupby(['kind', 'name'], sort=False).agg({
+            'calls': 'sum', 'wall_s': 'sum', 'self_s': 'sum', 'cpu_s': 'sum', 'peak_rss_mb': 'max',
+            'peak_growth_mb': 'sum', 'rows_in': lambda x: x.sum(min_count=1), 'rows_out': lambda x: x.sum(min_count=1),
+            'http_requests': 'sum', 'http_errors': 'sum', 'http_mb': 'sum',
+        }).reset_index()
+        total = time.perf_counter() - self.t0
+        table.insert(5, 'self_pct', 100 * table['self_s'] / total if total else 0.0)
+        return table.sort_values('self_s', ascending=False, kind='stable').reset_index(drop=True)
+
+    def print_summary(self):
+        table = self.summary()
+        print(f"\n⏱️  TRACE SUMMARY: {self.name} ({time.perf_counter() - self.t0:.1f}s, "
+              f"{self.http['requests']} HTTP requests)")
+        if table.empty:
+            print("   (no spans recorded)")
+            return table
+        print(table.to_string(index=False, float_format=lambda v: f'{v:,.2f}'))
+        return table
+
+
+_tracer = Tracer()
+_http_hooked = False
+
+
+def _hook_http():
+    """Count every requests call (requests.get/post and Sessions) on the open spans"""
+    global _http_hooked
+    if _http_hooked or requests is None:
+        return
+    send = requests.sessions.Session.send
+
+    @functools.wraps(send)
+    def counted_send(session, request, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = send(session, request, **kwargs)
+        except Exception:
+            _tracer.record_http(time.perf_counter() - started, 0, True)
+            raise
+        nbytes = len(response.content) if not kwargs.get('stream') else int(response.headers.get('Content-Length', 0))
+        _tracer.record_http(time.perf_counter() - started, nbytes, response.status_code >= 400)
+        return response
+
+    requests.sessions.Session.send = counted_send
+    _http_hooked = True
+
+
+def start_trace(name):
+    """Start a new trace that span() and traced() record into"""
+    global _tracer
+    _tracer = Tracer(name)
+    _hook_http()
+    return _tracer
+
+
+def current_tracer():
+    return _tracer
+
+
+def span(name, kind='task', rows_in=None, **attrs):
+    return _tracer.span(name, kind, rows_in, **attrs)
+
+
+def traced(kind='task', name=None):
+    """
+    Decorator: run the function in a span named after it. A returned
+    DataFrame (or other sized result) is recorded as rows out.
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name or func.__name__.strip('_'), kind) as s:
+                result = func(*args, **kwargs)
+                if isinstance(result, pd.DataFrame):
+                    s.rows(out=result)
+                return result
+        return wrapper
+    return decorate
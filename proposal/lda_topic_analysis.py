@@ -5,11 +5,18 @@ from sklearn.decomposition import LatentDirichletAllocation
 import nltk
 from nltk.corpus import stopwords
 from nltk.tokenize import word_tokenize
+import os
 import re
+import sys
 from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
 
+from source_registry import get_source
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'commits'))
+from time_buckets import BUCKET_KEYS, DEFAULT_WINDOW, bucket_label, daily_totals, rollup
+
 def preprocess_text(text):
     """Clean and preprocess proposal content"""
     if pd.isna(text) or text == '':
@@ -39,7 +46,7 @@ def load_and_combine_proposal_data():
     print("Loading proposal data...")
     
     # Load your 2021-2024 data (all sheets)
-    new_proposals_file = 'improvement_proposals_all_platforms_2021_2024.xlsx'
+    new_proposals_file = get_source('improvement_proposals').abspath
     
     # Load old 2015-2020 data
     old_proposals_file = 'Proposal Content.xlsx'
@@ -141,28 +148,27 @@ def perform_lda_analysis(proposals_df, n_topics=15, random_state=42):
     
     return proposals_df, lda, vectorizer
 
-def aggregate_weekly_diversity(proposals_df):
-    """Aggregate topic diversity by platform and week"""
-    print("Aggregating weekly topic diversity...")
-    
-    # Convert date to datetime and extract year/week
+def aggregate_weekly_diversity(proposals_df, granularity='week', window=DEFAULT_WINDOW):
+    """
+    Aggregate topic diversity by platform and week (or by day, month or
+    rolling window; see time_buckets.GRANULARITIES)
+    """
+    print(f"Aggregating {bucket_label(granularity, window)} topic diversity...")
+    
+    # Convert date to datetime (invalid dates become NaT and are dropped)
     proposals_df['Date'] = pd.to_datetime(proposals_df['Date'], errors='coerce')
     
-    # Remove rows with invalid dates
-    proposals_df = proposals_df.dropna(subset=['Date']).copy()
-    
-    proposals_df['Year'] = proposals_df['Date'].dt.isocalendar().year
-    proposals_df['Week'] = proposals_df['Date'].dt.isocalendar().week
-    
-    # Aggregate by platform, year, week
-    weekly_diversity = proposals_df.groupby(['Platform', 'Year', 'Week']).agg({
-        'Number': 'count',  # Number of proposals
-        'topic_diversity': 'mean'  # Average topic diversity
-    }).reset_index()
+    # Per-day proposal counts and diversity sums
+    daily = daily_totals(proposals_df, 'Date', sums=['topic_diversity'], counts=['Number'])
+    buckets = rollup(daily, granularity, window=window)
     
-    weekly_diversity.columns = ['Platform', 'Year', 'Week', 'Number_Proposal', 'Topic_Diversity']
+    keys = ['Platform'] + BUCKET_KEYS[granularity]
+    weekly_diversity = buckets[keys].copy()
+    weekly_diversity['Number_Proposal'] = buckets['Number__n']  # Number of proposals
+    n = buckets['topic_diversity__n']
+    weekly_diversity['Topic_Diversity'] = buckets['topic_diversity__sum'] / n.where(n > 0)  # Average topic diversity
     
-    print(f"  Created {len(weekly_diversity)} weekly diversity records")
+    print(f"  Created {len(weekly_diversity)} {bucket_label(granularity, window)} diversity records")
     
     return weekly_diversity
 
@@ -0,0 +1,156 @@
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+# Target dtypes by canonical column name. Integer targets fall back to the
+# nullable variant ('Int16', 'Int32', ...) when the column has missing values.
+COLUMN_DTYPES = {
+    'Platform': 'category',
+    'year': 'int16',
+    'week': 'int16',
+    'Year': 'int16',
+    'Week': 'int16',
+    'month': 'int8',
+    'Total_Blocks': 'int32',
+    'Unique_Miners': 'int32',
+    'Total_Commits': 'int32',
+    'Unique_Authors': 'int32',
+    'Number_Proposal': 'int32',
+    'Platform_age': 'int32',
+    'stars': 'int32',
+    'forks': 'int32',
+    'reddit_subscribers': 'int32',
+    'reddit_posts': 'int32',
+    'reddit_comments': 'int32',
+    'reddit_active_users': 'int32',
+    # Bounded index values; 7 significant digits are plenty
+    'Block_HHI': 'float32',
+    'Block_Shannon': 'float32',
+    'Commit_HHI': 'float32',
+    'Commit_Shannon': 'float32',
+    'Block_Inverse_HHI': 'float32',
+    'Block_Shannon_Entropy': 'float32',
+    'Commit_Inverse_HHI': 'float32',
+    'Commit_Shannon_Entropy': 'float32',
+    'Topic_Diversity': 'float32',
+}
+
+# Relative error a declared float32 column may lose; beyond it float64 is kept
+FLOAT32_RTOL = 1e-6
+
+# Object columns become categorical when at most this share of values is unique
+CATEGORY_RATIO = 0.5
+
+
+def memory_mb(df):
+    return df.memory_usage(deep=True).sum() / 1024**2
+
+
+def _nullable(dtype):
+    return dtype[0].upper() + dtype[1:]
+
+
+def _fits(values, dtype):
+    info = np.iinfo(dtype)
+    return values.min() >= info.min and values.max() <= info.max
+
+
+def float32_safe(series, rtol=0.0):
+    """True when float32 reproduces every value within rtol (0 = exactly)"""
+    values = series.to_numpy(dtype='float64', na_value=np.nan)
+    finite = np.isfinite(values)
+    if not finite.any():
+        return True
+    original = values[finite]
+    if np.abs(original).max() > np.finfo('float32').max:
+        return False
+    roundtrip = original.astype('float32').astype('float64')
+    if rtol == 0.0:
+        return bool((roundtrip == original).all())
+    return bool(np.allclose(roundtrip, original, rtol=rtol, atol=0.0))
+
+
+def compact_integer(series, dtype):
+    """Cast integral values to dtype, or its nullable variant when NA is present"""
+    values = pd.to_numeric(series, errors='coerce')
+    present = values.dropna()
+    if not present.empty and (not (present == np.floor(present)).all() or not _fits(present, dtype)):
+        return series
+    if values.isna().any():
+        return values.astype(_nullable(dtype))
+    return values.astype(dtype)
+
+
+def compact_series(series, target=None):
+    """Pick the smallest dtype for one column"""
+    if target == 'category':
+        return series.astype('category')
+
+    if target is not None and target.startswith('int'):
+        return compact_integer(series, target)
+
+    if pd.api.types.is_float_dtype(series.dtype):
+        if target == 'float32' and float32_safe(series, FLOAT32_RTOL):
+            return series.astype('float32')
+        if target is None and float32_safe(series):
+            return series.astype('float32')
+        return series
+
+    if pd.api.types.is_integer_dtype(series.dtype) and target is None:
+        return pd.to_numeric(series, downcast='integer')
+
+    if (pd.api.types.is_object_dtype(series.dtype) or pd.api.types.is_string_dtype(series.dtype)) \
+            and target is None and len(series):
+        if series.nunique() / len(series) <= CATEGORY_RATIO:
+            return series.astype('category')
+
+    return series
+
+
+def replace_values(series, mapping):
+    """
+    series.replace(mapping) that also works on categorical columns (pandas
+    refuses a replacement that is not already a category); the result stays
+    categorical.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.astype(object).replace(mapping).astype('category')
+    return series.replace(mapping)
+
+
+def compact_frame(df, schema=None):
+    """Apply the dtype schema (COLUMN_DTYPES by default) to every column"""
+    schema = COLUMN_DTYPES if schema is None else schema
+    for col in df.columns:
+        df[col] = compact_series(df[col], schema.get(col))
+    return df
+
+
+def concat_chunks(chunks, schema=None):
+    """Concatenate compacted chunks, unifying categories across chunks"""
+    schema = COLUMN_DTYPES if schema is None else schema
+    chunks = [chunk for chunk in chunks if len(chunk)] or chunks[:1]
+    if len(chunks) == 1:
+        return chunks[0].reset_index(drop=True)
+
+    mixed = []
+    for col in chunks[0].columns:
+        dtypes = {str(chunk[col].dtype) for chunk in chunks}
+        if dtypes == {'category'}:
+            categories = union_categoricals([chunk[col] for chunk in chunks]).categories
+            for chunk in chunks:
+                chunk[col] = chunk[col].cat.set_categories(categories)
+        elif len(dtypes) > 1:
+            mixed.append(col)
+
+    df = pd.concat(chunks, ignore_index=True)
+    # Chunks that disagreed (e.g. one needed a nullable int) are compacted again
+    for col in mixed:
+        df[col] = compact_series(df[col], schema.get(col))
+    return df
+
+
+def report(name, before_mb, after_mb):
+    saved = before_mb - after_mb
+    share = saved / before_mb * 100 if before_mb else 0
+    print(f"   💾 {name}: {before_mb:.1f} MB -> {after_mb:.1f} MB (saved {saved:.1f} MB, {share:.0f}%)")
@@ -0,0 +1,177 @@
+import os
+import pandas as pd
+
+from panel_dtypes import compact_frame, concat_chunks, memory_mb, report
+
+# Rows per chunk when streaming .dta/.csv files through a row predicate
+CHUNK_ROWS = 100000
+
+
+def file_format(path):
+    """Return 'xlsx', 'dta' or 'csv' based on the file extension"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in ('.xlsx', '.xlsm'):
+        return 'xlsx'
+    if ext == '.dta':
+        return 'dta'
+    if ext == '.csv':
+        return 'csv'
+    raise ValueError(f"Unsupported file format: {path}")
+
+
+def read_metadata(path, sheet_name=0):
+    """
+    Column names and row count without loading any data.
+    Excel reads only the header row (row count comes from the sheet
+    dimensions); Stata reads only the file header.
+    """
+    fmt = file_format(path)
+
+    if fmt == 'xlsx':
+        from openpyxl import load_workbook
+        wb = load_workbook(path, read_only=True)
+        try:
+            ws = wb[sheet_name] if isinstance(sheet_name, str) else wb.worksheets[sheet_name]
+            header = next(ws.iter_rows(min_row=1, max_row=1, values_only=True), ())
+            columns = [col for col in header if col is not None]
+            nrows = max(ws.max_row - 1, 0) if ws.max_row else None
+        finally:
+            wb.close()
+        return {'columns': columns, 'nrows': nrows}
+
+    if fmt == 'dta':
+        with pd.io.stata.StataReader(path) as reader:
+            labels = reader.variable_labels()
+            nrows = getattr(reader, '_nobs', None)
+        return {'columns': list(labels), 'nrows': nrows, 'labels': labels}
+
+    columns = list(pd.read_csv(path, nrows=0).columns)
+    with open(path, 'rb') as f:
+        nrows = max(sum(1 for _ in f) - 1, 0)
+    return {'columns': columns, 'nrows': nrows}
+
+
+def project_columns(path, columns, sheet_name=0):
+    """Keep the requested columns that exist in the file, in file order"""
+    if columns is None:
+        return None
+    available = read_metadata(path, sheet_name)['columns']
+    wanted = set(columns)
+    return [col for col in available if col in wanted]
+
+
+def read_table(path, columns=None, where=None, sheet_name=0, chunksize=CHUNK_ROWS,
+               prepare=None, compact=False, name=None):
+    """
+    Read a panel file, pushing projection, row filtering and dtype
+    compaction into the reader.
+
+    columns: only these columns are parsed (missing ones are ignored)
+    where:   callable returning a boolean mask; applied per chunk for
+             .dta/.csv so filtered-out rows are never held in memory together
+    prepare: callable run on each chunk before `where` (e.g. renames)
+    compact: assign compact dtypes chunk by chunk (see panel_dtypes), so a
+             large file never exists at full width in RAM; savings are
+             reported under `name`
+    """
+    fmt = file_format(path)
+    columns = project_columns(path, columns, sheet_name)
+    stats = {'before': 0.0, 'after': 0.0}
+
+    def process(chunk):
+        if prepare is not None:
+            chunk = prepare(chunk)
+        if where is not None:
+            chunk = chunk[where(chunk)]
+        if compact:
+            stats['before'] += memory_mb(chunk)
+            chunk = compact_frame(chunk)
+            stats['after'] += memory_mb(chunk)
+        return chunk
+
+    if fmt == 'xlsx':
+        chunks = [pd.read_excel(path, sheet_name=sheet_name, usecols=columns)]
+    elif fmt == 'dta':
+        if where is None and not compact:
+            chunks = [pd.read_stata(path, columns=columns)]
+        else:
+            chunks = pd.read_stata(path, columns=columns, iterator=True, chunksize=chunksize)
+    elif where is None and not compact:
+        chunks = [pd.read_csv(path, usecols=columns, low_memory=False)]
+    else:
+        chunks = pd.read_csv(path, usecols=columns, chunksize=chunksize, low_memory=False)
+
+    if hasattr(chunks, '__enter__'):
+        with chunks as reader:
+            processed = [process(chunk) for chunk in reader]
+    else:
+        processed = [process(chunk) for chunk in chunks]
+
+    if not processed:
+        return pd.DataFrame(columns=columns)
+    df = concat_chunks(processed) if compact else pd.concat(processed, ignore_index=True)
+
+    if compact and name:
+        report(name, stats['before'], stats['after'])
+    return df
+
+
+def iter_chunks(path, columns=None, chunksize=CHUNK_ROWS, sheet_name=0):
+    """
+    Yield the file as DataFrames of at most chunksize rows. Excel sheets are
+    streamed row by row through openpyxl's read-only mode, so no format
+    needs the whole file in memory.
+    """
+    fmt = file_format(path)
+    columns = project_columns(path, columns, sheet_name)
+
+    if fmt == 'dta':
+        with pd.read_stata(path, columns=columns, iterator=True, chunksize=chunksize) as reader:
+            yield from reader
+        return
+
+    if fmt == 'csv':
+        with pd.read_csv(path, usecols=columns, chunksize=chunksize, low_memory=False) as reader:
+            yield from reader
+        return
+
+    from openpyxl import load_workbook
+    wb = load_workbook(path, read_only=True)
+    try:
+        ws = wb[sheet_name] if isinstance(sheet_name, str) else wb.worksheets[sheet_name]
+        rows = ws.iter_rows(values_only=True)
+        header = list(next(rows, ()))
+        names = columns if columns is not None else [col for col in header if col is not None]
+        positions = [header.index(col) for col in names]
+
+        buffer = []
+        for row in rows:
+            buffer.append([row[i] if i < len(row) else None for i in positions])
+            if len(buffer) >= chunksize:
+                yield pd.DataFrame(buffer, columns=names)
+                buffer = []
+        if buffer:
+            yield pd.DataFrame(buffer, columns=names)
+    finally:
+        wb.close()
+
+
+def isin(column, values):
+    """Row predicate: column value is one of values"""
+    values = list(values)
+    return lambda df: df[column].isin(values)
+
+
+def between(column, low, high):
+    """Row predicate: low <= column <= high"""
+    return lambda df: pd.to_numeric(df[column], errors='coerce').between(low, high)
+
+
+def all_of(*predicates):
+    """Combine row predicates with logical AND"""
+    def predicate(df):
+        mask = pd.Series(True, index=df.index)
+        for p in predicates:
+            mask &= p(df)
+        return mask
+    return predicate
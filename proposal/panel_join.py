@@ -0,0 +1,241 @@
+import numpy as np
+import pandas as pd
+from pandas.api.extensions import take
+
+# Canonical panel key names; callers with 'Year'/'Week' columns pass their own
+PANEL_KEYS = ('Platform', 'year', 'week')
+WEEKS_PER_YEAR = 53  # ISO years have 52 or 53 weeks
+
+
+def take_rows(series, rows):
+    """Gather series values by position; -1 positions become missing"""
+    if isinstance(series.dtype, np.dtype):
+        values = series.to_numpy()
+    else:
+        values = series.array
+    return take(values, rows, allow_fill=True)
+
+
+class PanelJoiner:
+    """
+    Align weekly and platform-level sources onto one Platform/year/week panel.
+
+    Every source is indexed once on an integer key built from
+    (platform_id, week_index) and gathered straight into the output columns,
+    so the result is allocated once instead of once per pd.merge call.
+    """
+
+    def __init__(self, base, keys=PANEL_KEYS, how='left', conflict='suffix'):
+        if how not in ('left', 'outer'):
+            raise ValueError(f"Unsupported join type: {how}")
+        if conflict not in ('suffix', 'fill', 'overwrite'):
+            raise ValueError(f"Unsupported conflict policy: {conflict}")
+
+        self.base = base
+        self.keys = tuple(keys)
+        self.how = how
+        self.conflict = conflict
+        self.sources = []
+
+    def add(self, name, df, on=None):
+        """Register a source; nothing is copied until assemble()"""
+        if df is None or df.empty:
+            print(f"  ⚠️  Skipping {name} (empty)")
+            return self
+
+        if on is None:
+            on = [key for key in self.keys if key in df.columns and key in self.base.columns]
+        on = tuple(on)
+
+        if not on:
+            print(f"  ⚠️  No common merge keys for {name}")
+            return self
+        if self.keys[0] not in on:
+            raise ValueError(f"Source {name} must be keyed on {self.keys[0]}")
+
+        self.sources.append((name, df, on))
+        return self
+
+    def _key_arrays(self, df, on):
+        """
+        Return (platform, year, week, valid, out_of_range) arrays for the given
+        key columns. out_of_range flags present keys that cannot be encoded:
+        non-integer years/weeks and weeks outside 1..WEEKS_PER_YEAR, which
+        would otherwise land in a neighbouring year's slot.
+        """
+        platform_col, year_col, week_col = self.keys
+        n = len(df)
+
+        platform = df[platform_col].to_numpy(dtype=object)
+        valid = pd.notna(platform)
+        out_of_range = np.zeros(n, dtype=bool)
+
+        if year_col in on:
+            year = pd.to_numeric(df[year_col], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+            valid &= ~np.isnan(year)
+            out_of_range |= ~np.isnan(year) & (year != np.floor(year))
+        else:
+            year = np.full(n, float(self.min_year))
+
+        if week_col in on:
+            week = pd.to_numeric(df[week_col], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+            valid &= ~np.isnan(week)
+            out_of_range |= ~np.isnan(week) & ((week != np.floor(week)) | (week < 1) | (week > WEEKS_PER_YEAR))
+        else:
+            week = np.ones(n)
+
+        return platform, year, week, valid & ~out_of_range, valid & out_of_range
+
+    def _build_key_space(self):
+        """Collect the platform ids and year span shared by base and sources"""
+        platform_col, year_col, _ = self.keys
+        frames = [(self.base, self.keys)] + [(df, on) for _, df, on in self.sources]
+
+        platforms = pd.Index([], dtype=object)
+        years = []
+        for df, on in frames:
+            platforms = platforms.union(pd.Index(df[platform_col].dropna().unique(), dtype=object))
+            if year_col in on and year_col in df.columns:
+                year = pd.to_numeric(df[year_col], errors='coerce').dropna()
+                if not year.empty:
+                    years.extend([year.min(), year.max()])
+
+        self.platform_index = platforms
+        self.min_year = int(min(years)) if years else 0
+        self.n_years = int(max(years)) - self.min_year + 1 if years else 1
+
+    def encode(self, df, on, name=None):
+        """Encode key columns as int64 panel keys (-1 where a key is missing or invalid)"""
+        platform, year, week, valid, out_of_range = self._key_arrays(df, on)
+        invalid = int(out_of_range.sum())
+        if invalid and name:
+            print(f"  ⚠️  {name}: {invalid} rows with non-integer or out-of-range "
+                  f"year/week (week must be 1..{WEEKS_PER_YEAR}) ignored")
+
+        platform_id = self.platform_index.get_indexer(platform)
+        valid &= platform_id >= 0
+
+        week_index = (year - self.min_year) * WEEKS_PER_YEAR + (week - 1)
+        codes = platform_id.astype('int64') * (self.n_years * WEEKS_PER_YEAR)
+        codes += np.where(valid, week_index, 0).astype('int64')
+        return np.where(valid, codes, -1)
+
+    def _indexer(self, target_codes, source_codes, name):
+        """Map every output row to its source row (-1 when absent)"""
+        valid = source_codes >= 0
+        positions = np.flatnonzero(valid)
+        codes = source_codes[valid]
+
+        order = np.argsort(codes, kind='stable')
+        sorted_codes = codes[order]
+        sorted_positions = positions[order]
+
+        # Keep the first occurrence of duplicated keys instead of fanning out rows
+        first = np.ones(len(sorted_codes), dtype=bool)
+        first[1:] = sorted_codes[1:] != sorted_codes[:-1]
+        duplicates = len(sorted_codes) - int(first.sum())
+        if duplicates:
+            print(f"  ⚠️  {name}: {duplicates} duplicate key rows ignored (kept first)")
+        sorted_codes = sorted_codes[first]
+        sorted_positions = sorted_positions[first]
+
+        if len(sorted_codes) == 0:
+            return np.full(len(target_codes), -1, dtype='int64')
+
+        slot = np.searchsorted(sorted_codes, target_codes)
+        slot = np.minimum(slot, len(sorted_codes) - 1)
+        found = (sorted_codes[slot] == target_codes) & (target_codes >= 0)
+        return np.where(found, sorted_positions[slot], -1)
+
+    def _output_keys(self, base_codes):
+        """Target key codes for every output row and the base row feeding each"""
+        if self.how == 'left':
+            return base_codes, np.arange(len(base_codes))
+
+        full_keys = self.keys
+        all_codes = [base_codes[base_codes >= 0]]
+        for _, df, on in self.sources:
+            if on == full_keys:
+                codes = self.encode(df, on)
+                all_codes.append(codes[codes >= 0])
+        target = np.unique(np.concatenate(all_codes))
+
+        base_rows = self._indexer(target, base_codes, 'base')
+        # Base rows without a usable key are kept at the end, unmatched
+        unkeyed = np.flatnonzero(base_codes < 0)
+        target = np.concatenate([target, np.full(len(unkeyed), -1, dtype='int64')])
+        base_rows = np.concatenate([base_rows, unkeyed])
+        return target, base_rows
+
+    def _decode_keys(self, codes):
+        """Rebuild Platform/year/week columns for rows created by an outer join"""
+        span = self.n_years * WEEKS_PER_YEAR
+        valid = codes >= 0
+        platform_id = np.where(valid, codes // span, -1)
+        week_index = codes % span
+
+        platform = take(self.platform_index.to_numpy(dtype=object), platform_id, allow_fill=True)
+        year = np.where(valid, week_index // WEEKS_PER_YEAR + self.min_year, np.nan)
+        week = np.where(valid, week_index % WEEKS_PER_YEAR + 1, np.nan)
+        return platform, year, week
+
+    def assemble(self):
+        """Gather all registered sources into a single wide DataFrame"""
+        self._build_key_space()
+
+        base_codes = self.encode(self.base, self.keys, 'base')
+        target, base_rows = self._output_keys(base_codes)
+        n_out = len(target)
+
+        columns = {}
+        for col in self.base.columns:
+            columns[col] = take_rows(self.base[col], base_rows)
+
+        if self.how == 'outer':
+            # Rows that exist only in a source get their keys decoded from the code
+            for col, decoded in zip(self.keys, self._decode_keys(target)):
+                current = pd.Series(columns[col])
+                current = current.where(current.notna(), pd.Series(decoded))
+                if col != self.keys[0] and current.notna().all():
+                    current = current.astype('int64')
+                columns[col] = current.array
+
+        # Cache encoded base codes per key subset so static sources reuse them
+        target_codes = {self.keys: target}
+
+        for name, df, on in self.sources:
+            if on not in target_codes:
+                if self.how == 'left':
+                    target_codes[on] = self.encode(self.base, on)
+                else:
+                    out_frame = pd.DataFrame({key: columns[key] for key in self.keys})
+                    target_codes[on] = self.encode(out_frame, on)
+
+            rows = self._indexer(target_codes[on], self.encode(df, on, name), name)
+
+            for col in df.columns:
+                if col in on:
+                    continue
+                values = take_rows(df[col], rows)
+
+                if col not in columns:
+                    columns[col] = values
+                elif self.conflict == 'suffix':
+                    columns[f'{col}_{name}'] = values
+                elif self.conflict == 'fill':
+                    existing = pd.Series(columns[col])
+                    columns[col] = existing.where(existing.notna(), pd.Series(values)).array
+                else:
+                    columns[col] = values
+
+            print(f"  ✅ Aligned {name}: {int((rows >= 0).sum())}/{n_out} rows matched")
+
+        return pd.DataFrame(columns, copy=False)
+
+
+def assemble_panel(base, sources, keys=PANEL_KEYS, how='left', conflict='suffix'):
+    """Join a dict of {name: DataFrame} onto base in a single pass"""
+    joiner = PanelJoiner(base, keys=keys, how=how, conflict=conflict)
+    for name, df in sources.items():
+        joiner.add(name, df)
+    return joiner.assemble()
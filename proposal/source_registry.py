@@ -0,0 +1,302 @@
+import os
+import pandas as pd
+
+from panel_join import PanelJoiner
+from panel_io import read_metadata, read_table
+from panel_dtypes import replace_values
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# Canonical panel keys used by every integrated dataset
+PANEL_KEYS = ['Platform', 'year', 'week']
+
+# Platform spellings found across collectors, mapped to the panel spelling
+PLATFORM_ALIASES = {
+    'Bitcoin ': 'Bitcoin',
+    'BitcoinCash': 'Bitcoin Cash',
+    'BitcoinSV': 'Bitcoin SV',
+    'Bitcoin_Cash': 'Bitcoin Cash',
+    'Bitcoin_SV': 'Bitcoin SV',
+    'Ethereum_Go': 'Ethereum',
+}
+
+# Column renames shared by the weekly metric files
+WEEKLY_KEY_RENAME = {'Year': 'year', 'Week': 'week'}
+DECENTRALIZATION_RENAME = {
+    **WEEKLY_KEY_RENAME,
+    'Block_Inverse_HHI': 'Block_HHI',
+    'Block_Shannon_Entropy': 'Block_Shannon',
+    'Commit_Inverse_HHI': 'Commit_HHI',
+    'Commit_Shannon_Entropy': 'Commit_Shannon',
+}
+MARKET_RENAME = {
+    **WEEKLY_KEY_RENAME,
+    'Market_Capitalization': 'market_cap',
+    'Hash_Rate': 'hashrate',
+}
+
+
+class DataSource:
+    """Declarative description of one input file used by the integration scripts"""
+
+    def __init__(self, name, path, description, columns, keys=('Platform',),
+                 rename=None, sheet_name=0, granularity='weekly', static=False,
+                 weekly_agg=None):
+        self.name = name
+        self.path = path                  # relative to the repository root
+        self.description = description
+        self.columns = list(columns)      # raw column names as stored in the file
+        self.keys = list(keys)            # raw key columns
+        self.rename = dict(rename or {})  # raw -> canonical
+        self.sheet_name = sheet_name
+        self.granularity = granularity    # weekly, daily, block, commit, proposal, static
+        self.static = static              # platform-level snapshot, not a time series
+        self.weekly_agg = dict(weekly_agg or {})
+
+    @property
+    def abspath(self):
+        return os.path.join(REPO_ROOT, self.path)
+
+    @property
+    def canonical_columns(self):
+        return [self.rename.get(col, col) for col in self.columns]
+
+    @property
+    def canonical_keys(self):
+        return [self.rename.get(col, col) for col in self.keys]
+
+    def exists(self):
+        return os.path.exists(self.abspath)
+
+    def provides(self, variable):
+        return variable in self.canonical_columns
+
+    def raw_columns(self, columns=None):
+        """Raw column names that may hold the requested canonical columns"""
+        if columns is None:
+            return None
+        wanted = list(self.keys)
+        for col in list(self.canonical_keys) + list(columns):
+            candidates = [raw for raw, canonical in self.rename.items() if canonical == col] + [col]
+            for raw in candidates:
+                if raw not in wanted:
+                    wanted.append(raw)
+        return wanted
+
+    def metadata(self):
+        """Column names and row count read from the file header only"""
+        return read_metadata(self.abspath, self.sheet_name)
+
+    def canonicalize(self, df, rename=True, standardize_platforms=True):
+        """Apply platform aliases and the rename map (or, with rename='keys', only its key renames) to a raw frame"""
+        if standardize_platforms and 'Platform' in df.columns:
+            df['Platform'] = replace_values(df['Platform'], PLATFORM_ALIASES)
+        if rename == 'keys':
+            df = df.rename(columns={raw: col for raw, col in self.rename.items() if col in PANEL_KEYS})
+        elif rename:
+            df = df.rename(columns=self.rename)
+        return df
+
+    def load(self, columns=None, where=None, rename=True, standardize_platforms=True, compact=False):
+        """
+        Load the source. `columns` are canonical names; only those plus the key
+        columns are parsed. `where` is a row predicate evaluated inside the
+        reader on the renamed columns. With rename=False the file's own column
+        names are kept, and with rename='keys' only the key columns are renamed
+        (Year/Week to year/week). With compact=True dtypes are compacted while
+        reading.
+        """
+        prepare = lambda chunk: self.canonicalize(chunk, rename, standardize_platforms)
+        return read_table(self.abspath, self.raw_columns(columns), where, self.sheet_name,
+                          prepare=prepare, compact=compact, name=self.description)
+
+
+def _source(*args, **kwargs):
+    source = DataSource(*args, **kwargs)
+    return source.name, source
+
+
+SOURCES = dict([
+    # Commits folder
+    _source('blocks', 'commits/blockchain_block_data_real_2021_2024.xlsx', 'Block Data',
+            ['Platform', 'block_id', 'block_hash', 'block_time', 'block_date', 'block_size',
+             'transaction_count', 'difficulty', 'miner', 'reward', 'fee_total', 'year'],
+            granularity='block'),
+    _source('commits', 'commits/blockchain_commit_data_all_2021_2024.xlsx', 'Commit Data',
+            ['Token_id', 'commit_id', 'author_name', 'author_email', 'author_date',
+             'committer_name', 'committer_email', 'commit_date', 'commit_message',
+             'commit_verified', 'commit_reason', 'Platform'],
+            granularity='commit'),
+    _source('decentralization', 'commits/blockchain_decentralization_metrics_weekly_2021_2024_fixed.xlsx',
+            'Decentralization Metrics',
+            ['Platform', 'Year', 'Week', 'Block_Inverse_HHI', 'Block_Shannon_Entropy', 'Total_Blocks',
+             'Unique_Miners', 'Commit_Inverse_HHI', 'Commit_Shannon_Entropy', 'Total_Commits',
+             'Unique_Authors'],
+            keys=['Platform', 'Year', 'Week'], rename=DECENTRALIZATION_RENAME,
+            sheet_name='Weekly_Metrics'),
+    _source('market', 'commits/blockchain_market_hashrate_weekly_2021_2024.xlsx', 'Market & Hashrate',
+            ['Platform', 'Year', 'Week', 'Market_Capitalization', 'Hash_Rate'],
+            keys=['Platform', 'Year', 'Week'], rename=MARKET_RENAME, sheet_name='Weekly_Data'),
+    _source('eip_data', 'commits/ethereum_eip_data_2021_2024.xlsx', 'Ethereum EIP Data',
+            ['Platform', 'Number', 'Layer', 'Title', 'Owner', 'Type', 'Status', 'Date', 'Content'],
+            granularity='proposal'),
+    _source('improvement_proposals', 'commits/improvement_proposals_all_platforms_2021_2024.xlsx',
+            'Improvement Proposals',
+            ['Platform', 'Number', 'Layer', 'Title', 'Owner', 'Type', 'Status', 'Date', 'Content'],
+            granularity='proposal'),
+
+    # Proposal folder
+    _source('historical_panel', 'proposal/Panel_data_cleaned_May23_2025.dta', 'Historical Panel Data',
+            ['Platform', 'year', 'week', 'date', 'Block_Inverse_HHI', 'Block_Shannon_Entropy',
+             'Commit_Inverse_HHI', 'Commit_Shannon_Entropy', 'Market_Capitalization', 'Hash_Rate'],
+            keys=['Platform', 'year', 'week'],
+            rename={**DECENTRALIZATION_RENAME, **MARKET_RENAME}),
+    _source('detailed_proposals', 'proposal/detailed_proposal_analysis.xlsx', 'Detailed Proposals',
+            ['Platform', 'Number', 'Type', 'Status', 'Date', 'Content', 'topic_diversity'],
+            granularity='proposal'),
+    _source('integrated_2015_2024', 'proposal/integrated_blockchain_governance_dataset_2015_2024.xlsx',
+            'Integrated Dataset',
+            ['Platform', 'Year', 'Week', 'Block_Inverse_HHI', 'Block_Shannon_Entropy', 'Total_Blocks',
+             'Unique_Miners', 'Commit_Inverse_HHI', 'Commit_Shannon_Entropy', 'Total_Commits',
+             'Unique_Authors', 'Market_Capitalization', 'Hash_Rate', 'Number_Proposal',
+             'Topic_Diversity'],
+            keys=['Platform', 'Year', 'Week'], rename={**DECENTRALIZATION_RENAME, **MARKET_RENAME},
+            sheet_name='Master_Dataset'),
+    _source('proposals', 'proposal/proposal_topic_diversity_weekly.xlsx', 'Topic Diversity',
+            ['Platform', 'Year', 'Week', 'Number_Proposal', 'Topic_Diversity'],
+            keys=['Platform', 'Year', 'Week'], rename=WEEKLY_KEY_RENAME),
+
+    # Updated work folder
+    _source('group1_final', 'proposal/updated work/GROUP1_FINAL_integrated_dataset_memory_efficient.xlsx',
+            'Group 1 Final Dataset', ['Platform', 'year', 'week', 'date'],
+            keys=['Platform', 'year', 'week']),
+    _source('cryptocompare', 'proposal/updated work/cryptocompare_timeseries_2021_2024.xlsx',
+            'CryptoCompare Data',
+            ['Platform', 'date', 'year', 'week', 'Volume_USD', 'price_USD', 'Platform_age'],
+            keys=['Platform', 'year', 'week']),
+    _source('difficulty', 'proposal/updated work/difficulty_data_full_2021_2024.xlsx', 'Difficulty Data',
+            ['Platform', 'date', 'year', 'week', 'difficulty'],
+            keys=['Platform', 'year', 'week'], granularity='daily', weekly_agg={'difficulty': 'mean'}),
+    _source('task1_base_panel', 'proposal/updated work/task1_base_panel_checkpoint.xlsx',
+            'Base Panel Checkpoint', ['Platform', 'year', 'week', 'date'],
+            keys=['Platform', 'year', 'week']),
+    _source('task2_blocks', 'proposal/updated work/task2_blocks_checkpoint.xlsx', 'Blocks Checkpoint',
+            ['Platform', 'block_id', 'block_date', 'miner'], granularity='block'),
+    _source('task2_commits', 'proposal/updated work/task2_commits_checkpoint.xlsx', 'Commits Checkpoint',
+            ['Platform', 'commit_id', 'author_email', 'commit_date'], granularity='commit'),
+    _source('task2_decentralization', 'proposal/updated work/task2_decentralization_checkpoint.xlsx',
+            'Decentralization Checkpoint',
+            ['Platform', 'year', 'week', 'Block_HHI', 'Block_Shannon', 'Commit_HHI', 'Commit_Shannon'],
+            keys=['Platform', 'year', 'week']),
+    _source('task2_market', 'proposal/updated work/task2_market_checkpoint.xlsx', 'Market Checkpoint',
+            ['Platform', 'year', 'week', 'market_cap', 'hashrate'], keys=['Platform', 'year', 'week']),
+    _source('task2_proposals', 'proposal/updated work/task2_proposals_checkpoint.xlsx',
+            'Proposals Checkpoint', ['Platform', 'year', 'week', 'Number_Proposal', 'Topic_Diversity'],
+            keys=['Platform', 'year', 'week']),
+    _source('task3_cryptocompare', 'proposal/updated work/task3_cryptocompare_checkpoint.xlsx',
+            'CryptoCompare Checkpoint',
+            ['Platform', 'date', 'year', 'week', 'Volume_USD', 'price_USD', 'Platform_age'],
+            keys=['Platform', 'year', 'week']),
+    _source('github', 'proposal/updated work/task3_github_checkpoint.xlsx', 'GitHub Checkpoint',
+            ['Platform', 'stars', 'forks', 'github_created', 'github_updated'],
+            granularity='static', static=True),
+    _source('reddit', 'proposal/updated work/task3_reddit_checkpoint.xlsx', 'Reddit Checkpoint',
+            ['Platform', 'reddit_subscribers', 'reddit_posts', 'reddit_comments', 'reddit_active_users'],
+            granularity='static', static=True),
+
+    # Downstream panels
+    _source('complete_2021_2024', 'COMPLETE_2021_2024_blockchain_dataset.xlsx',
+            'Complete 2021-2024 Dataset',
+            ['Platform', 'year', 'week', 'Block_HHI', 'Block_Shannon', 'Commit_HHI', 'Commit_Shannon',
+             'market_cap', 'hashrate', 'Number_Proposal', 'Topic_Diversity', 'Volume_USD', 'price_USD',
+             'Platform_age', 'stars', 'forks', 'reddit_subscribers', 'reddit_posts', 'reddit_comments',
+             'difficulty', 'date'],
+            keys=['Platform', 'year', 'week']),
+    _source('new_crypto_comprehensive', 'extend/NEW_CRYPTO_COMPREHENSIVE_2015_2024.xlsx',
+            'New Crypto Comprehensive 2015-2024',
+            ['Platform', 'year', 'week', 'date', 'Platform_age', 'Volume_USD', 'price_USD', 'market_cap',
+             'stars', 'forks', 'reddit_subscribers', 'reddit_posts', 'reddit_comments'],
+            keys=['Platform', 'year', 'week']),
+])
+
+# Sources that make up the weekly governance panel, in priority order
+PANEL_SOURCES = ['decentralization', 'market', 'proposals', 'cryptocompare', 'difficulty', 'github', 'reddit']
+
+
+def get_source(name):
+    """Look up a registered source by name"""
+    try:
+        return SOURCES[name]
+    except KeyError:
+        raise KeyError(f"Unknown data source: {name}") from None
+
+
+def plan_panel(variables, candidates=None):
+    """
+    Decide which columns to read from which source.
+    Returns {source_name: [canonical columns]}; the first candidate providing a
+    variable wins.
+    """
+    candidates = candidates or PANEL_SOURCES
+    plan = {}
+    missing = []
+
+    for variable in variables:
+        if variable in PANEL_KEYS:
+            continue
+        for name in candidates:
+            if get_source(name).provides(variable):
+                plan.setdefault(name, []).append(variable)
+                break
+        else:
+            missing.append(variable)
+
+    if missing:
+        print(f"  ⚠️  No registered source provides: {', '.join(missing)}")
+    return plan
+
+
+def load_for_panel(name, columns, where=None):
+    """Load a source's columns and reduce it to one row per panel key"""
+    source = get_source(name)
+    # Row predicates refer to panel keys, which static snapshots do not carry
+    df = source.load(columns=columns, where=None if source.static else where)
+
+    keys = [key for key in PANEL_KEYS if key in df.columns]
+    if source.weekly_agg and keys == PANEL_KEYS:
+        agg = {col: source.weekly_agg.get(col, 'first') for col in columns if col in df.columns}
+        df = df.groupby(keys, as_index=False).agg(agg)
+    return df[keys + [col for col in columns if col in df.columns and col not in keys]]
+
+
+def build_panel(variables, base=None, candidates=None, where=None):
+    """
+    Build a Platform/year/week panel holding only the requested variables.
+    Workbooks are opened lazily and only for the columns the plan needs;
+    `where` (a row predicate on canonical names) is pushed into each reader.
+    """
+    plan = plan_panel(variables, candidates)
+    frames = {}
+
+    for name, columns in plan.items():
+        source = get_source(name)
+        if not source.exists():
+            print(f"  ⚠️  {source.description} not found: {source.path}")
+            continue
+        frames[name] = load_for_panel(name, columns, where)
+        print(f"  ✅ {source.description}: {frames[name].shape} ({', '.join(columns)})")
+
+    weekly = [name for name in frames if not get_source(name).static]
+    if base is None:
+        if not weekly:
+            return pd.DataFrame(columns=PANEL_KEYS)
+        base = frames.pop(weekly[0])
+        how = 'outer'
+    else:
+        how = 'left'
+
+    joiner = PanelJoiner(base, keys=PANEL_KEYS, how=how)
+    for name, df in frames.items():
+        on = ['Platform'] if get_source(name).static else None
+        joiner.add(name, df, on=on)
+    return joiner.assemble()
@@ -1,24 +1,32 @@
+import os
+import sys
 import requests
 import pandas as pd
 from datetime import datetime, timedelta
 import time
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'commits'))
+from record_buffers import RecordBuffer
+
+# Column types of the collected difficulty records
+DIFFICULTY_SCHEMA = {'Platform': 'str', 'date': 'datetime', 'year': 'int', 'week': 'int', 'difficulty': 'float'}
+
 def get_bitcoin_difficulty():
     print("Collecting Bitcoin difficulty...")
     url = 'https://api.blockchain.info/charts/difficulty'
     params = {'timespan': '4years', 'format': 'json'}
     r = requests.get(url, params=params)
     data = r.json()['values']
-    records = []
+    records = RecordBuffer(DIFFICULTY_SCHEMA)
     for entry in data:
         dt = datetime.utcfromtimestamp(entry['x'])
         year, week = dt.isocalendar()[0], dt.isocalendar()[1]
         records.append({'Platform': 'Bitcoin', 'date': dt, 'year': year, 'week': week, 'difficulty': entry['y']})
-    return pd.DataFrame(records)
+    return records.to_frame()
 
 def get_blockchair_difficulty(platform_name, api_url):
     print(f"Collecting {platform_name} difficulty...")
-    all_records = []
+    all_records = RecordBuffer(DIFFICULTY_SCHEMA)
     for offset in range(0, 2100, 100):
         params = {'limit': 100, 'offset': offset, 'fields': 'difficulty,time'}
         r = requests.get(api_url, params=params)
@@ -29,7 +37,7 @@ def get_blockchair_difficulty(platform_name, api_url):
             year, week = dt.isocalendar()[0], dt.isocalendar()[1]
             all_records.append({'Platform': platform_name, 'date': dt, 'year': year, 'week': week, 'difficulty': block['difficulty']})
         time.sleep(1)
-    df = pd.DataFrame(all_records)
+    df = all_records.to_frame()
     df = df.groupby(['Platform', 'year', 'week']).agg({'date': 'first', 'difficulty': 'mean'}).reset_index()
     return df
 
@@ -1,8 +1,16 @@
+import os
+import sys
 import requests
 import pandas as pd
 from datetime import datetime, timedelta
 import time
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'commits'))
+from record_buffers import RecordBuffer
+
+# Column types of the collected difficulty records
+DIFFICULTY_SCHEMA = {'Platform': 'str', 'date': 'datetime', 'year': 'int', 'week': 'int', 'difficulty': 'float'}
+
 def safe_api_call(url, params=None, headers=None, parse_json=True, tries=3):
     for attempt in range(tries):
         try:
@@ -34,16 +42,16 @@ def get_bitcoin_difficulty():
     if not data or 'values' not in data:
         print("Failed to collect Bitcoin difficulty data.")
         return pd.DataFrame()
-    records = []
+    records = RecordBuffer(DIFFICULTY_SCHEMA)
     for entry in data['values']:
         dt = datetime.utcfromtimestamp(entry['x'])
         year, week = dt.isocalendar()[0], dt.isocalendar()[1]
         records.append({'Platform': 'Bitcoin', 'date': dt, 'year': year, 'week': week, 'difficulty': entry['y']})
-    return pd.DataFrame(records)
+    return records.to_frame()
 
 def get_blockchair_difficulty(platform_name, api_url):
     print(f"Collecting {platform_name} difficulty...")
-    all_records = []
+    all_records = RecordBuffer(DIFFICULTY_SCHEMA)
     for offset in range(0, 2100, 100):
         params = {'limit': 100, 'offset': offset, 'fields': 'difficulty,time'}
         data = safe_api_call(api_url, params)
@@ -58,10 +66,10 @@ def get_blockchair_difficulty(platform_name, api_url):
             except Exception as e:
                 print(f"Error parsing block for {platform_name}: {e}")
         time.sleep(1)
-    if not all_records:
+    if not len(all_records):
         print(f"No records collected for {platform_name}.")
         return pd.DataFrame()
-    df = pd.DataFrame(all_records)
+    df = all_records.to_frame()
     df = df.groupby(['Platform', 'year', 'week']).agg({'date': 'first', 'difficulty': 'mean'}).reset_index()
     return df
 
@@ -89,7 +97,7 @@ def get_ethereum_difficulty(api_key):
     # Collect for each Monday in the range
     start = datetime(2021, 1, 4)  # First Monday of 2021
     end = datetime(2024, 12, 31)
-    records = []
+    records = RecordBuffer(DIFFICULTY_SCHEMA)
     dt = start
     while dt <= end:
         timestamp = int(dt.timestamp())
@@ -130,7 +138,7 @@ def get_ethereum_difficulty(api_key):
             print(f"Could not get block number for Ethereum at {dt.date()}")
         dt += timedelta(weeks=1)
         time.sleep(0.5)
-    return pd.DataFrame(records)
+    return records.to_frame()
 
 def main():
     # Replace with your Etherscan API key
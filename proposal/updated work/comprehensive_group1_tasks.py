@@ -4,16 +4,44 @@ import requests
 import time
 from datetime import datetime, timedelta
 import os
+import sys
 import json
 import gc
 import traceback
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'commits'))
+from panel_join import PanelJoiner
+from source_registry import get_source
+from panel_dtypes import memory_mb
+from weekly_reduce import reduce_source
+from checkpoint_store import CheckpointStore, file_digest, fingerprint
+from instrumentation import span, start_trace, traced
+from http_cassette import cassette_from_argv
+
+# Registered datasets refreshed by Task 2 (raw blocks/commits are streamed in Task 4)
+TASK2_DATASETS = ['proposals', 'market', 'decentralization', 'blocks', 'commits']
+# Task 3 is only checkpointed once every API returned data
+TASK3_APIS = ('cryptocompare', 'github', 'reddit')
+
 class ComprehensiveGroup1TasksHandler:
-    def __init__(self):
+    def __init__(self, resume=True, interactive=False):
         self.base_dir = os.getcwd()
         self.results = {}
         self.errors = []
         
+        # Binary checkpoints; on resume, tasks whose inputs are unchanged are restored
+        self.resume = resume
+        self.interactive = interactive
+        self.store = CheckpointStore(os.path.join(self.base_dir, 'group1_checkpoints'))
+        
+        # Date range for historical API data
+        self.start_date = datetime(2021, 1, 1)
+        self.end_date = datetime(2024, 12, 31)
+        
+        # Rows per chunk when streaming raw block/commit files in Task 4
+        self.raw_chunk_rows = 100000
+        
         # API configurations from your successful tests
         self.cryptocompare_base = "https://min-api.cryptocompare.com/data"
         self.github_base = "https://api.github.com"
@@ -66,6 +94,10 @@ class ComprehensiveGroup1TasksHandler:
             'timestamp': datetime.now().isoformat()
         })
         
+        if not self.interactive or not sys.stdin.isatty():
+            print("\n🛑 Stopping. Fix the issue and re-run; completed tasks resume from checkpoints")
+            return False
+        
         print("\n⏸️  PROCESS PAUSED - Please review the error above")
         print("Options:")
         print("  1. Fix the issue and restart")
@@ -84,6 +116,86 @@ class ComprehensiveGroup1TasksHandler:
             print("Aborting process...")
             return False
     
+    def _task_inputs(self, task):
+        """Fingerprint of everything a task reads; unchanged inputs allow resume"""
+        if task == 'task1':
+            inputs = {'panel': file_digest(get_source('historical_panel').abspath)}
+        elif task == 'task2':
+            inputs = {name: file_digest(get_source(name).abspath) for name in TASK2_DATASETS
+                      if get_source(name).granularity not in ('block', 'commit')}
+            inputs['rename'] = 'keys'  # checkpoints from before had renamed metric columns
+        elif task == 'task3':
+            # API responses are not reproducible; re-collect only when the request changes
+            inputs = {
+                'start': self.start_date,
+                'end': self.end_date,
+                'platforms': self.platform_mapping,
+                'release_dates': self.release_dates
+            }
+        else:
+            inputs = {
+                'upstream': {t: self.store.frame_hashes(t) for t in ('task1', 'task2', 'task3')},
+                'raw': {name: file_digest(get_source(name).abspath) for name in ('blocks', 'commits')},
+                'chunk_rows': self.raw_chunk_rows
+            }
+        return fingerprint(inputs)
+    
+    def _set_task1_result(self, df_panel):
+        self.results['task1'] = {
+            'status': 'success',
+            'data': df_panel,
+            'checkpoint': self.store.manifest['task1']['frames']['base_panel']['file'],
+            'shape': df_panel.shape,
+            'columns': len(df_panel.columns)
+        }
+    
+    def _set_task2_result(self, datasets):
+        self.results['task2'] = {
+            'status': 'success',
+            'datasets': datasets,
+            'count': len(datasets)
+        }
+    
+    def _set_task3_result(self, api_results):
+        self.results['task3'] = {
+            'status': 'success',
+            'api_results': api_results,
+            'apis_successful': len(api_results)
+        }
+    
+    def _set_task4_result(self, df_integrated):
+        self.results['task4'] = {
+            'status': 'success',
+            'final_dataset': df_integrated,
+            'output_path': 'GROUP1_FINAL_enhanced_dataset_with_missing_vars.xlsx',
+            'final_shape': df_integrated.shape
+        }
+    
+    def resume_task(self, task):
+        """Restore a task from its checkpoint when its inputs are unchanged"""
+        if not self.resume or not self.store.is_fresh(task, self._task_inputs(task)):
+            return False
+        
+        try:
+            frames = self.store.load(task)
+        except (KeyError, ValueError, OSError) as e:
+            print(f"⚠️  Checkpoint for {task} unusable, re-running: {e}")
+            return False
+        
+        if task == 'task1':
+            self._set_task1_result(frames['base_panel'])
+        elif task == 'task2':
+            self._set_task2_result(frames)
+        elif task == 'task3':
+            missing = [api for api in TASK3_APIS if api not in frames or frames[api].empty]
+            if missing:
+                print(f"⚠️  Checkpoint for task3 lacks {', '.join(missing)}, re-collecting")
+                return False
+            self._set_task3_result(frames)
+        else:
+            self._set_task4_result(frames['final_dataset'])
+        return True
+    
     def task_1_load_base_panel_data(self):
         """TASK 1: Load base panel data and preserve all original variables"""
         print("\n" + "="*80)
@@ -91,56 +203,33 @@ class ComprehensiveGroup1TasksHandler:
         print("="*80)
         
         try:
-            # Navigate to proposal directory
-            panel_path = '../Panel_data_cleaned_May23_2025.dta'
+            inputs = self._task_inputs('task1')
+            source = get_source('historical_panel')
             
-            if not os.path.exists(panel_path):
-                error_msg = f"Base panel file not found: {panel_path}"
+            if not source.exists():
+                error_msg = f"Base panel file not found: {source.path}"
                 return self.pause_on_error("Task 1", error_msg)
             
-            print(f"📁 Loading base panel from: {panel_path}")
-            df_panel = pd.read_stata(panel_path)
+            # Original names and platforms are preserved; compact dtypes are
+            # assigned chunk by chunk while reading (savings reported by the loader)
+            print(f"📁 Loading base panel from: {source.path}")
+            with span('historical_panel', kind='parse') as s:
+                df_panel = source.load(rename=False, standardize_platforms=False, compact=True)
+                s.rows(out=df_panel)
             
             print(f"✅ Base panel loaded successfully!")
             print(f"   📊 Shape: {df_panel.shape}")
             print(f"   📊 Columns: {len(df_panel.columns)}")
-            print(f"   📊 Memory usage: {df_panel.memory_usage(deep=True).sum() / 1024**2:.1f} MB")
+            print(f"   📊 Memory usage: {memory_mb(df_panel):.1f} MB")
             
             # Display column info
             print(f"   📊 Date range: {df_panel['date'].min()} to {df_panel['date'].max()}")
             print(f"   📊 Platforms: {df_panel['Platform'].unique()}")
             
-            # Memory optimization
-            print("🔧 Optimizing memory usage...")
-            original_memory = df_panel.memory_usage(deep=True).sum()
-            
-            for col in df_panel.columns:
-                if df_panel[col].dtype == 'object':
-                    try:
-                        df_panel[col] = df_panel[col].astype('category')
-                    except:
-                        pass
-                elif df_panel[col].dtype == 'float64':
-                    df_panel[col] = df_panel[col].astype('float32')
-                elif df_panel[col].dtype == 'int64':
-                    df_panel[col] = df_panel[col].astype('int32')
-            
-            optimized_memory = df_panel.memory_usage(deep=True).sum()
-            memory_saved = (original_memory - optimized_memory) / 1024**2
-            print(f"   💾 Memory saved: {memory_saved:.1f} MB")
-            
             # Save checkpoint
-            checkpoint_path = 'task1_base_panel_checkpoint.xlsx'
-            df_panel.to_excel(checkpoint_path, index=False)
-            print(f"💾 Checkpoint saved: {checkpoint_path}")
-            
-            self.results['task1'] = {
-                'status': 'success',
-                'data': df_panel,
-                'checkpoint': checkpoint_path,
-                'shape': df_panel.shape,
-                'columns': len(df_panel.columns)
-            }
+            with span('checkpoint_task1', kind='write'):
+                self.store.save('task1', {'base_panel': df_panel}, inputs)
+            self._set_task1_result(df_panel)
             
             return True
             
@@ -155,69 +244,55 @@ class ComprehensiveGroup1TasksHandler:
         print("="*80)
         
         try:
-            # Define dataset paths based on your file structure
-            dataset_paths = {
-                'proposals': '../proposal_topic_diversity_weekly.xlsx',
-                'market': '../../commits/blockchain_market_hashrate_weekly_2021_2024.xlsx',
-                'decentralization': '../../commits/blockchain_decentralization_metrics_weekly_2021_2024_fixed.xlsx',
-                'blocks': '../../commits/blockchain_block_data_real_2021_2024.xlsx',
-                'commits': '../../commits/blockchain_commit_data_all_2021_2024.xlsx'
-            }
+            inputs = self._task_inputs('task2')
             
+            # Datasets to process, resolved through the source registry
             datasets = {}
             
-            for name, path in dataset_paths.items():
+            for name in TASK2_DATASETS:
+                source = get_source(name)
                 print(f"\n📁 Processing {name} dataset...")
                 
-                if not os.path.exists(path):
-                    print(f"   ⚠️  File not found: {path}")
+                if not source.exists():
+                    print(f"   ⚠️  File not found: {source.path}")
+                    continue
+                
+                # Raw block/commit rows are never loaded whole; task 4 streams them
+                if source.granularity in ('block', 'commit'):
+                    print(f"   ⏭️  Raw {source.granularity}-level data, reduced out of core in Task 4")
                     continue
                 
                 try:
-                    df = pd.read_excel(path)
+                    # Only Year/Week are renamed (to year/week) so dates and task 4 keys
+                    # line up; metric columns keep the names of the source files
+                    with span(name, kind='parse') as s:
+                        df = source.load(rename='keys', compact=True)
+                        s.rows(out=df)
                     print(f"   ✅ Loaded: {df.shape}")
                     
-                    # Memory optimization for large datasets
-                    if len(df) > 10000:  # Only for large datasets
-                        print(f"   🔧 Optimizing memory for large dataset...")
-                        for col in df.columns:
-                            if df[col].dtype == 'float64':
-                                df[col] = df[col].astype('float32')
-                            elif df[col].dtype == 'int64':
-                                df[col] = df[col].astype('int32')
-                    
                     # Add date variable if missing
                     if 'date' not in df.columns and 'year' in df.columns and 'week' in df.columns:
                         print(f"   🔧 Adding date variable...")
-                        df['date'] = df.apply(self._year_week_to_date, axis=1)
+                        with span('add_date', kind='aggregate', rows_in=df, dataset=name):
+                            df['date'] = df.apply(self._year_week_to_date, axis=1)
                         print(f"   ✅ Date variable added")
                     else:
                         print(f"   ✅ Date variable already exists")
                     
-                    # Save checkpoint
-                    checkpoint_path = f'task2_{name}_checkpoint.xlsx'
-                    df.to_excel(checkpoint_path, index=False)
-                    print(f"   💾 Checkpoint saved: {checkpoint_path}")
-                    
-                    datasets[name] = {
-                        'data': df,
-                        'checkpoint': checkpoint_path,
-                        'shape': df.shape
-                    }
+                    datasets[name] = df
                     
                 except Exception as e:
                     print(f"   ❌ Error processing {name}: {str(e)}")
                     continue
             
+            # Save checkpoint
+            with span('checkpoint_task2', kind='write'):
+                self.store.save('task2', datasets, inputs)
+            self._set_task2_result(datasets)
+            
             print(f"\n✅ TASK 2 COMPLETED!")
             print(f"   📊 Successfully processed: {len(datasets)} datasets")
             
-            self.results['task2'] = {
-                'status': 'success',
-                'datasets': datasets,
-                'count': len(datasets)
-            }
-            
             return True
             
         except Exception as e:
@@ -244,9 +319,11 @@ class ComprehensiveGroup1TasksHandler:
         print("🔗 Using: CryptoCompare + GitHub + Reddit APIs")
         
         try:
-            # Define date range for historical data
-            start_date = datetime(2021, 1, 1)
-            end_date = datetime(2024, 12, 31)
+            inputs = self._task_inputs('task3')
+            
+            # Date range for historical data
+            start_date = self.start_date
+            end_date = self.end_date
             
             print(f"📅 Date range: {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}")
             
@@ -280,20 +357,26 @@ class ComprehensiveGroup1TasksHandler:
             else:
                 print(f"   ❌ Reddit: Failed")
             
-            # Save individual API results
+            # Save checkpoint only when every API delivered, so a failed or
+            # rate-limited run is re-collected next time instead of resumed.
+            # The small API tables are also exported to Excel because the
+            # 2021-2024 integrator reads them from there
+            missing = [api for api in TASK3_APIS if api not in api_results or api_results[api].empty]
+            if missing:
+                self.store.invalidate('task3')
+                print(f"⚠️  No task3 checkpoint: {', '.join(missing)} returned no data (re-collected on next run)")
+            else:
+                with span('checkpoint_task3', kind='write'):
+                    self.store.save('task3', api_results, inputs)
             for api_name, data in api_results.items():
                 checkpoint_path = f'task3_{api_name}_checkpoint.xlsx'
-                data.to_excel(checkpoint_path, index=False)
+                with span('export_excel', kind='write', rows_in=data, path=checkpoint_path):
+                    data.to_excel(checkpoint_path, index=False)
                 print(f"💾 Saved: {checkpoint_path}")
+            self._set_task3_result(api_results)
             
             print(f"\n✅ TASK 3 COMPLETED!")
-            print(f"   📊 APIs successful: {len(api_results)}/3")
-            
-            self.results['task3'] = {
-                'status': 'success',
-                'api_results': api_results,
-                'apis_successful': len(api_results)
-            }
+            print(f"   📊 APIs successful: {len(api_results)}/{len(TASK3_APIS)}")
             
             return True
             
@@ -301,6 +384,7 @@ class ComprehensiveGroup1TasksHandler:
             error_msg = f"Failed to collect missing variables"
             return self.pause_on_error("Task 3", error_msg, e)
     
+    @traced('fetch', name='cryptocompare')
     def _collect_cryptocompare_data(self, start_date, end_date):
         """Collect market data from CryptoCompare"""
         try:
@@ -357,6 +441,7 @@ class ComprehensiveGroup1TasksHandler:
             print(f"     ❌ CryptoCompare collection failed: {str(e)}")
             return None
     
+    @traced('fetch', name='github')
     def _collect_github_data(self):
         """Collect GitHub stars and forks data"""
         try:
@@ -398,6 +483,7 @@ class ComprehensiveGroup1TasksHandler:
             print(f"     ❌ GitHub collection failed: {str(e)}")
             return None
     
+    @traced('fetch', name='reddit')
     def _collect_reddit_data(self):
         """Collect Reddit subscriber and activity data"""
         try:
@@ -468,6 +554,8 @@ class ComprehensiveGroup1TasksHandler:
         print("="*80)
         
         try:
+            inputs = self._task_inputs('task4')
+            
             # Load base panel data
             if 'task1' not in self.results or self.results['task1']['status'] != 'success':
                 error_msg = "Base panel data not available from Task 1"
@@ -484,64 +572,55 @@ class ComprehensiveGroup1TasksHandler:
             
             merge_keys = ['Platform', 'year', 'week']
             
-            # Merge existing datasets from Task 2
+            # Register every source on one keyed joiner; the panel is assembled
+            # in a single pass instead of copying it once per merge
+            joiner = PanelJoiner(df_integrated, keys=merge_keys, how='left')
+            
+            # Existing datasets from Task 2
             if 'task2' in self.results and self.results['task2']['status'] == 'success':
                 datasets = self.results['task2']['datasets']
                 
-                for name, dataset_info in datasets.items():
-                    if name in ['blocks', 'commits']:  # Skip large datasets to avoid memory issues
-                        print(f"⚠️  Skipping {name} (too large for memory)")
-                        continue
-                    
-                    print(f"🔗 Merging {name} dataset...")
-                    df = dataset_info['data']
-                    
-                    common_keys = [key for key in merge_keys if key in df.columns and key in df_integrated.columns]
-                    
-                    if common_keys:
-                        df_integrated = pd.merge(
-                            df_integrated, df, on=common_keys, how='left', suffixes=('', f'_{name}')
-                        )
-                        print(f"   ✅ After {name}: {df_integrated.shape}")
-                        
-                        # Force garbage collection
-                        del df
-                        gc.collect()
-                    else:
-                        print(f"   ⚠️  No common merge keys for {name}")
-            
-            # Merge API data from Task 3
+                for name, df_dataset in datasets.items():
+                    print(f"🔗 Registering {name} dataset...")
+                    joiner.add(name, df_dataset)
+            
+            # Raw blocks and commits are streamed in chunks and reduced to
+            # weekly counts, sums and distinct-participant estimates
+            for name in ['blocks', 'commits']:
+                print(f"🔗 Reducing {name} to weekly aggregates (out of core)...")
+                with span(f'reduce_{name}', kind='aggregate') as s:
+                    weekly = reduce_source(name, chunksize=self.raw_chunk_rows)
+                    if weekly is not None:
+                        s.rows(out=weekly)
+                if weekly is not None:
+                    joiner.add(name, weekly)
+            
+            # API data from Task 3
             if 'task3' in self.results and self.results['task3']['status'] == 'success':
                 api_results = self.results['task3']['api_results']
                 
                 for api_name, df_api in api_results.items():
-                    print(f"🔗 Merging {api_name} data...")
-                    
-                    common_keys = [key for key in merge_keys if key in df_api.columns and key in df_integrated.columns]
-                    
-                    if common_keys:
-                        df_integrated = pd.merge(
-                            df_integrated, df_api, on=common_keys, how='left', suffixes=('', f'_{api_name}')
-                        )
-                        print(f"   ✅ After {api_name}: {df_integrated.shape}")
-                    else:
-                        print(f"   ⚠️  No common merge keys for {api_name}")
+                    print(f"🔗 Registering {api_name} data...")
+                    joiner.add(api_name, df_api)
+            
+            with span('assemble_panel', kind='merge', sources=len(joiner.sources)) as s:
+                df_integrated = joiner.assemble()
+                s.rows(out=df_integrated)
+            print(f"   ✅ After keyed integration: {df_integrated.shape}")
+            gc.collect()
             
             # Save final integrated dataset
             final_output_path = 'GROUP1_FINAL_enhanced_dataset_with_missing_vars.xlsx'
-            df_integrated.to_excel(final_output_path, index=False)
+            with span('final_excel', kind='write', rows_in=df_integrated, path=final_output_path):
+                df_integrated.to_excel(final_output_path, index=False)
             print(f"💾 Final dataset saved: {final_output_path}")
+            with span('checkpoint_task4', kind='write'):
+                self.store.save('task4', {'final_dataset': df_integrated}, inputs)
+            self._set_task4_result(df_integrated)
             
             # Generate summary report
             self._generate_final_summary(df_integrated)
             
-            self.results['task4'] = {
-                'status': 'success',
-                'final_dataset': df_integrated,
-                'output_path': final_output_path,
-                'final_shape': df_integrated.shape
-            }
-            
             return True
             
         except Exception as e:
@@ -579,7 +658,7 @@ class ComprehensiveGroup1TasksHandler:
         
         print(f"\n⚠️  LIMITATIONS:")
         print(f"   - Alexa_ranking: Not collected (no free API available)")
-        print(f"   - Large datasets (blocks, commits): Excluded to prevent memory issues")
+        print(f"   - Large datasets (blocks, commits): Included as weekly aggregates; distinct miners/authors are HyperLogLog estimates")
         
         print(f"\n🎯 PROFESSOR COMMUNICATION:")
         print(f"   ✅ 9/10 variables collected successfully (90% success rate)")
@@ -593,21 +672,33 @@ class ComprehensiveGroup1TasksHandler:
         print("="*80)
         
         start_time = datetime.now()
+        tracer = start_trace('group1')
         
         # Execute tasks in sequence
         tasks = [
-            ("Task 1: Load Base Panel Data", self.task_1_load_base_panel_data),
-            ("Task 2: Add Date Variables", self.task_2_add_date_variables),
-            ("Task 3: Collect Missing Variables", self.task_3_collect_missing_variables),
-            ("Task 4: Final Integration", self.task_4_final_integration)
+            ('task1', "Task 1: Load Base Panel Data", self.task_1_load_base_panel_data),
+            ('task2', "Task 2: Add Date Variables", self.task_2_add_date_variables),
+            ('task3', "Task 3: Collect Missing Variables", self.task_3_collect_missing_variables),
+            ('task4', "Task 4: Final Integration", self.task_4_final_integration)
         ]
         
         completed_tasks = 0
         
-        for task_name, task_function in tasks:
+        for task_key, task_name, task_function in tasks:
+            # Loading a reusable checkpoint is its own span
+            with span(f'resume_{task_key}', kind='parse') as s:
+                resumed = self.resume_task(task_key)
+                s.set(resumed=bool(resumed))
+            if resumed:
+                completed_tasks += 1
+                print(f"\n⏭️  Resumed from checkpoint (inputs unchanged): {task_name}")
+                continue
+            
             print(f"\n🔄 Starting: {task_name}")
             
-            success = task_function()
+            with span(task_key, kind='task', title=task_name) as s:
+                success = task_function()
+                s.set(success=bool(success))
             
             if success:
                 completed_tasks += 1
@@ -626,6 +717,8 @@ class ComprehensiveGroup1TasksHandler:
         print("="*80)
         print(f"⏱️  Execution time: {execution_time}")
         print(f"✅ Completed tasks: {completed_tasks}/{len(tasks)}")
+        tracer.print_summary()
+        tracer.save('group1_trace.json')
         
         if completed_tasks == len(tasks):
             print(f"🎉 ALL GROUP 1 TASKS COMPLETED SUCCESSFULLY!")
@@ -641,6 +734,7 @@ class ComprehensiveGroup1TasksHandler:
             'execution_time': str(execution_time),
             'completed_tasks': completed_tasks,
             'total_tasks': len(tasks),
+            'trace': 'group1_trace.json',
             'results': self.results,
             'errors': self.errors
         }
@@ -652,5 +746,12 @@ class ComprehensiveGroup1TasksHandler:
 
 # Execute the comprehensive Group 1 tasks
 if __name__ == "__main__":
-    handler = ComprehensiveGroup1TasksHandler()
-    handler.run_all_group1_tasks()
+    # --fresh ignores existing checkpoints; --interactive prompts on errors;
+    # --cassette [PATH] records API responses (or replays them offline with
+    # --cassette-mode replay)
+    handler = ComprehensiveGroup1TasksHandler(
+        resume='--fresh' not in sys.argv,
+        interactive='--interactive' in sys.argv
+    )
+    with cassette_from_argv('group1_http_cassette.zip'):
+        handler.run_all_group1_tasks()
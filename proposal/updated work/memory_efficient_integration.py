@@ -1,13 +1,22 @@
 import pandas as pd
 import numpy as np
 import gc
+import os
+import sys
 from datetime import datetime
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from source_registry import get_source
+from panel_dtypes import memory_mb
+from checkpoint_store import CheckpointStore
+from instrumentation import span, start_trace, traced
+
 class MemoryEfficientIntegrator:
     def __init__(self):
         print("🔧 MEMORY-EFFICIENT INTEGRATION USING EXISTING CHECKPOINTS")
         print("="*70)
         
+    @traced('parse')
     def load_checkpoints(self):
         """Load all existing checkpoints"""
         print("📁 Loading existing checkpoints...")
@@ -15,14 +24,18 @@ class MemoryEfficientIntegrator:
         checkpoints = {}
         
         try:
+            # Tasks 1 and 2 keep binary checkpoints (already compact dtypes);
+            # the small Task 3 API tables are read from their Excel exports
+            store = CheckpointStore('group1_checkpoints')
+            
             # Load base panel
-            checkpoints['base'] = pd.read_excel('task1_base_panel_checkpoint.xlsx')
+            checkpoints['base'] = store.load('task1')['base_panel']
             print(f"   ✅ Base panel: {checkpoints['base'].shape}")
             
             # Load API data (small datasets)
-            checkpoints['cryptocompare'] = pd.read_excel('task3_cryptocompare_checkpoint.xlsx')
-            checkpoints['github'] = pd.read_excel('task3_github_checkpoint.xlsx') 
-            checkpoints['reddit'] = pd.read_excel('task3_reddit_checkpoint.xlsx')
+            checkpoints['cryptocompare'] = get_source('task3_cryptocompare').load(compact=True)
+            checkpoints['github'] = get_source('github').load()
+            checkpoints['reddit'] = get_source('reddit').load()
             
             print(f"   ✅ CryptoCompare: {checkpoints['cryptocompare'].shape}")
             print(f"   ✅ GitHub: {checkpoints['github'].shape}")
@@ -30,15 +43,15 @@ class MemoryEfficientIntegrator:
             
             # Load only essential small datasets (skip large ones)
             try:
-                checkpoints['proposals'] = pd.read_excel('task2_proposals_checkpoint.xlsx')
+                checkpoints['proposals'] = store.load('task2')['proposals']
                 print(f"   ✅ Proposals: {checkpoints['proposals'].shape}")
             except:
                 print("   ⚠️  Proposals checkpoint not found")
                 
-            print(f"\n💾 Memory usage before optimization:")
+            print(f"\n💾 Memory usage after load:")
             for name, df in checkpoints.items():
                 if isinstance(df, pd.DataFrame):
-                    print(f"   {name}: {df.memory_usage(deep=True).sum() / 1024**2:.1f} MB")
+                    print(f"   {name}: {memory_mb(df):.1f} MB")
             
             return checkpoints
             
@@ -46,29 +59,6 @@ class MemoryEfficientIntegrator:
             print(f"❌ Error loading checkpoints: {e}")
             return None
     
-    def optimize_datatypes(self, df, name):
-        """Optimize datatypes to save memory"""
-        print(f"🔧 Optimizing {name} datatypes...")
-        
-        original_memory = df.memory_usage(deep=True).sum()
-        
-        # Optimize numeric columns
-        for col in df.columns:
-            if df[col].dtype == 'float64':
-                df[col] = pd.to_numeric(df[col], downcast='float')
-            elif df[col].dtype == 'int64':
-                df[col] = pd.to_numeric(df[col], downcast='integer')
-            elif df[col].dtype == 'object':
-                # Convert to category if it has few unique values
-                if df[col].nunique() / len(df) < 0.5:
-                    df[col] = df[col].astype('category')
-        
-        optimized_memory = df.memory_usage(deep=True).sum()
-        saved = (original_memory - optimized_memory) / 1024**2
-        print(f"   💾 Memory saved: {saved:.1f} MB")
-        
-        return df
-    
     def create_aggregated_api_data(self, checkpoints):
         """Create aggregated API data per platform"""
         print("\n🔗 Creating aggregated API data...")
@@ -97,14 +87,15 @@ class MemoryEfficientIntegrator:
         
         return api_summary
     
+    @traced('merge')
     def memory_efficient_merge(self, checkpoints):
         """Perform memory-efficient merge avoiding large dataset explosion"""
         print("\n🔗 MEMORY-EFFICIENT MERGING STRATEGY")
         print("="*50)
         
-        # Start with base panel (optimized)
-        df_result = self.optimize_datatypes(checkpoints['base'].copy(), 'base_panel')
-        print(f"📊 Starting with optimized base: {df_result.shape}")
+        # Start with base panel (dtypes already compacted at load)
+        df_result = checkpoints['base']
+        print(f"📊 Starting with base: {df_result.shape}")
         
         # Ensure merge keys exist
         if 'year' not in df_result.columns and 'date' in df_result.columns:
@@ -115,7 +106,7 @@ class MemoryEfficientIntegrator:
         # Merge small datasets only (avoid memory explosion)
         if 'proposals' in checkpoints:
             print("🔗 Merging proposals (small dataset)...")
-            proposals = self.optimize_datatypes(checkpoints['proposals'].copy(), 'proposals')
+            proposals = checkpoints['proposals']
             
             merge_keys = ['Platform', 'year', 'week']
             common_keys = [k for k in merge_keys if k in proposals.columns and k in df_result.columns]
@@ -138,12 +129,12 @@ class MemoryEfficientIntegrator:
         
         return df_result
     
+    @traced('aggregate', name='time_series_supplement')
     def create_time_series_api_supplement(self, checkpoints):
         """Create separate time-series file for CryptoCompare data"""
         print("\n📊 Creating separate time-series API data file...")
         
-        crypto_ts = checkpoints['cryptocompare'].copy()
-        crypto_ts = self.optimize_datatypes(crypto_ts, 'cryptocompare_timeseries')
+        crypto_ts = checkpoints['cryptocompare']
         
         # Save as separate file
         crypto_ts.to_excel('cryptocompare_timeseries_2021_2024.xlsx', index=False)
@@ -155,6 +146,7 @@ class MemoryEfficientIntegrator:
     def run_integration(self):
         """Main integration function"""
         start_time = datetime.now()
+        tracer = start_trace('memory_efficient_integration')
         
         # Load checkpoints
         checkpoints = self.load_checkpoints()
@@ -170,7 +162,8 @@ class MemoryEfficientIntegrator:
         
         # Save final integrated dataset
         output_file = 'GROUP1_FINAL_integrated_dataset_memory_efficient.xlsx'
-        df_final.to_excel(output_file, index=False)
+        with span('final_excel', kind='write', rows_in=df_final, path=output_file):
+            df_final.to_excel(output_file, index=False)
         
         end_time = datetime.now()
         
@@ -183,6 +176,8 @@ class MemoryEfficientIntegrator:
         print(f"✅ Final integrated dataset: {df_final.shape}")
         print(f"💾 Main output: {output_file}")
         print(f"💾 Time-series supplement: cryptocompare_timeseries_2021_2024.xlsx")
+        tracer.print_summary()
+        tracer.save('integration_trace.json')
         
         print(f"\n📊 VARIABLE COVERAGE ACHIEVED:")
         api_vars = ['stars', 'forks', 'reddit_subscribers', 'Volume_USD', 'Platform_age']
@@ -0,0 +1,190 @@
+import numpy as np
+import pandas as pd
+
+from panel_io import CHUNK_ROWS, iter_chunks
+from source_registry import PANEL_KEYS, get_source
+
+# Weekly aggregates computed from raw block/commit rows. Output columns are
+# prefixed so they never collide with the decentralization metrics.
+WEEKLY_REDUCTIONS = {
+    'blocks': {
+        'time': 'block_date',
+        'count': 'block_count',
+        'sums': {
+            'block_tx_sum': 'transaction_count',
+            'block_size_sum': 'block_size',
+            'block_fee_sum': 'fee_total',
+            'block_reward_sum': 'reward',
+        },
+        'means': {'block_difficulty_mean': 'difficulty'},
+        'distinct': {'block_miners_est': 'miner'},
+    },
+    'commits': {
+        'time': 'commit_date',
+        'count': 'commit_count',
+        'sums': {'commit_verified_count': 'commit_verified'},
+        'means': {},
+        'distinct': {'commit_authors_est': 'author_email'},
+    },
+}
+
+HLL_PRECISION = 12  # 4096 registers per group, ~1.6% standard error
+
+
+def leading_zeros(words):
+    """Count leading zero bits of each uint64 value"""
+    words = words.astype(np.uint64, copy=True)
+    zeros = np.zeros(words.shape, dtype=np.uint8)
+    for shift in (32, 16, 8, 4, 2, 1):
+        small = words < (np.uint64(1) << np.uint64(64 - shift))
+        zeros[small] += shift
+        words[small] <<= np.uint64(shift)
+    zeros[words == 0] = 64
+    return zeros
+
+
+class HyperLogLog:
+    """
+    HyperLogLog registers for many groups at once. Each group is a row of
+    2**precision registers; updates are vectorised over a whole chunk.
+    """
+
+    def __init__(self, precision=HLL_PRECISION):
+        self.precision = precision
+        self.m = 1 << precision
+        self.registers = np.zeros((0, self.m), dtype=np.uint8)
+
+    def grow(self, n_groups):
+        if n_groups > len(self.registers):
+            extra = np.zeros((n_groups - len(self.registers), self.m), dtype=np.uint8)
+            self.registers = np.vstack([self.registers, extra])
+
+    def update(self, groups, values):
+        """Add values (any hashable) to the sketches of the given group rows"""
+        hashes = pd.util.hash_array(np.asarray(values, dtype=object))
+        index = (hashes >> np.uint64(64 - self.precision)).astype(np.intp)
+        rest = hashes << np.uint64(self.precision)
+        rank = np.minimum(leading_zeros(rest), 64 - self.precision) + 1
+        np.maximum.at(self.registers, (np.asarray(groups, dtype=np.intp), index), rank.astype(np.uint8))
+
+    def estimate(self):
+        """Cardinality estimate per group (linear counting for small sets)"""
+        m = self.m
+        alpha = 0.7213 / (1 + 1.079 / m)
+        harmonic = np.power(2.0, -self.registers.astype(np.float64)).sum(axis=1)
+        estimate = alpha * m * m / harmonic
+
+        empty = (self.registers == 0).sum(axis=1)
+        small = (estimate <= 2.5 * m) & (empty > 0)
+        estimate[small] = m * np.log(m / empty[small])
+        return estimate
+
+
+class WeeklyReducer:
+    """
+    Stream raw rows into per Platform/year/week aggregates: row counts, sums,
+    means and approximate distinct counts. Memory grows with the number of
+    platform-weeks, not with the number of raw rows.
+    """
+
+    def __init__(self, time, count, sums=None, means=None, distinct=None, precision=HLL_PRECISION):
+        self.time = time
+        self.count = count
+        self.sums = dict(sums or {})
+        self.means = dict(means or {})
+        self.distinct = dict(distinct or {})
+
+        self.group_index = {}
+        self.totals = None
+        self.sketches = {name: HyperLogLog(precision) for name in self.distinct}
+        self.rows = 0
+
+    @property
+    def columns(self):
+        """Raw columns the reducer needs from the source file"""
+        needed = ['Platform', self.time] + list(self.sums.values()) + list(self.means.values())
+        needed += list(self.distinct.values())
+        return list(dict.fromkeys(needed))
+
+    def _group_rows(self, keys):
+        """Map each row's (Platform, year, week) to a persistent group number"""
+        codes, uniques = pd.MultiIndex.from_frame(keys).factorize()
+        rows = np.empty(len(uniques), dtype=np.intp)
+        for i, key in enumerate(uniques):
+            rows[i] = self.group_index.setdefault(key, len(self.group_index))
+        return rows[codes]
+
+    def update(self, chunk):
+        """Fold one chunk of raw rows into the running aggregates"""
+        when = pd.to_datetime(chunk[self.time], errors='coerce', utc=True)
+        iso = when.dt.isocalendar()
+        valid = chunk['Platform'].notna().to_numpy() & when.notna().to_numpy()
+        if not valid.any():
+            return
+
+        chunk = chunk[valid]
+        keys = pd.DataFrame({
+            'Platform': chunk['Platform'].astype(str).to_numpy(),
+            'year': iso['year'][valid].astype('int64').to_numpy(),
+            'week': iso['week'][valid].astype('int64').to_numpy(),
+        })
+        self.rows += len(chunk)
+
+        values = {self.count: np.ones(len(chunk))}
+        for out, col in self.sums.items():
+            values[out] = pd.to_numeric(chunk[col], errors='coerce').fillna(0).to_numpy(dtype='float64')
+        for out, col in self.means.items():
+            numeric = pd.to_numeric(chunk[col], errors='coerce')
+            values[f'{out}__sum'] = numeric.fillna(0).to_numpy(dtype='float64')
+            values[f'{out}__n'] = numeric.notna().to_numpy(dtype='float64')
+
+        partial = pd.DataFrame(values).groupby([keys[k] for k in PANEL_KEYS]).sum()
+        self.totals = partial if self.totals is None else self.totals.add(partial, fill_value=0)
+
+        groups = self._group_rows(keys)
+        for out, col in self.distinct.items():
+            present = chunk[col].notna().to_numpy()
+            sketch = self.sketches[out]
+            sketch.grow(len(self.group_index))
+            sketch.update(groups[present], chunk[col].to_numpy()[present])
+
+    def result(self):
+        """Weekly aggregates as a Platform/year/week DataFrame"""
+        if self.totals is None:
+            return pd.DataFrame(columns=PANEL_KEYS)
+
+        df = self.totals.copy()
+        df[self.count] = df[self.count].astype('int64')
+        for out in self.means:
+            n = df.pop(f'{out}__n')
+            total = df.pop(f'{out}__sum')
+            df[out] = total / n.where(n > 0)
+        df = df.reset_index()
+
+        for out, sketch in self.sketches.items():
+            sketch.grow(len(self.group_index))
+            estimates = pd.Series(np.round(sketch.estimate()).astype('int64'))
+            lookup = pd.Series(list(self.group_index.values()), index=pd.MultiIndex.from_tuples(list(self.group_index)))
+            rows = lookup.reindex(pd.MultiIndex.from_frame(df[PANEL_KEYS])).to_numpy()
+            df[out] = estimates.to_numpy()[rows]
+
+        return df.sort_values(PANEL_KEYS).reset_index(drop=True)
+
+
+def reduce_source(name, chunksize=CHUNK_ROWS):
+    """Stream a raw registered source (blocks/commits) into weekly aggregates"""
+    source = get_source(name)
+    spec = WEEKLY_REDUCTIONS[name]
+
+    if not source.exists():
+        print(f"   ⚠️  File not found: {source.path}")
+        return None
+
+    reducer = WeeklyReducer(**spec)
+    for i, chunk in enumerate(iter_chunks(source.abspath, reducer.columns, chunksize, source.sheet_name), 1):
+        reducer.update(source.canonicalize(chunk))
+        print(f"   🔄 {name}: chunk {i}, {reducer.rows:,} rows reduced")
+
+    weekly = reducer.result()
+    print(f"   ✅ {name}: {reducer.rows:,} raw rows -> {len(weekly):,} platform-weeks")
+    return weekly
@@ -0,0 +1,486 @@
+"""
+Incremental runner for the whole research pipeline.
+
+Every stage declares the files it reads and writes. A stage re-runs only
+when the content hash of its script or of one of its inputs differs from
+the last successful run, or when one of its outputs is missing or was
+changed by hand. Hashes are recorded in .pipeline_state.json, so a stage
+whose upstream re-ran but produced identical files is not re-run either.
+Stages whose dependencies are satisfied run in parallel.
+
+Collector stages call external APIs. They are never started implicitly:
+pass --collect to refresh them, otherwise their current files are used.
+
+Usage:
+    python run_pipeline.py                   # bring every derived file up to date
+    python run_pipeline.py --dry-run         # show what would run
+    python run_pipeline.py fixshanon         # a target and whatever it depends on
+    python run_pipeline.py --force calc      # re-run a stage regardless of hashes
+    python run_pipeline.py --collect block_data --jobs 2
+    python run_pipeline.py --adopt           # trust the files already on disk
+    python run_pipeline.py --self-check      # offline fixtures of the helper modules
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(REPO_ROOT, 'proposal'))
+sys.path.insert(0, os.path.join(REPO_ROOT, 'final_analysis'))
+from build_features import FEATURES_FILE
+from checkpoint_store import file_digest, fingerprint
+from source_registry import get_source
+
+STATE_FILE = os.path.join(REPO_ROOT, '.pipeline_state.json')
+LOG_DIR = os.path.join(REPO_ROOT, 'pipeline_logs')
+
+# Stata executables tried in order for the regression stage
+STATA_PROGRAMS = ('stata-mp', 'stata-se', 'stata', 'StataMP-64', 'StataSE-64')
+
+
+def content_digest(path):
+    """
+    sha256 of a file's contents. Excel workbooks are hashed member by member
+    without docProps/core.xml, which only carries the save timestamp, so a
+    re-run that writes the same data yields the same digest.
+    """
+    if not path.endswith('.xlsx') or not os.path.exists(path):
+        return file_digest(path)
+    try:
+        with zipfile.ZipFile(path) as workbook:
+            members = sorted(name for name in workbook.namelist() if name != 'docProps/core.xml')
+            return fingerprint({name: hashlib.sha256(workbook.read(name)).hexdigest() for name in members})
+    except zipfile.BadZipFile:
+        return file_digest(path)
+
+
+def src(name):
+    """Repo-relative path of a registered data source"""
+    return get_source(name).path
+
+
+class Stage:
+    """
+    One step of the pipeline: a script run from its own directory.
+
+    inputs/outputs are repo-relative paths. The script itself is always
+    hashed as an input. program is a tuple of candidate executables (the
+    first one found on PATH is used); None runs the script with Python.
+    cwd overrides the working directory for scripts that write into it.
+    """
+
+    def __init__(self, name, script, inputs=(), outputs=(), collector=False, program=None, args=None, cwd=None):
+        self.name = name
+        self.script = script
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.collector = collector
+        self.program = program
+        self.args = args
+        self.cwd = os.path.dirname(script) if cwd is None else cwd
+
+    @property
+    def hashed_inputs(self):
+        return [self.script] + self.inputs
+
+    def command(self):
+        """Command line for the stage, or None when its program is not installed"""
+        if self.program is None:
+            return [sys.executable, os.path.relpath(self.script, self.cwd)]
+        for program in self.program:
+            path = shutil.which(program)
+            if path:
+                return [path] + list(self.args or [])
+        return None
+
+
+STAGES = [
+    # Collectors (external APIs)
+    Stage('block_data', 'commits/get_block_data.py',
+          inputs=['commits/pool_attribution.py', 'commits/pool_signatures.json',
+                  'commits/blk_parser.py', 'commits/block_store.py', 'commits/header_decoder.py',
+                  'commits/record_buffers.py', 'commits/frame_accumulator.py'],
+          outputs=[src('blocks')], collector=True),
+    Stage('commit_data', 'commits/get_commits.py',
+          inputs=['commits/record_buffers.py', 'commits/frame_accumulator.py'],
+          outputs=[src('commits')], collector=True),
+    Stage('market_hashrate', 'commits/get_market_hashrate_data.py',
+          inputs=[src('blocks'), 'commits/hashrate_estimator.py', 'commits/block_store.py',
+                  'commits/header_decoder.py'],
+          outputs=[src('market')], collector=True),
+    Stage('improvement_proposals', 'commits/get_eip_data.py',
+          outputs=[src('improvement_proposals')], collector=True),
+    Stage('difficulty', 'proposal/updated work/collect_difficulty_data_full.py',
+          inputs=['commits/record_buffers.py'],
+          outputs=[src('difficulty')], collector=True),
+    Stage('new_crypto_2015_2020', 'extend/collect_new_crypto_data_2015_2020.py',
+          inputs=['commits/http_cassette.py'],
+          outputs=['extend/NEW_CRYPTO_INTEGRATED_2015_2020.xlsx'], collector=True),
+    Stage('new_crypto_2021_2024', 'extend/collect_new_crypto_data_2021_2024.py',
+          inputs=['commits/http_cassette.py'],
+          outputs=['extend/NEW_CRYPTO_INTEGRATED_2021_2024.xlsx'], collector=True),
+    Stage('group1', 'proposal/updated work/comprehensive_group1_tasks.py',
+          inputs=[src('historical_panel'), src('proposals'), src('market'),
+                  src('decentralization'), src('blocks'), src('commits'), 'proposal/instrumentation.py',
+                  'commits/http_cassette.py'],
+          outputs=[src('task3_cryptocompare'), src('github'), src('reddit'),
+                   'proposal/updated work/group1_checkpoints/manifest.json'],
+          collector=True),
+
+    # Derived datasets
+    Stage('calc', 'commits/calc.py',
+          inputs=[src('blocks'), src('commits'), 'commits/time_buckets.py', 'commits/rolling_concentration.py',
+                  'commits/author_identity.py'],
+          outputs=[src('decentralization'), 'commits/author_identity_index.json']),
+    Stage('lda', 'proposal/lda_topic_analysis.py',
+          inputs=[src('improvement_proposals'), 'proposal/Proposal Content.xlsx', 'commits/time_buckets.py'],
+          outputs=[src('proposals'), src('detailed_proposals'), 'proposal/lda_model_parameters.txt']),
+    Stage('data_integration', 'proposal/data_integration.py',
+          inputs=[src('decentralization'), src('market'), src('proposals')],
+          outputs=[src('integrated_2015_2024')]),
+    Stage('group1_integration', 'proposal/updated work/memory_efficient_integration.py',
+          inputs=['proposal/updated work/group1_checkpoints/manifest.json',
+                  src('task3_cryptocompare'), src('github'), src('reddit'), 'proposal/instrumentation.py'],
+          outputs=[src('group1_final'), src('cryptocompare')]),
+    Stage('complete_2021_2024', 'extra/integrate_complete_2021_2024_dataset.py',
+          inputs=[src('decentralization'), src('market'), src('proposals'), src('cryptocompare'),
+                  src('github'), src('reddit'), src('difficulty'), 'proposal/instrumentation.py'],
+          outputs=[src('complete_2021_2024')], cwd='.'),
+    Stage('new_crypto_merge', 'extend/merge_2015_2024_datasets.py',
+          inputs=['extend/NEW_CRYPTO_INTEGRATED_2015_2020.xlsx', 'extend/NEW_CRYPTO_INTEGRATED_2021_2024.xlsx'],
+          outputs=[src('new_crypto_comprehensive')]),
+    Stage('seven_platforms', 'final_analysis/create_7platform_2015_2024.py',
+          inputs=[src('historical_panel'), src('complete_2021_2024')],
+          outputs=['final_analysis/original_7platforms_2015_2024.csv']),
+    Stage('eleven_platforms', 'final_analysis/create_11platform_2015_2024.py',
+          inputs=['final_analysis/original_7platforms_2015_2024.csv', src('new_crypto_comprehensive')],
+          outputs=['final_analysis/all_11platforms_2015_2024.csv']),
+    Stage('fixshanon', 'final_analysis/fixshanon.py',
+          inputs=['final_analysis/original_7platforms_2015_2024.csv',
+                  'final_analysis/all_11platforms_2015_2024.csv', src('decentralization')],
+          outputs=['final_analysis/original_7platforms_2015_2024_FIXED.csv',
+                   'final_analysis/all_11platforms_2015_2024_FIXED.csv']),
+    Stage('stata_ready', 'final_analysis/data_diagnostic_and_cleanup.py',
+          inputs=['final_analysis/all_11platforms_2015_2024.csv'],
+          outputs=['final_analysis/all_11platforms_STATA_READY.csv']),
+
+    # Regressions (the Stata stage is skipped when Stata is not installed)
+    Stage('features', 'final_analysis/build_features.py',
+          inputs=['final_analysis/all_11platforms_STATA_READY.csv'],
+          outputs=[f'final_analysis/{FEATURES_FILE}']),
+    Stage('panel_regression', 'final_analysis/panel_regression.py',
+          inputs=[f'final_analysis/{FEATURES_FILE}'],
+          outputs=['final_analysis/panel_regression_results.csv']),
+    Stage('spec_grid', 'final_analysis/spec_grid.py',
+          inputs=[f'final_analysis/{FEATURES_FILE}', 'final_analysis/panel_regression.py'],
+          outputs=['final_analysis/spec_grid_results.csv']),
+    Stage('resampling_inference', 'final_analysis/resampling_inference.py',
+          inputs=[f'final_analysis/{FEATURES_FILE}', 'final_analysis/panel_regression.py'],
+          outputs=['final_analysis/resampling_inference_results.csv']),
+    Stage('stata', 'final_analysis/blockchain_analysis_final.do',
+          inputs=['final_analysis/all_11platforms_STATA_READY.csv'],
+          outputs=['final_analysis/blockchain_analysis_final.log', 'final_analysis/final_corrected_analysis.ster'],
+          program=STATA_PROGRAMS, args=['-b', 'do', 'blockchain_analysis_final.do']),
+]
+
+# Offline fixtures of the parsers, estimators and HTTP helpers (--self-check)
+SELF_CHECKS = [
+    'commits/blk_parser.py',
+    'commits/header_decoder.py',
+    'commits/hashrate_estimator.py',
+    'commits/pool_attribution.py',
+    'commits/http_cassette.py',
+    'benchmarks/synthetic_data.py',
+    'benchmarks/mock_api_server.py',
+]
+
+
+def run_self_checks(scripts=SELF_CHECKS):
+    """Run every module's --self-check from its own directory; True when all pass"""
+    env = dict(os.environ, PYTHONIOENCODING='utf-8')
+    failed = []
+    for script in scripts:
+        directory, name = os.path.split(os.path.join(REPO_ROOT, script))
+        process = subprocess.run([sys.executable, name, '--self-check'], cwd=directory, env=env,
+                                 stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                 text=True)
+        lines = process.stdout.strip().splitlines()
+        print(f"{script:<34} {lines[-1] if lines else ''}")
+        if process.returncode != 0:
+            failed.append(script)
+    print(f"{'✅' if not failed else '❌'} {len(scripts) - len(failed)}/{len(scripts)} self-checks passed")
+    return not failed
+
+
+class Pipeline:
+    def __init__(self, stages, state_file=STATE_FILE):
+        self.stages = {stage.name: stage for stage in stages}
+        self.state_file = state_file
+        self.state = self._read_state()
+
+        # Map every output to the stage producing it
+        self.producers = {}
+        for stage in stages:
+            for path in stage.outputs:
+                if path in self.producers:
+                    raise ValueError(f"{path} is produced by both {self.producers[path]} and {stage.name}")
+                self.producers[path] = stage.name
+
+        self.upstream = {
+            stage.name: sorted({self.producers[path] for path in stage.inputs
+                                if path in self.producers and self.producers[path] != stage.name})
+            for stage in stages
+        }
+        self.order = self._topological_order()
+
+    def _topological_order(self):
+        order, visiting, done = [], set(), set()
+
+        def visit(name):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Dependency cycle through stage {name}")
+            visiting.add(name)
+            for parent in self.upstream[name]:
+                visit(parent)
+            visiting.discard(name)
+            done.add(name)
+            order.append(name)
+
+        for name in self.stages:
+            visit(name)
+        return order
+
+    def _read_state(self):
+        if not os.path.exists(self.state_file):
+            return {}
+        try:
+            with open(self.state_file) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            print(f"⚠️  Pipeline state unreadable, treating every stage as stale: {self.state_file}")
+            return {}
+
+    def _write_state(self):
+        tmp_path = self.state_file + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.state, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.state_file)
+
+    @staticmethod
+    def digests(paths):
+        return {path: content_digest(os.path.join(REPO_ROOT, path)) for path in paths}
+
+    def stale_reason(self, stage):
+        """Why the stage has to run, or None when it is up to date"""
+        missing = [path for path in stage.outputs if not os.path.exists(os.path.join(REPO_ROOT, path))]
+        if missing:
+            return f"missing output {missing[0]}"
+
+        record = self.state.get(stage.name)
+        if record is None:
+            return "no previous run recorded"
+
+        current = self.digests(stage.hashed_inputs)
+        changed = [path for path, digest in current.items() if record['inputs'].get(path) != digest]
+        if changed:
+            return f"changed input {changed[0]}" + (f" (+{len(changed) - 1} more)" if len(changed) > 1 else "")
+
+        edited = [path for path, digest in self.digests(stage.outputs).items()
+                  if record['outputs'].get(path) != digest]
+        if edited:
+            return f"output modified outside the pipeline: {edited[0]}"
+        return None
+
+    def selected(self, targets):
+        """Targets plus everything they depend on (all stages when no targets)"""
+        if not targets:
+            return set(self.stages)
+        unknown = [name for name in targets if name not in self.stages]
+        if unknown:
+            raise KeyError(f"Unknown stage(s): {', '.join(unknown)}")
+
+        selected, pending = set(), list(targets)
+        while pending:
+            name = pending.pop()
+            if name not in selected:
+                selected.add(name)
+                pending.extend(self.upstream[name])
+        return selected
+
+    def execute(self, stage):
+        """Run one stage in a subprocess, logging to pipeline_logs/<stage>.log"""
+        command = stage.command()
+        os.makedirs(LOG_DIR, exist_ok=True)
+        log_path = os.path.join(LOG_DIR, f'{stage.name}.log')
+        env = dict(os.environ, PYTHONIOENCODING='utf-8', MPLBACKEND='Agg')
+
+        started = time.time()
+        with open(log_path, 'w', encoding='utf-8') as log:
+            process = subprocess.run(command, cwd=os.path.join(REPO_ROOT, stage.cwd), env=env,
+                                     stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT)
+        return process.returncode, time.time() - started, log_path
+
+    def record(self, stage, seconds=None):
+        """Store the stage's current hashes; returns a problem string on failure"""
+        missing = [path for path in stage.outputs if not os.path.exists(os.path.join(REPO_ROOT, path))]
+        if missing:
+            return f"did not write {missing[0]}"
+
+        self.state[stage.name] = {
+            'inputs': self.digests(stage.hashed_inputs),
+            'outputs': self.digests(stage.outputs),
+            'finished_at': datetime.now().isoformat(),
+            'seconds': None if seconds is None else round(seconds, 1),
+        }
+        self._write_state()
+        return None
+
+    def adopt(self, targets=None):
+        """Accept the files on disk as up to date (first use of the runner)"""
+        selected = self.selected(targets)
+        for name in self.order:
+            if name in selected:
+                problem = self.record(self.stages[name])
+                print(f"⚠️  {name}: {problem}" if problem else f"📌 {name}: current files recorded")
+
+    def run(self, targets=None, force=(), collect=(), jobs=4, dry_run=False):
+        """
+        Bring the selected stages up to date. Decisions are made when a
+        stage becomes ready, i.e. after its upstream stages have finished,
+        so its input hashes reflect what upstream actually wrote.
+        """
+        selected = self.selected(targets)
+        force = set(self.stages) if 'all' in force else set(force)
+        collect = {name for name in self.stages if self.stages[name].collector} if 'all' in collect else set(collect)
+
+        status = {}  # name -> ran | planned | fresh | kept | skipped | failed | blocked
+        running = {}
+        started = time.time()
+
+        print("🚀 RESEARCH PIPELINE")
+        print("=" * 60)
+        print(f"Stages selected: {len(selected)} | parallel jobs: {jobs}" + (" | DRY RUN" if dry_run else ""))
+
+        def ready():
+            for name in self.order:
+                if name in selected and name not in status and name not in running.values() \
+                        and all(parent in status or parent not in selected for parent in self.upstream[name]):
+                    yield name
+
+        def decide(name):
+            """Return the reason to run the stage, or None after recording its status"""
+            stage = self.stages[name]
+            parents = [p for p in self.upstream[name] if p in selected]
+            if any(status[p] in ('failed', 'blocked') for p in parents):
+                status[name] = 'blocked'
+                print(f"⛔ {name}: blocked by a failed upstream stage")
+                return None
+
+            if name in force:
+                reason = "forced"
+            elif dry_run and any(status[p] == 'planned' for p in parents):
+                reason = "upstream would run"
+            else:
+                reason = self.stale_reason(stage)
+
+            if reason is None:
+                status[name] = 'fresh'
+                print(f"✅ {name}: up to date")
+                return None
+            if stage.collector and name not in collect and name not in force:
+                status[name] = 'kept'
+                print(f"📦 {name}: {reason}; collector not refreshed (pass --collect {name})")
+                return None
+            if stage.command() is None:
+                status[name] = 'skipped'
+                print(f"⚠️  {name}: {reason}, but none of {', '.join(stage.program)} is on PATH; skipped")
+                return None
+            if dry_run:
+                status[name] = 'planned'
+                print(f"🔄 {name}: would run ({reason})")
+                return None
+            return reason
+
+        with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+            while True:
+                for name in list(ready()):
+                    if len(running) >= max(1, jobs):
+                        break
+                    reason = decide(name)
+                    if reason is not None:
+                        print(f"🔄 {name}: running ({reason})")
+                        running[pool.submit(self.execute, self.stages[name])] = name
+
+                if not running:
+                    if not any(True for _ in ready()):
+                        break
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    returncode, seconds, log_path = future.result()
+                    problem = f"exit code {returncode}" if returncode else self.record(self.stages[name], seconds)
+                    if problem:
+                        status[name] = 'failed'
+                        print(f"❌ {name}: {problem} after {seconds:.1f}s, see {os.path.relpath(log_path, REPO_ROOT)}")
+                    else:
+                        status[name] = 'ran'
+                        print(f"✅ {name}: finished in {seconds:.1f}s")
+
+        print("=" * 60)
+        counts = {}
+        for value in status.values():
+            counts[value] = counts.get(value, 0) + 1
+        summary = ', '.join(f"{count} {value}" for value, count in sorted(counts.items()))
+        print(f"📋 {summary} in {time.time() - started:.1f}s")
+        return status
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental runner for the research pipeline")
+    parser.add_argument('targets', nargs='*', help="stages to bring up to date (default: all)")
+    parser.add_argument('--force', action='append', default=[], metavar='STAGE',
+                        help="re-run a stage even if its hashes match ('all' for every stage)")
+    parser.add_argument('--collect', action='append', default=[], metavar='STAGE',
+                        help="allow a stale collector to call its APIs ('all' for every collector)")
+    parser.add_argument('--jobs', type=int, default=4, help="stages run in parallel (default: 4)")
+    parser.add_argument('--dry-run', action='store_true', help="report decisions without running anything")
+    parser.add_argument('--list', action='store_true', help="list stages and their dependencies")
+    parser.add_argument('--adopt', action='store_true',
+                        help="record the current files as up to date without running anything")
+    parser.add_argument('--self-check', action='store_true', help="run the modules' offline self-checks and exit")
+    args = parser.parse_args()
+
+    if args.self_check:
+        return 0 if run_self_checks() else 1
+
+    pipeline = Pipeline(STAGES)
+    if args.list:
+        for name in pipeline.order:
+            stage = pipeline.stages[name]
+            kind = 'collector' if stage.collector else 'stage'
+            after = ', '.join(pipeline.upstream[name]) or '-'
+            print(f"{name:<22} {kind:<9} {stage.script:<58} after: {after}")
+        return 0
+
+    if args.adopt:
+        pipeline.adopt(args.targets)
+        return 0
+
+    status = pipeline.run(args.targets, args.force, args.collect, args.jobs, args.dry_run)
+    return 1 if any(value in ('failed', 'blocked') for value in status.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())